@@ -0,0 +1,342 @@
+"""
+Admission control: per-route concurrency limits with short queues.
+
+Endpoints opt in with `@admit("<class>")` under the route decorator (below
+@cached, so cache hits skip it). Each worker admits at most
+ADMISSION_MAX_IN_FLIGHT such requests at once. Expensive classes also have
+their own limit and a bounded queue:
+
+- export: ZIP exports, which hold the whole archive in memory
+- upload: episode uploads (video read, hashed and processed)
+- bulk_read: dataset stats and full lab episode listings
+
+The job-queue endpoints fixers use are "interactive". Interactive requests
+are never held back by those limits. ADMISSION_INTERACTIVE_RESERVE slots
+stay free for them, and when a slot frees up they are admitted before
+anything else waiting. A request that finds its queue full, or waits
+longer than ADMISSION_QUEUE_TIMEOUT_SEC, gets 429 with a Retry-After
+estimated from how long that class's requests have been taking.
+
+A streamed response keeps its slot until the body has been sent (or the
+client went away): a ZIP export holds its archive in memory until then.
+
+The decorator only runs once FastAPI has read and parsed the request body.
+For uploads that is most of the work (the multipart body is spooled to
+disk), so classes marked `before_body` are admitted by AdmissionMiddleware
+instead, before the body is read: a queued upload leaves its body unread on
+the socket. Its slot is released once the response has been sent.
+
+Limits are per worker process; with serve.py multiply by the workers.
+"""
+
+import os
+import math
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from starlette.background import BackgroundTask
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import BaseRoute, Match
+
+import telemetry
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "64"))
+ADMISSION_INTERACTIVE_RESERVE = int(os.getenv("ADMISSION_INTERACTIVE_RESERVE", "16"))
+ADMISSION_QUEUE_TIMEOUT_SEC = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SEC", "10"))
+
+MAX_RETRY_AFTER_SEC = 300
+
+
+@dataclass(frozen=True)
+class RouteClass:
+    name: str
+    concurrency: Optional[int]  # None: only the shared limit applies
+    queue: int
+    interactive: bool = False
+    typical_sec: float = 1.0  # Retry-After estimate until requests have been timed
+    before_body: bool = False  # Admitted by AdmissionMiddleware, before the body is read
+
+
+def _limits(name: str, concurrency: int, queue: int, typical_sec: float, before_body: bool = False) -> RouteClass:
+    prefix = f"ADMISSION_{name.upper()}"
+    return RouteClass(
+        name,
+        concurrency=int(os.getenv(f"{prefix}_CONCURRENCY", str(concurrency))),
+        queue=int(os.getenv(f"{prefix}_QUEUE", str(queue))),
+        typical_sec=typical_sec,
+        before_body=before_body,
+    )
+
+
+ROUTE_CLASSES = {
+    route_class.name: route_class
+    for route_class in (
+        RouteClass("interactive", concurrency=None, queue=256, interactive=True, typical_sec=0.2),
+        _limits("export", concurrency=2, queue=4, typical_sec=60.0),
+        _limits("upload", concurrency=8, queue=16, typical_sec=5.0, before_body=True),
+        _limits("bulk_read", concurrency=4, queue=16, typical_sec=1.0),
+    )
+}
+
+
+class Saturated(Exception):
+    def __init__(self, route_class: str, reason: str, retry_after: int):
+        super().__init__(f"{route_class} requests are saturated ({reason})")
+        self.route_class = route_class
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Admission:
+    """
+    Slots for admitted requests, shared by all classes, plus per-class
+    limits. Lives on one event loop; nothing here blocks.
+    """
+
+    def __init__(
+        self,
+        classes: Dict[str, RouteClass],
+        max_in_flight: int = ADMISSION_MAX_IN_FLIGHT,
+        reserve: int = ADMISSION_INTERACTIVE_RESERVE,
+        timeout: float = ADMISSION_QUEUE_TIMEOUT_SEC,
+    ):
+        self.classes = classes
+        self.max_in_flight = max_in_flight
+        self.reserve = min(reserve, max_in_flight - 1)
+        self.timeout = timeout
+        self.in_flight = 0
+        self.running = {name: 0 for name in classes}
+        self.waiting = {name: deque() for name in classes}
+        # Moving average of how long admitted requests take, per class
+        self.service_sec = {name: route_class.typical_sec for name, route_class in classes.items()}
+        # Interactive waiters are woken first
+        self.order = sorted(classes.values(), key=lambda route_class: not route_class.interactive)
+
+    def can_admit(self, route_class: RouteClass) -> bool:
+        if route_class.concurrency is not None and self.running[route_class.name] >= route_class.concurrency:
+            return False
+        budget = self.max_in_flight if route_class.interactive else self.max_in_flight - self.reserve
+        return self.in_flight < budget
+
+    def retry_after(self, route_class: RouteClass) -> int:
+        """Seconds until the requests ahead of a new one are likely done."""
+        slots = route_class.concurrency or self.max_in_flight
+        ahead = self.running[route_class.name] + len(self.waiting[route_class.name])
+        estimate = self.service_sec[route_class.name] * max(ahead, 1) / slots
+        return max(1, min(MAX_RETRY_AFTER_SEC, math.ceil(estimate)))
+
+    def admit(self, route_class: RouteClass):
+        self.in_flight += 1
+        self.running[route_class.name] += 1
+
+    def release(self, route_class: RouteClass, seconds: Optional[float] = None):
+        self.in_flight -= 1
+        self.running[route_class.name] -= 1
+        if seconds is not None:
+            average = self.service_sec[route_class.name]
+            self.service_sec[route_class.name] = 0.8 * average + 0.2 * seconds
+        self.wake()
+
+    def wake(self):
+        for route_class in self.order:
+            queue = self.waiting[route_class.name]
+            while queue and self.can_admit(route_class):
+                waiter = queue.popleft()
+                if waiter.done():  # gave up already
+                    continue
+                self.admit(route_class)
+                waiter.set_result(None)
+            self.observe(route_class)
+
+    def observe(self, route_class: RouteClass):
+        telemetry.admission_state(route_class.name, self.running[route_class.name], len(self.waiting[route_class.name]))
+
+    def reject(self, route_class: RouteClass, reason: str):
+        telemetry.admission_rejected(route_class.name, reason)
+        raise Saturated(route_class.name, reason, self.retry_after(route_class))
+
+    async def acquire(self, route_class: RouteClass):
+        started = time.perf_counter()
+        queue = self.waiting[route_class.name]
+        if not queue and self.can_admit(route_class):
+            self.admit(route_class)
+        else:
+            if len(queue) >= route_class.queue:
+                self.reject(route_class, "queue_full")
+            waiter = asyncio.get_running_loop().create_future()
+            queue.append(waiter)
+            self.observe(route_class)
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter), self.timeout)
+            except BaseException as e:
+                if waiter.done() and not waiter.cancelled():
+                    # Admitted just as we gave up: hand the slot on
+                    self.release(route_class)
+                else:
+                    waiter.cancel()
+                    queue.remove(waiter)
+                    self.observe(route_class)
+                if isinstance(e, asyncio.TimeoutError):
+                    self.reject(route_class, "timeout")
+                raise
+        telemetry.admission_waited(route_class.name, time.perf_counter() - started)
+        self.observe(route_class)
+
+    async def hold(self, name: str) -> Callable[[], None]:
+        """Wait for a slot; returns the function that gives it back (once, however often called)."""
+        route_class = self.classes[name]
+        await self.acquire(route_class)
+        started = time.perf_counter()
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self.release(route_class, time.perf_counter() - started)
+        return release
+
+    @asynccontextmanager
+    async def slot(self, name: str):
+        release = await self.hold(name)
+        try:
+            yield
+        finally:
+            release()
+
+
+def release_after_body(response: StreamingResponse, release: Callable[[], None]):
+    """
+    Call `release` once `response` has been sent. The body iterator covers
+    a finished or failed send, the background task a client that
+    disconnected mid-stream (Starlette stops iterating then).
+    """
+    body = response.body_iterator
+
+    async def sending():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            release()
+
+    background = response.background
+
+    async def sent():
+        release()
+        if background is not None:
+            await background()
+
+    response.body_iterator = sending()
+    response.background = BackgroundTask(sent)
+
+
+admission = Admission(ROUTE_CLASSES)
+
+# Route class whose slot AdmissionMiddleware already holds for this request
+_admitted: ContextVar[Optional[str]] = ContextVar("admitted", default=None)
+
+
+def too_many(route_class: str, error: Saturated) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=f"Too many {route_class} requests in progress, retry in {error.retry_after}s",
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
+
+def admit(route_class: str):
+    """
+    Run the endpoint only once admitted for `route_class`; 429 if saturated.
+    A StreamingResponse keeps the slot until its body has been sent.
+    """
+    if route_class not in ROUTE_CLASSES:
+        raise ValueError(f"Unknown route class: {route_class}")
+
+    def decorator(endpoint):
+        if not ADMISSION_ENABLED:
+            return endpoint
+
+        @wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            if _admitted.get() == route_class:
+                return await endpoint(*args, **kwargs)
+            try:
+                release = await admission.hold(route_class)
+            except Saturated as e:
+                raise too_many(route_class, e)
+            try:
+                response = await endpoint(*args, **kwargs)
+            except BaseException:
+                release()
+                raise
+            if isinstance(response, StreamingResponse):
+                release_after_body(response, release)
+            else:
+                release()
+            return response
+        wrapper.admission_class = route_class
+        return wrapper
+    return decorator
+
+
+class AdmissionMiddleware:
+    """
+    Admits requests to `before_body` routes before the endpoint reads their
+    body; `admit` then finds the slot taken and does not wait again.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.routes: Optional[List[Tuple[BaseRoute, str]]] = None
+
+    def route_class(self, scope) -> Optional[str]:
+        if self.routes is None:
+            # Routes are fixed once the app serves requests
+            self.routes = []
+            for route in scope["app"].router.routes:
+                name = getattr(getattr(route, "endpoint", None), "admission_class", None)
+                if name and ROUTE_CLASSES[name].before_body:
+                    self.routes.append((route, name))
+        for route, name in self.routes:
+            if route.matches(scope)[0] == Match.FULL:
+                return name
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ADMISSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        route_class = self.route_class(scope)
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            release = await admission.hold(route_class)
+        except Saturated as e:
+            error = too_many(route_class, e)
+            response = JSONResponse({"detail": error.detail}, status_code=error.status_code, headers=error.headers)
+            await response(scope, receive, send)
+            return
+
+        async def send_then_release(message):
+            await send(message)
+            # Background tasks run after this; they do not hold the slot
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                release()
+
+        token = _admitted.set(route_class)
+        try:
+            await self.app(scope, receive, send_then_release)
+        finally:
+            _admitted.reset(token)
+            release()
@@ -0,0 +1,129 @@
+"""
+Content-addressed storage for uploaded media.
+
+Videos are stored once per SHA-256 of their bytes under
+blobs/{aa}/{sha256}.mp4 in the episodes bucket, and every episode that
+uploads the same bytes points its video_path at that shared object. The
+hash is computed while the upload is read, so a duplicate costs one
+metadata lookup and no Storage write. A video remuxed before storing
+(see media.py) also records the hash of the upload it came from
+(source_sha256), so the same file uploaded again is found without
+remuxing it again.
+
+media_blobs.ref_count is kept in sync with episodes.video_sha256 by a
+database trigger; blobs nobody references any more are removed by
+`collect_garbage` (scripts/gc_media_blobs.py).
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+from typing import Tuple, List, Optional
+
+BUCKET = "episodes"
+HASH_CHUNK_BYTES = 1024 * 1024
+
+# Unreferenced blobs younger than this are kept: their episode row may not
+# have been inserted yet
+GC_GRACE = timedelta(hours=1)
+
+
+def blob_path(sha256: str, extension: str = "mp4") -> str:
+    return f"blobs/{sha256[:2]}/{sha256}.{extension}"
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+async def read_and_hash(upload) -> Tuple[bytes, str]:
+    """Read an UploadFile in chunks, hashing as it streams. Returns (bytes, sha256 hex)."""
+    digest = hashlib.sha256()
+    parts = []
+    while True:
+        chunk = await upload.read(HASH_CHUNK_BYTES)
+        if not chunk:
+            break
+        digest.update(chunk)
+        parts.append(chunk)
+    return b"".join(parts), digest.hexdigest()
+
+
+def find_blob(client, upload_sha256: str) -> Optional[Tuple[str, str]]:
+    """
+    (storage path, sha256) of the blob already holding an upload with this
+    hash: stored as uploaded, or remuxed from it. None if there is none.
+    """
+    for column in ("sha256", "source_sha256"):
+        rows = client.table("media_blobs").select("sha256, storage_path").eq(
+            column, upload_sha256
+        ).limit(1).execute().data
+        if rows:
+            return rows[0]["storage_path"], rows[0]["sha256"]
+    return None
+
+
+def store_blob(
+    client,
+    data: bytes,
+    sha256: str,
+    content_type: str = "video/mp4",
+    extension: str = "mp4",
+    source_sha256: Optional[str] = None,
+) -> Tuple[str, bool]:
+    """
+    Make sure the blob for `sha256` is in Storage and registered in media_blobs.
+    The episode row that sets video_sha256 takes the reference.
+    `source_sha256` is the hash of the upload `data` was derived from, if
+    it differs (see find_blob).
+
+    Returns:
+        (storage path, created); created is False when the bytes were already stored.
+    """
+    existing = client.table("media_blobs").select("storage_path").eq("sha256", sha256).execute()
+    if existing.data:
+        return existing.data[0]["storage_path"], False
+
+    path = blob_path(sha256, extension)
+    # Upsert: two concurrent first uploads of the same bytes write the same object
+    client.storage.from_(BUCKET).upload(
+        path,
+        data,
+        file_options={"content-type": content_type, "x-upsert": "true"},
+    )
+    row = {
+        "sha256": sha256,
+        "storage_path": path,
+        "content_type": content_type,
+        "size_bytes": len(data),
+    }
+    if source_sha256 and source_sha256 != sha256:
+        row["source_sha256"] = source_sha256
+    client.table("media_blobs").upsert(
+        row,
+        on_conflict="sha256",
+        ignore_duplicates=True,
+    ).execute()
+    return path, True
+
+
+def collect_garbage(client, grace: timedelta = GC_GRACE, dry_run: bool = False) -> List[str]:
+    """
+    Delete blobs with no referencing episodes (older than `grace`).
+    Returns the storage paths that were (or, with dry_run, would be) removed.
+    """
+    cutoff = (datetime.utcnow() - grace).isoformat()
+    rows = client.table("media_blobs").select("sha256, storage_path").lte(
+        "ref_count", 0
+    ).lt("created_at", cutoff).execute().data
+    if dry_run or not rows:
+        return [row["storage_path"] for row in rows]
+
+    # Drop the rows first, re-checking the count: an episode inserted in the
+    # meantime either keeps its blob or fails on the foreign key
+    deleted = client.table("media_blobs").delete().in_(
+        "sha256", [row["sha256"] for row in rows]
+    ).lte("ref_count", 0).execute().data
+    paths = [row["storage_path"] for row in deleted]
+    if paths:
+        client.storage.from_(BUCKET).remove(paths)
+    return paths
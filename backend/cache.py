@@ -0,0 +1,416 @@
+"""
+Response cache for read endpoints that dashboards poll.
+
+Responses are cached per route + query string as serialized JSON with a
+strong ETag, so unchanged data is neither recomputed nor re-sent: a poll
+whose If-None-Match matches gets an empty 304.
+
+Every entry is tagged with the tables it was computed from. Write paths call
+`invalidate(*tables)`, which bumps those tables' generation counters; cache
+keys include the current generations, so stale entries are never hit again
+and simply age out. With CACHE_REDIS_URL set (needs the `redis` package)
+entries and generations live in Redis and are shared by all API processes;
+with CACHE_SQLITE_PATH they live in a SQLite file shared by the worker
+processes of one host (serve.py); otherwise each process keeps an in-memory
+LRU. CACHE_TTL_SEC bounds how long writes made outside the API (seed
+scripts, SQL editor) can go unseen.
+
+`ValueCache` keeps smaller lookups (signed URLs, task rows, worker names) on
+the same backend, so they are shared the same way.
+"""
+
+import os
+import time
+import random
+import sqlite3
+import hashlib
+import inspect
+import logging
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Dict, Iterable, Optional, Tuple, Sequence, List
+
+import orjson
+
+from fastapi import Request, Response
+
+from responses import dumps
+
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+CACHE_TTL_SEC = int(os.getenv("CACHE_TTL_SEC", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH")
+# Small values (signed URLs, names) are far more numerous than responses
+CACHE_MAX_VALUES = int(os.getenv("CACHE_MAX_VALUES", "50000"))
+
+KEY_PREFIX = "umm:cache"
+
+logger = logging.getLogger(__name__)
+
+
+class LocalBackend:
+    """In-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_values: int = CACHE_MAX_VALUES):
+        self.max_entries = max_entries
+        self.max_values = max_values
+        self.entries: "OrderedDict[str, Tuple[float, bytes, str]]" = OrderedDict()
+        self.values: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self.generations = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, body, etag = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return body, etag
+
+    def set(self, key: str, body: bytes, etag: str, ttl: int):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, body, etag)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def get_values(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        now = time.monotonic()
+        found = []
+        with self.lock:
+            for key in keys:
+                entry = self.values.get(key)
+                if entry is not None and entry[0] >= now:
+                    self.values.move_to_end(key)
+                    found.append(entry[1])
+                else:
+                    found.append(None)
+        return found
+
+    def set_values(self, values: Dict[str, bytes], ttl: int):
+        expires_at = time.monotonic() + ttl
+        with self.lock:
+            for key, value in values.items():
+                self.values[key] = (expires_at, value)
+                self.values.move_to_end(key)
+            while len(self.values) > self.max_values:
+                self.values.popitem(last=False)
+
+    def get_generations(self, tags: Sequence[str]) -> List[int]:
+        with self.lock:
+            return [self.generations.get(tag, 0) for tag in tags]
+
+    def bump(self, tags: Sequence[str]):
+        with self.lock:
+            for tag in tags:
+                self.generations[tag] = self.generations.get(tag, 0) + 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.values.clear()
+
+
+class RedisBackend:
+    """Shared cache in Redis; entries expire through Redis TTLs."""
+
+    def __init__(self, url: str):
+        import redis
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        value = self.client.get(key)
+        if value is None:
+            return None
+        etag, _, body = value.partition(b"\n")
+        return body, etag.decode()
+
+    def set(self, key: str, body: bytes, etag: str, ttl: int):
+        self.client.set(key, etag.encode() + b"\n" + body, ex=ttl)
+
+    def get_values(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        return self.client.mget(keys) if keys else []
+
+    def set_values(self, values: Dict[str, bytes], ttl: int):
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in values.items():
+            pipe.set(key, value, ex=ttl)
+        pipe.execute()
+
+    def get_generations(self, tags: Sequence[str]) -> List[int]:
+        values = self.client.mget([f"{KEY_PREFIX}:gen:{tag}" for tag in tags])
+        return [int(value or 0) for value in values]
+
+    def bump(self, tags: Sequence[str]):
+        pipe = self.client.pipeline()
+        for tag in tags:
+            pipe.incr(f"{KEY_PREFIX}:gen:{tag}")
+        pipe.execute()
+
+    def clear(self):
+        for pattern in (f"{KEY_PREFIX}:resp:*", f"{KEY_PREFIX}:val:*"):
+            for key in self.client.scan_iter(pattern):
+                self.client.delete(key)
+
+
+class SqliteBackend:
+    """
+    Cache in a SQLite file, shared by the worker processes of one host
+    without running a cache server. Expired rows are purged now and then.
+    """
+
+    PURGE_EVERY = 500  # writes, on average
+
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+        with self.connection() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, etag TEXT, body BLOB, expires_at REAL);
+                CREATE TABLE IF NOT EXISTS cache_values (key TEXT PRIMARY KEY, value BLOB, expires_at REAL);
+                CREATE TABLE IF NOT EXISTS generations (tag TEXT PRIMARY KEY, generation INTEGER);
+            """)
+
+    def connection(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets readers run alongside a writer
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def maybe_purge(self, conn: sqlite3.Connection):
+        if random.randrange(self.PURGE_EVERY) == 0:
+            now = time.time()
+            conn.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+            conn.execute("DELETE FROM cache_values WHERE expires_at < ?", (now,))
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        row = self.connection().execute(
+            "SELECT body, etag FROM entries WHERE key = ? AND expires_at >= ?", (key, time.time())
+        ).fetchone()
+        return (bytes(row[0]), row[1]) if row else None
+
+    def set(self, key: str, body: bytes, etag: str, ttl: int):
+        conn = self.connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, etag, body, expires_at) VALUES (?, ?, ?, ?)",
+            (key, etag, body, time.time() + ttl),
+        )
+        self.maybe_purge(conn)
+
+    def get_values(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        if not keys:
+            return []
+        found = {}
+        conn = self.connection()
+        # SQLite caps bound parameters per statement
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = conn.execute(
+                f"SELECT key, value FROM cache_values WHERE expires_at >= ? AND key IN ({','.join('?' * len(chunk))})",
+                (time.time(), *chunk),
+            )
+            found.update((key, bytes(value)) for key, value in rows)
+        return [found.get(key) for key in keys]
+
+    def set_values(self, values: Dict[str, bytes], ttl: int):
+        expires_at = time.time() + ttl
+        conn = self.connection()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO cache_values (key, value, expires_at) VALUES (?, ?, ?)",
+                [(key, value, expires_at) for key, value in values.items()],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self.maybe_purge(conn)
+
+    def get_generations(self, tags: Sequence[str]) -> List[int]:
+        rows = dict(self.connection().execute(
+            f"SELECT tag, generation FROM generations WHERE tag IN ({','.join('?' * len(tags))})", tuple(tags)
+        )) if tags else {}
+        return [rows.get(tag, 0) for tag in tags]
+
+    def bump(self, tags: Sequence[str]):
+        self.connection().executemany(
+            "INSERT INTO generations (tag, generation) VALUES (?, 1) "
+            "ON CONFLICT (tag) DO UPDATE SET generation = generation + 1",
+            [(tag,) for tag in tags],
+        )
+
+    def clear(self):
+        conn = self.connection()
+        conn.execute("DELETE FROM entries")
+        conn.execute("DELETE FROM cache_values")
+
+
+def make_backend():
+    if CACHE_REDIS_URL:
+        try:
+            return RedisBackend(CACHE_REDIS_URL)
+        except ImportError:
+            logger.warning("⚠️  CACHE_REDIS_URL is set but the redis package is not installed; using in-process cache")
+    elif CACHE_SQLITE_PATH:
+        return SqliteBackend(CACHE_SQLITE_PATH)
+    return LocalBackend()
+
+
+class ResponseCache:
+    def __init__(self, backend=None, ttl: int = CACHE_TTL_SEC, enabled: bool = CACHE_ENABLED):
+        self.backend = backend or make_backend()
+        self.ttl = ttl
+        self.enabled = enabled
+
+    def key(self, request: Request, tags: Sequence[str]) -> str:
+        query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+        generations = ".".join(str(g) for g in self.backend.get_generations(tags))
+        return f"{KEY_PREFIX}:resp:{request.url.path}?{query}#{generations}"
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            # A cache outage must never fail the request
+            logger.warning("⚠️  Response cache read failed: %s", e)
+            return None
+
+    def set(self, key: str, body: bytes, etag: str):
+        try:
+            self.backend.set(key, body, etag, self.ttl)
+        except Exception as e:
+            logger.warning("⚠️  Response cache write failed: %s", e)
+
+    def invalidate(self, *tags: str):
+        """Call after writing to any of these tables."""
+        try:
+            self.backend.bump(tags)
+        except Exception as e:
+            logger.warning("⚠️  Response cache invalidation failed: %s", e)
+
+
+response_cache = ResponseCache()
+
+
+def invalidate(*tags: str):
+    response_cache.invalidate(*tags)
+
+
+class ValueCache:
+    """
+    Lookups that are expensive to repeat on every request (signed URLs, task
+    rows, worker names), kept as JSON on the response cache's backend under
+    their own namespace. Only found values are cached; a cache outage falls
+    back to loading.
+    """
+
+    def __init__(self, namespace: str, ttl: int, enabled: bool = CACHE_ENABLED):
+        self.prefix = f"{KEY_PREFIX}:val:{namespace}:"
+        self.ttl = ttl
+        self.enabled = enabled and ttl > 0
+
+    def get_many(self, keys: Iterable[str]) -> dict:
+        keys = list(keys)
+        if not self.enabled or not keys:
+            return {}
+        try:
+            values = response_cache.backend.get_values([self.prefix + key for key in keys])
+        except Exception as e:
+            logger.warning("⚠️  Value cache read failed: %s", e)
+            return {}
+        return {key: orjson.loads(value) for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, values: dict):
+        if not self.enabled or not values:
+            return
+        try:
+            response_cache.backend.set_values(
+                {self.prefix + key: orjson.dumps(value) for key, value in values.items()}, self.ttl
+            )
+        except Exception as e:
+            logger.warning("⚠️  Value cache write failed: %s", e)
+
+    def load_many(self, keys: Iterable[str], loader: Callable[[List[str]], dict]) -> dict:
+        """Values for `keys`; `loader(missing keys)` returns a dict for the ones not cached."""
+        keys = list(dict.fromkeys(keys))
+        found = self.get_many(keys)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            loaded = {key: value for key, value in loader(missing).items() if value is not None}
+            self.set_many(loaded)
+            found.update(loaded)
+        return found
+
+    def load(self, key: str, loader: Callable[[str], object]):
+        return self.load_many([key], lambda missing: {key: loader(key)}).get(key)
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    # If-None-Match uses weak comparison
+    return "*" in candidates or etag in (c[2:] if c.startswith("W/") else c for c in candidates)
+
+
+def etag_response(request: Request, body: bytes, etag: str, hit: bool) -> Response:
+    headers = {
+        "ETag": etag,
+        # Browsers keep the body but revalidate on every poll
+        "Cache-Control": "no-cache",
+        "X-Cache": "HIT" if hit else "MISS",
+    }
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def cached(*tags: str):
+    """
+    Cache a GET endpoint's JSON response, tagged with the tables it reads.
+    The endpoint gets a `request` parameter injected if it does not declare one.
+    """
+    def decorator(endpoint):
+        signature = inspect.signature(endpoint)
+        wants_request = "request" in signature.parameters
+
+        @wraps(endpoint)
+        async def wrapper(*args, request: Request, **kwargs):
+            if wants_request:
+                kwargs["request"] = request
+            if not response_cache.enabled:
+                return await endpoint(*args, **kwargs)
+
+            key = response_cache.key(request, tags)
+            entry = response_cache.get(key)
+            if entry is not None:
+                return etag_response(request, *entry, hit=True)
+
+            body = dumps(await endpoint(*args, **kwargs))
+            etag = make_etag(body)
+            response_cache.set(key, body, etag)
+            return etag_response(request, body, etag, hit=False)
+
+        if not wants_request:
+            parameters = list(signature.parameters.values()) + [
+                inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+            ]
+            wrapper.__signature__ = signature.replace(parameters=parameters)
+        return wrapper
+    return decorator
@@ -0,0 +1,108 @@
+"""
+Lazily created clients for external services.
+
+Importing the Supabase SDK (httpx, gotrue, postgrest, storage3) takes a
+few hundred milliseconds, and creating a client opens
+nothing useful until the first call anyway. `Lazy` stands in for such a
+client at module level and builds it on first attribute access, so a cold
+worker starts serving sooner and only pays for the services it uses.
+GET /ready (main.py) forces creation and warms the connections before a
+load balancer routes traffic to the worker.
+
+Outbound HTTP goes through one connection pool per service (`http_pool`),
+shared by every request in the process: connections are kept alive
+between calls and HTTP/2 multiplexes concurrent calls over one of them, so
+a TLS handshake is paid once per connection rather than once per call.
+PostgREST and Storage live on the same host and share the "supabase" pool.
+"""
+
+import os
+import importlib.util
+import logging
+import threading
+from typing import Callable, Optional
+
+import telemetry
+
+HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "20"))
+HTTP_POOL_MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", str(HTTP_POOL_MAX_CONNECTIONS)))
+HTTP_KEEPALIVE_SEC = float(os.getenv("HTTP_KEEPALIVE_SEC", "60"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+
+logger = logging.getLogger(__name__)
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class Lazy:
+    """
+    Proxy that creates the wrapped object on first use, exactly once even
+    when several threads get there together. `bool(lazy)` tells whether it
+    can be created (e.g. credentials are configured) without creating it.
+    """
+
+    def __init__(self, factory: Callable, configured: bool = True):
+        self._factory = factory
+        self._configured = configured
+        self._lock = threading.Lock()
+        self._value = None
+
+    def get(self):
+        value = self._value
+        if value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = self._factory()
+                value = self._value
+        return value
+
+    @property
+    def created(self) -> bool:
+        return self._value is not None
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+    def __bool__(self):
+        return self._configured
+
+
+def http2_available() -> bool:
+    if not HTTP2_ENABLED:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("⚠️  HTTP2_ENABLED but the h2 package is not installed; using HTTP/1.1 (pip install h2)")
+        return False
+    return True
+
+
+def new_pool(name: str, http2: Optional[bool] = None, max_connections: int = HTTP_POOL_MAX_CONNECTIONS):
+    """A metered httpx transport with the configured limits (http2=None: HTTP2_ENABLED)."""
+    import httpx
+
+    transport = httpx.HTTPTransport(
+        http2=http2_available() if http2 is None else http2,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=min(HTTP_POOL_MAX_KEEPALIVE, max_connections),
+            keepalive_expiry=HTTP_KEEPALIVE_SEC,
+        ),
+    )
+    return telemetry.MeteredPool(name, transport, max_connections)
+
+
+def http_pool(name: str):
+    """The process-wide connection pool (an httpx transport) for one service."""
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = _pools[name] = new_pool(name)
+        return pool
+
+
+def pool_supabase(client):
+    """Send `client`'s PostgREST and Storage requests through the shared "supabase" pool."""
+    pool = http_pool("supabase")
+    for session in (client.postgrest.session, client.storage.session):
+        session._transport = pool
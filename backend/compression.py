@@ -0,0 +1,194 @@
+"""
+Response compression (brotli or gzip) for large JSON payloads.
+
+Listing responses are dominated by repeated keys and compress 10-20x, which
+matters for labs on slow links. The middleware negotiates Accept-Encoding
+(brotli if the `brotli` package is installed, else gzip), leaves small
+bodies alone and never touches content that is already compressed or must
+stay byte-addressable: media, ZIP/NPZ downloads, range responses and the
+Server-Sent Events stream.
+
+Defaults come from COMPRESSION_MIN_BYTES, COMPRESSION_GZIP_LEVEL and
+COMPRESSION_BROTLI_QUALITY; individual endpoints override them with the
+`compression(...)` decorator.
+"""
+
+import os
+import gzip
+import io
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+# Quality 4 compresses JSON better than gzip -6 at a similar speed
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+# Content types that are compressed already or must be served byte-for-byte
+EXCLUDED_CONTENT_TYPES = (
+    "video/",
+    "image/",
+    "audio/",
+    "application/zip",
+    "application/gzip",
+    "application/octet-stream",
+    "text/event-stream",
+)
+
+
+@dataclass(frozen=True)
+class CompressionSettings:
+    enabled: bool = True
+    minimum_size: int = COMPRESSION_MIN_BYTES
+    gzip_level: int = COMPRESSION_GZIP_LEVEL
+    brotli_quality: int = COMPRESSION_BROTLI_QUALITY
+
+
+DEFAULT_SETTINGS = CompressionSettings(enabled=COMPRESSION_ENABLED)
+
+
+def compression(**overrides):
+    """
+    Per-endpoint compression settings, e.g. @compression(gzip_level=1) for
+    large numeric payloads or @compression(enabled=False).
+    Place it directly under the route decorator.
+    """
+    settings = replace(DEFAULT_SETTINGS, **overrides)
+
+    def decorator(endpoint):
+        endpoint.__compression__ = settings
+        return endpoint
+    return decorator
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Pick "br" or "gzip" from an Accept-Encoding header, or None."""
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class StreamCompressor:
+    """Incremental brotli/gzip compressor with the same interface for both."""
+
+    def __init__(self, encoding: str, settings: CompressionSettings):
+        self.encoding = encoding
+        if encoding == "br":
+            self.compressor = brotli.Compressor(quality=settings.brotli_quality, mode=brotli.MODE_TEXT)
+        else:
+            self.buffer = io.BytesIO()
+            self.compressor = gzip.GzipFile(mode="wb", fileobj=self.buffer, compresslevel=settings.gzip_level)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            out = self.compressor.process(data)
+            return out + (self.compressor.finish() if final else self.compressor.flush())
+        self.compressor.write(data)
+        if final:
+            self.compressor.close()
+        else:
+            self.compressor.flush()
+        out = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return out
+
+
+class CompressionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await CompressionResponder(self.app, scope, encoding)(receive, send)
+
+
+class CompressionResponder:
+    def __init__(self, app, scope, encoding: str):
+        self.app = app
+        self.scope = scope
+        self.encoding = encoding
+        self.send = None
+        self.initial_message = None
+        self.started = False
+        self.compressor: Optional[StreamCompressor] = None
+
+    async def __call__(self, receive, send):
+        self.send = send
+        await self.app(self.scope, receive, self.send_with_compression)
+
+    def settings(self) -> CompressionSettings:
+        # The router stores the matched endpoint in the (shared) scope
+        return getattr(self.scope.get("endpoint"), "__compression__", DEFAULT_SETTINGS)
+
+    def should_compress(self, headers: MutableHeaders, settings: CompressionSettings) -> bool:
+        if not settings.enabled or self.initial_message["status"] not in (200, 201):
+            return False
+        if "content-encoding" in headers or "content-range" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return not content_type.startswith(EXCLUDED_CONTENT_TYPES)
+
+    async def send_with_compression(self, message):
+        if message["type"] == "http.response.start":
+            # Hold the headers until the first body chunk shows the size
+            self.initial_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            settings = self.settings()
+            if not self.should_compress(headers, settings) or (not more_body and len(body) < settings.minimum_size):
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+
+            self.compressor = StreamCompressor(self.encoding, settings)
+            body = self.compressor.compress(body, final=not more_body)
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "etag" in headers and not headers["etag"].startswith("W/"):
+                # The compressed bytes differ from the identity representation
+                headers["ETag"] = "W/" + headers["etag"]
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(body))
+            await self.send(self.initial_message)
+            await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        if self.compressor is None:
+            await self.send(message)
+            return
+        body = self.compressor.compress(body, final=not more_body)
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
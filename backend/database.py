@@ -0,0 +1,188 @@
+"""
+Direct Postgres reads for the heavy queries.
+
+Every other query goes through PostgREST: an HTTP hop, rows rendered as
+JSON by Postgres and parsed again here. With DIRECT_READS=true and
+DATABASE_URL set (needs the `asyncpg` package), a pool of Postgres
+connections serves the endpoints that read many rows instead:
+
+- dataset stats are aggregated in SQL, so only the totals come back
+- export selects accepted episodes, and accepted fixes with a subquery
+- lab episode listings
+
+asyncpg prepares each statement once per connection and decodes rows from
+Postgres' binary format; the rows are serialized once, straight into the
+response. Simple CRUD stays on PostgREST.
+
+Behind PgBouncer/Supavisor in transaction mode prepared statements do not
+survive between transactions; set DB_STATEMENT_CACHE_SIZE=0 there, or use
+the direct or session-mode connection string.
+"""
+
+import os
+import logging
+from typing import List, Optional, Tuple
+
+import orjson
+
+from telemetry import span
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+DIRECT_READS = os.getenv("DIRECT_READS", "false").lower() == "true"
+# Connections per API worker
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "5"))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+DB_COMMAND_TIMEOUT_SEC = float(os.getenv("DB_COMMAND_TIMEOUT_SEC", "60"))
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+
+
+def enabled() -> bool:
+    return _pool is not None
+
+
+async def _init_connection(connection):
+    # Same values PostgREST would return: ids as strings, JSON columns decoded
+    await connection.set_type_codec("uuid", schema="pg_catalog", encoder=str, decoder=str, format="text")
+    for name in ("json", "jsonb"):
+        await connection.set_type_codec(
+            name,
+            schema="pg_catalog",
+            encoder=lambda value: orjson.dumps(value).decode(),
+            decoder=orjson.loads,
+            format="text",
+        )
+
+
+async def connect(dsn: Optional[str] = DATABASE_URL):
+    """Open the pool if DIRECT_READS is on; on failure the reads stay on PostgREST."""
+    global _pool
+    if not DIRECT_READS or _pool is not None:
+        return
+    if not dsn:
+        logger.warning("⚠️  DIRECT_READS is set but DATABASE_URL is not; reads stay on PostgREST")
+        return
+    try:
+        import asyncpg
+    except ImportError:
+        logger.warning("⚠️  DIRECT_READS is set but asyncpg is not installed; reads stay on PostgREST")
+        return
+    try:
+        _pool = await asyncpg.create_pool(
+            dsn,
+            min_size=DB_POOL_MIN_SIZE,
+            max_size=DB_POOL_MAX_SIZE,
+            statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+            command_timeout=DB_COMMAND_TIMEOUT_SEC,
+            init=_init_connection,
+        )
+        logger.info("✅ Direct Postgres reads enabled (pool of up to %d connections)", DB_POOL_MAX_SIZE)
+    except Exception:
+        logger.exception("❌ Could not connect to DATABASE_URL; reads stay on PostgREST")
+
+
+async def close():
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.close()
+
+
+async def fetch(operation: str, sql: str, *args) -> List[dict]:
+    with span("postgres", operation):
+        rows = await _pool.fetch(sql, *args)
+    return [dict(row) for row in rows]
+
+
+async def ping():
+    with span("postgres", "ping"):
+        await _pool.fetchval("SELECT 1")
+
+
+def _where(task_id: str, lab_id: Optional[str]) -> Tuple[str, list]:
+    # Separate statements with and without the lab, each planned for its indexes
+    if lab_id:
+        return "task_id = $1 AND lab_id = $2::uuid", [task_id, lab_id]
+    return "task_id = $1", [task_id]
+
+
+async def dataset_stats(task_id: str, lab_id: Optional[str] = None) -> dict:
+    """GET /api/dataset/stats, computed by Postgres."""
+    where, args = _where(task_id, lab_id)
+    episodes, = await fetch("dataset_stats", f"""
+        SELECT count(*) AS total_episodes,
+               count(*) FILTER (WHERE edge_case) AS edge_cases,
+               count(*) FILTER (WHERE accepted) AS accepted_episodes,
+               coalesce(avg(nullif(quality_score, 0)), 0)::float8 AS average_quality_score
+        FROM episodes
+        WHERE {where}
+    """, *args)
+    jobs, = await fetch("dataset_stats", f"""
+        SELECT count(*) FILTER (WHERE fix_episode_id IS NOT NULL) AS fixes_submitted,
+               count(*) FILTER (WHERE status = 'accepted') AS fixes_accepted
+        FROM jobs
+        WHERE {where}
+    """, *args)
+    reasons = await fetch("dataset_stats", f"""
+        SELECT failure_reason AS reason, count(*) AS count
+        FROM episodes
+        WHERE {where} AND failure_reason <> ''
+        GROUP BY failure_reason
+        ORDER BY count DESC, failure_reason
+        LIMIT 5
+    """, *args)
+
+    total = episodes["total_episodes"]
+    acceptance_rate = episodes["accepted_episodes"] / total * 100 if total else 0
+    return {
+        "task_id": task_id,
+        "total_episodes": total,
+        "edge_cases": episodes["edge_cases"],
+        "fixes_submitted": jobs["fixes_submitted"],
+        "fixes_accepted": jobs["fixes_accepted"],
+        "accepted_episodes": episodes["accepted_episodes"],
+        "acceptance_rate": round(acceptance_rate, 1),
+        "average_quality_score": round(episodes["average_quality_score"], 1),
+        "top_failure_reasons": reasons,
+    }
+
+
+async def export_selection(task_id: str, columns: str) -> Tuple[List[dict], List[dict]]:
+    """(accepted episodes, accepted fixes) of a task, for GET /api/export."""
+    episodes = await fetch(
+        "export_episodes",
+        f"SELECT {columns} FROM episodes WHERE task_id = $1 AND accepted",
+        task_id,
+    )
+    fixes = await fetch(
+        "export_fixes",
+        f"""
+        SELECT {columns} FROM episodes
+        WHERE id IN (SELECT fix_episode_id FROM jobs WHERE task_id = $1 AND status = 'accepted')
+        """,
+        task_id,
+    )
+    return episodes, fixes
+
+
+async def lab_episodes(
+    lab_id: str,
+    columns: str,
+    accepted: Optional[bool] = None,
+    edge_case: Optional[bool] = None,
+    task_id: Optional[str] = None,
+) -> List[dict]:
+    """GET /api/labs/{id}/episodes; `columns` is a validated select_fields() list."""
+    conditions, args = ["lab_id = $1::uuid"], [lab_id]
+    for column, value in (("accepted", accepted), ("edge_case", edge_case), ("task_id", task_id)):
+        if value is not None:
+            args.append(value)
+            conditions.append(f"{column} = ${len(args)}")
+    return await fetch(
+        "lab_episodes",
+        f"SELECT {columns} FROM episodes WHERE {' AND '.join(conditions)} ORDER BY created_at DESC",
+        *args,
+    )
@@ -0,0 +1,226 @@
+"""
+Signal-based edge-case detection on trajectory arrays.
+
+Each detector looks at one kind of signal (a field, or its velocity, jerk,
+...), smooths its per-step magnitude with a rolling mean and fires at the
+first step where it exceeds a threshold. Everything is vectorized with
+NumPy, so a 10-minute 500 Hz episode takes milliseconds.
+
+Thresholds are in the units of the recorded field, per second for each
+derivative, applied to the L2 norm over the field's columns (joints): a
+`joint_pos` velocity limit of 3.0 means 3 rad/s summed in quadrature over
+all joints. Gripper slip is measured relative to the gripper's own travel
+in the episode instead, so it does not depend on the gripper's units.
+"""
+
+from dataclasses import dataclass, asdict
+from typing import Optional, Mapping, Sequence, Tuple, List, Union
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Detector:
+    """
+    failure_reason: Reported when the detector fires.
+    fields: Candidate field names; the first one present in the trajectory is used.
+    derivative: 0 = the value itself, 1 = velocity, 2 = acceleration, 3 = jerk.
+    threshold: Limit on the smoothed magnitude (field units per second^derivative).
+    window_sec: Rolling-mean window used to ignore single-sample noise.
+    """
+
+    failure_reason: str
+    fields: Tuple[str, ...]
+    derivative: int
+    threshold: float
+    window_sec: float = 0.05
+
+    def find(self, arrays: Mapping[str, np.ndarray], hz: float) -> Optional["Detection"]:
+        return _first_crossing(arrays, hz, self)
+
+
+@dataclass(frozen=True)
+class GripperSlip:
+    """
+    The gripper position changing while it holds something.
+
+    The gripper holds once it has been still for `settle_sec` away from
+    where it started the episode (where it is open). From then on, slip is
+    the position moving more than `slip_travel` further closed (the object
+    slid out), or with a command field, moving that far either way while
+    the command stays put. Opening back towards the start position without
+    a command, or any movement after the command changes, is a release and
+    ends the hold. Travel and speed are fractions of the gripper's range in
+    the episode (range per second for the speed); a gripper whose range is
+    under `min_snr` times its sensor noise never moved and is skipped.
+    """
+
+    failure_reason: str = "gripper_slip"
+    fields: Tuple[str, ...] = ("gripper", "gripper_pos")
+    command_fields: Tuple[str, ...] = ("gripper_cmd", "gripper_command", "gripper_target")
+    settle_sec: float = 0.3
+    still_speed: float = 0.2
+    hold_travel: float = 0.2
+    slip_travel: float = 0.1
+    min_snr: float = 10.0
+    window_sec: float = 0.05
+
+    def find(self, arrays: Mapping[str, np.ndarray], hz: float) -> Optional["Detection"]:
+        return _first_slip(arrays, hz, self)
+
+
+@dataclass
+class Detection:
+    failure_reason: str
+    failure_time_sec: float
+    field: str
+    peak: float
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+DEFAULT_DETECTORS: Tuple[Union[Detector, GripperSlip], ...] = (
+    # N·m (or N for force/wrench)
+    Detector("collision_spike", ("effort", "torque", "joint_effort", "force", "wrench"), 0, 50.0, 0.02),
+    GripperSlip(),
+    # rad/s
+    Detector("velocity_limit", ("joint_vel",), 0, 3.0, 0.05),
+    Detector("velocity_limit", ("joint_pos", "qpos"), 1, 3.0, 0.05),
+    # rad/s^3
+    Detector("jerk_spike", ("joint_pos", "qpos"), 3, 5000.0, 0.1),
+)
+
+
+def magnitude(array: np.ndarray) -> np.ndarray:
+    """Per-step L2 norm over the non-time dimensions."""
+    if array.ndim == 1:
+        return np.abs(array)
+    return np.sqrt(np.einsum("ij,ij->i", array, array))
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Rolling mean along axis 0 over full windows only: output[i] averages
+    values[i : i + window], so the output is window - 1 rows shorter.
+    """
+    if window <= 1 or values.shape[0] < window:
+        return values
+    cumsum = np.cumsum(values, axis=0, dtype=np.float64)
+    out = cumsum[window - 1:].copy()
+    out[1:] -= cumsum[:-window]
+    out /= window
+    return out
+
+
+def derivative(array: np.ndarray, hz: float, order: int, window: int = 1) -> np.ndarray:
+    """
+    order-th derivative in per-second units. The signal is smoothed before
+    every difference, otherwise sensor noise dominates jerk and acceleration.
+    """
+    for _ in range(order):
+        array = np.diff(rolling_mean(array, window), axis=0) * hz
+    return array
+
+
+def _first_crossing(arrays: Mapping[str, np.ndarray], hz: float, detector: Detector) -> Optional[Detection]:
+    field = next((f for f in detector.fields if f in arrays), None)
+    if field is None or arrays[field].shape[0] <= detector.derivative:
+        return None
+
+    window = max(1, int(round(detector.window_sec * hz)))
+    signal = magnitude(derivative(np.asarray(arrays[field], dtype=np.float32), hz, detector.derivative, window))
+    smoothed = rolling_mean(signal, window)
+    above = smoothed > detector.threshold
+    index = int(np.argmax(above))
+    if not above[index]:
+        return None
+
+    # Map back to a step of the original signal: every rolling mean centers
+    # its output (window - 1) / 2 steps later and every difference half a step
+    step = index + detector.derivative * (window / 2) + (window - 1) / 2
+    return Detection(
+        failure_reason=detector.failure_reason,
+        failure_time_sec=round(step / hz, 3),
+        field=field,
+        peak=float(smoothed.max()),
+    )
+
+
+def _first_slip(arrays: Mapping[str, np.ndarray], hz: float, detector: GripperSlip) -> Optional[Detection]:
+    field = next((f for f in detector.fields if f in arrays), None)
+    if field is None:
+        return None
+    command_field = next((f for f in detector.command_fields if f in arrays), None)
+
+    def as_1d(name: str) -> np.ndarray:
+        # Several fingers: follow their mean opening
+        values = np.asarray(arrays[name], dtype=np.float32)
+        if values.ndim > 1:
+            values = values.reshape(values.shape[0], -1).mean(axis=1)
+        return values
+
+    window = max(1, int(round(detector.window_sec * hz)))
+    settle = max(1, int(round(detector.settle_sec * hz)))
+    raw = as_1d(field)
+    position = rolling_mean(raw, window)
+    if position.shape[0] <= settle + 1:
+        return None
+    # A gripper that never really moved has only sensor noise for a range
+    offset = (window - 1) // 2
+    noise = float(np.std(raw[offset:offset + position.shape[0]] - position))
+    travel = float(position.max() - position.min())
+    if travel <= detector.min_snr * noise or travel <= 0:
+        return None
+    command = rolling_mean(as_1d(command_field), window) if command_field else None
+    command_travel = float(command.max() - command.min()) if command is not None else 0.0
+
+    # settled[i]: still for the `settle` steps before step i
+    still = np.abs(np.diff(position)) * hz < detector.still_speed * travel
+    still_run = rolling_mean(still.astype(np.float32), settle)
+    settled = np.zeros(position.shape[0], dtype=bool)
+    settled[settle:] = still_run >= 1.0
+    # Closing moves away from the open start position
+    closing = np.sign(position - position[0])
+    settled &= np.abs(position - position[0]) > detector.hold_travel * travel
+
+    start = 0
+    while True:
+        candidates = np.flatnonzero(settled[start:])
+        if candidates.size == 0:
+            return None
+        hold = start + int(candidates[0])
+        moved = (position[hold:] - position[hold]) * closing[hold] / travel
+        if command is not None:
+            released = np.abs(command[hold:] - command[hold]) > detector.slip_travel * command_travel
+            slipped = np.abs(moved) > detector.slip_travel
+        else:
+            released = moved < -detector.slip_travel
+            slipped = moved > detector.slip_travel
+        end = int(np.argmax(released)) if released.any() else moved.shape[0]
+        if slipped[:end].any():
+            index = hold + int(np.argmax(slipped[:end]))
+            break
+        start = hold + end
+        if start >= position.shape[0]:
+            return None
+
+    return Detection(
+        failure_reason=detector.failure_reason,
+        failure_time_sec=round((index + (window - 1) / 2) / hz, 3),
+        field=field,
+        peak=round(float(np.abs(moved[:end]).max()), 3),
+    )
+
+
+def detect(
+    arrays: Mapping[str, np.ndarray],
+    hz: float,
+    detectors: Sequence[Union[Detector, GripperSlip]] = DEFAULT_DETECTORS,
+) -> Optional[Detection]:
+    """Run all detectors; return the earliest detection, or None if the episode looks clean."""
+    detections: List[Detection] = [
+        d for d in (detector.find(arrays, hz) for detector in detectors) if d
+    ]
+    if not detections:
+        return None
+    return min(detections, key=lambda d: d.failure_time_sec)
@@ -1,24 +1,23 @@
 """
 Email service using Resend API.
 Handles transactional emails with error handling and rate limiting protection.
+
+Emails are posted to the Resend API directly over the shared "resend"
+connection pool (clients.py). The resend SDK sends each call with
+`requests.request`, a new connection and TLS handshake every time.
 """
 
 import os
 import logging
 from typing import Optional
 from dotenv import load_dotenv
-from resend import Emails
-from email_templates import (
-    waitlist_welcome,
-    lab_request_confirmation,
-    lab_request_admin_notification,
-)
+from clients import Lazy, http_pool
+from telemetry import span
 
 # Load environment variables (in case this module is imported before main.py loads .env)
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Handlers and levels are configured by the app (logs.setup_logging)
 logger = logging.getLogger(__name__)
 
 # Environment variables
@@ -27,10 +26,51 @@ EMAIL_FROM = os.getenv("EMAIL_FROM", "Universal Motion Model <onboarding@resend.
 EMAIL_ADMIN_TO = os.getenv("EMAIL_ADMIN_TO")
 EMAIL_REPLY_TO = os.getenv("EMAIL_REPLY_TO")
 EMAIL_ENABLED = os.getenv("EMAIL_ENABLED", "true").lower() == "true"
+RESEND_API_URL = os.getenv("RESEND_API_URL", "https://api.resend.com")
+EMAIL_TIMEOUT_SEC = float(os.getenv("EMAIL_TIMEOUT_SEC", "10"))
+
+
+class EmailError(Exception):
+    pass
+
+
+class ResendClient:
+    """The one Resend call we make (POST /emails), on the pooled connections."""
+
+    def __init__(self):
+        import httpx
+
+        self.session = httpx.Client(
+            base_url=RESEND_API_URL,
+            headers={"Authorization": f"Bearer {RESEND_API_KEY}"},
+            transport=http_pool("resend"),
+            timeout=EMAIL_TIMEOUT_SEC,
+        )
+
+    def send(self, params: dict) -> dict:
+        response = self.session.post("/emails", json=params)
+        if response.is_error:
+            try:
+                message = response.json().get("message")
+            except ValueError:
+                message = None
+            raise EmailError(f"Resend API {response.status_code}: {message or response.text[:200]}")
+        return response.json()
+
+    def connect(self):
+        # Any answer means a pooled connection is open; the status doesn't matter
+        self.session.head("/")
+
+
+# Created when the first email goes out (httpx is imported then)
+resend_emails = Lazy(ResendClient, configured=bool(RESEND_API_KEY))
+
+
+def warm_email_client():
+    """Open a connection to Resend ahead of the first send (used by GET /ready)."""
+    if resend_emails and EMAIL_ENABLED:
+        resend_emails.connect()
 
-# Set Resend API key in environment (required by resend package)
-if RESEND_API_KEY:
-    os.environ["RESEND_API_KEY"] = RESEND_API_KEY
 
 # Initialize Resend client status
 if RESEND_API_KEY and EMAIL_ENABLED:
@@ -63,17 +103,17 @@ def send_email(
     """
     # If email is disabled, log and return success (don't fail the request)
     if not EMAIL_ENABLED:
-        logger.info(f"📧 Email disabled - would send to {to}: {subject}")
+        logger.info("📧 Email disabled - would send to %s: %s", to, subject)
         return True
     
     # Check if API key is configured
     if not RESEND_API_KEY:
-        logger.error(f"❌ Cannot send email: RESEND_API_KEY not set")
+        logger.error("❌ Cannot send email: RESEND_API_KEY not set")
         return False
     
     # Validate required fields
     if not to or not subject or not html:
-        logger.error(f"❌ Cannot send email: missing required fields (to, subject, or html)")
+        logger.error("❌ Cannot send email: missing required fields (to, subject, or html)")
         return False
     
     try:
@@ -93,37 +133,40 @@ def send_email(
         elif EMAIL_REPLY_TO:
             params["reply_to"] = EMAIL_REPLY_TO
         
-        # Send email using Emails.send() class method
-        response = Emails.send(params)
+        with span("email", "send"):
+            response = resend_emails.send(params)
         
         # Log success
-        logger.info(f"✅ Email sent to {to}: {subject} (ID: {response.get('id', 'unknown')})")
+        logger.info("✅ Email sent to %s: %s (ID: %s)", to, subject, response.get("id", "unknown"))
         return True
         
     except Exception as e:
         # Log error but don't crash
         error_msg = str(e)
-        logger.error(f"❌ Failed to send email to {to}: {error_msg}")
+        logger.error("❌ Failed to send email to %s: %s", to, error_msg, exc_info=logger.isEnabledFor(logging.DEBUG))
         
         # Check for Resend domain verification error
         if "only send testing emails to your own email" in error_msg.lower():
-            logger.warning(f"⚠️  Resend restriction: Can only send to verified email with default domain")
-            logger.warning(f"   To send to {to}, verify a domain at https://resend.com/domains")
-            logger.warning(f"   Or use your verified email ({EMAIL_ADMIN_TO}) for testing")
+            logger.warning(
+                "⚠️  Resend restriction: can only send to a verified email with the default domain. "
+                "To send to %s, verify a domain at https://resend.com/domains "
+                "or use your verified email (%s) for testing",
+                to, EMAIL_ADMIN_TO,
+            )
         
-        import traceback
-        logger.debug(traceback.format_exc())
         return False
 
 
 def send_waitlist_welcome(email: str, name: Optional[str] = None) -> bool:
     """Send welcome email to waitlist signup."""
+    from email_templates import waitlist_welcome
     subject, html = waitlist_welcome(name=name, email=email)
     return send_email(to=email, subject=subject, html=html)
 
 
 def send_lab_request_confirmation(email: str, name: Optional[str] = None, org: Optional[str] = None) -> bool:
     """Send confirmation email to lab requester."""
+    from email_templates import lab_request_confirmation
     subject, html = lab_request_confirmation(name=name, org=org)
     return send_email(to=email, subject=subject, html=html)
 
@@ -134,6 +177,7 @@ def send_lab_request_admin_notification(payload: dict) -> bool:
         logger.warning("⚠️  EMAIL_ADMIN_TO not set, skipping admin notification")
         return False
     
+    from email_templates import lab_request_admin_notification
     subject, html = lab_request_admin_notification(payload)
     return send_email(to=EMAIL_ADMIN_TO, subject=subject, html=html)
 
@@ -0,0 +1,208 @@
+"""
+Live job updates for the fix queue.
+
+Job inserts and status changes are published to subscribers that hold an
+open Server-Sent Events connection (GET /api/jobs/events), filtered by lab,
+task and status, so the queue UI never has to re-fetch GET /api/jobs.
+
+Two feeds:
+- In-process (default): the endpoints that write jobs call `publish`.
+  Subscribers only see changes made through the same API process.
+- Postgres LISTEN/NOTIFY: with DATABASE_URL set (needs the `asyncpg`
+  package), a trigger on jobs (migration 009) notifies every API process of
+  every change, including ones made by rescoring or directly in SQL. Local
+  publishing is then switched off so nothing is delivered twice.
+"""
+
+import os
+import json
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Optional, Set, FrozenSet, AsyncIterator
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+NOTIFY_CHANNEL = "job_events"
+HEARTBEAT_SEC = 15.0
+SUBSCRIBER_QUEUE_SIZE = 256
+
+logger = logging.getLogger(__name__)
+
+# Columns sent with every event (same names as the jobs table)
+JOB_EVENT_FIELDS = (
+    "id",
+    "task_id",
+    "lab_id",
+    "episode_id",
+    "status",
+    "claimed_by_worker_id",
+    "fix_episode_id",
+    "updated_at",
+)
+
+
+@dataclass(frozen=True)
+class JobFilter:
+    lab_id: Optional[str] = None
+    task_id: Optional[str] = None
+    statuses: Optional[FrozenSet[str]] = None
+
+    @classmethod
+    def from_query(cls, lab_id: Optional[str], task_id: Optional[str], status: Optional[str]) -> "JobFilter":
+        statuses = frozenset(s.strip() for s in status.split(",") if s.strip()) if status else None
+        return cls(lab_id=lab_id, task_id=task_id, statuses=statuses or None)
+
+    def matches(self, event: dict) -> bool:
+        job = event["job"]
+        if self.lab_id and job.get("lab_id") != self.lab_id:
+            return False
+        if self.task_id and job.get("task_id") != self.task_id:
+            return False
+        if self.statuses:
+            # A job leaving a watched status is news too (e.g. open -> claimed)
+            previous = event.get("previous_status")
+            return job.get("status") in self.statuses or previous in self.statuses
+        return True
+
+
+def job_event(kind: str, job: dict, previous_status: Optional[str] = None) -> dict:
+    return {
+        "type": kind,
+        "job": {field: job.get(field) for field in JOB_EVENT_FIELDS},
+        "previous_status": previous_status,
+    }
+
+
+class JobEventBus:
+    def __init__(self):
+        self.subscribers: Set["Subscription"] = set()
+        self.lock = threading.Lock()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.listening = False
+        self._listener = None
+
+    def subscribe(self, job_filter: JobFilter) -> "Subscription":
+        self.loop = asyncio.get_running_loop()
+        subscription = Subscription(self, job_filter)
+        with self.lock:
+            self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: "Subscription"):
+        with self.lock:
+            self.subscribers.discard(subscription)
+
+    def dispatch(self, event: dict):
+        """Deliver an event to matching subscribers. Must run on the event loop."""
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscription in subscribers:
+            if subscription.job_filter.matches(event):
+                subscription.put(event)
+
+    def publish(self, kind: str, job: dict, previous_status: Optional[str] = None):
+        """
+        Announce a job insert ("insert") or change ("update"). Safe to call
+        from request handlers and from background threads.
+        """
+        if self.listening or not self.subscribers or self.loop is None:
+            return
+        event = job_event(kind, job, previous_status)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self.dispatch(event)
+        else:
+            self.loop.call_soon_threadsafe(self.dispatch, event)
+
+    async def start_listener(self, dsn: Optional[str] = DATABASE_URL):
+        """Switch to the Postgres LISTEN/NOTIFY feed if DATABASE_URL is configured."""
+        if not dsn:
+            return
+        try:
+            import asyncpg
+        except ImportError:
+            logger.warning("⚠️  DATABASE_URL is set but asyncpg is not installed; job events stay in-process")
+            return
+        try:
+            self.loop = asyncio.get_running_loop()
+            self._listener = await asyncpg.connect(dsn)
+            await self._listener.add_listener(NOTIFY_CHANNEL, self._on_notify)
+            self.listening = True
+            logger.info("📡 Listening for job events on channel %s", NOTIFY_CHANNEL)
+        except Exception as e:
+            logger.warning("⚠️  Could not LISTEN for job events, staying in-process: %s", e)
+
+    async def stop_listener(self):
+        if self._listener is not None:
+            await self._listener.close()
+            self._listener = None
+        self.listening = False
+
+    def close_streams(self):
+        """End every SSE stream (on shutdown); EventSource clients reconnect by themselves."""
+        if self.loop is None:
+            return
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscription in subscribers:
+            self.loop.call_soon_threadsafe(subscription.end)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            return
+        self.dispatch(job_event(event.get("type", "update"), event["job"], event.get("previous_status")))
+
+
+class Subscription:
+    def __init__(self, bus: JobEventBus, job_filter: JobFilter):
+        self.bus = bus
+        self.job_filter = job_filter
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def put(self, event: dict):
+        if self.queue.full():
+            # Slow client: drop the oldest event and tell it to resync
+            self.queue.get_nowait()
+            event = {"type": "resync"}
+        self.queue.put_nowait(event)
+
+    def end(self):
+        # None tells stream() to finish
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+job_events = JobEventBus()
+
+
+def format_sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+async def stream(subscription: Subscription, is_disconnected) -> AsyncIterator[str]:
+    """SSE body for one subscriber: events as they arrive, comments as heartbeats."""
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=HEARTBEAT_SEC)
+                if event is None:
+                    return
+                yield format_sse(event)
+            except asyncio.TimeoutError:
+                if await is_disconnected():
+                    return
+                # Keeps proxies from closing an idle connection
+                yield ": keepalive\n\n"
+    finally:
+        subscription.close()
@@ -0,0 +1,43 @@
+"""
+Graceful shutdown (drain) state.
+
+When a worker is told to stop (SIGTERM/SIGINT), serve.py calls
+`begin_drain()` just before uvicorn stops accepting connections. Callbacks
+registered with `on_drain` run right away: Server-Sent Event streams end so
+their clients reconnect to a worker that is staying up. While draining,
+/ready answers 503 and new exports are refused, and uvicorn waits up to
+DRAIN_TIMEOUT_SEC for in-flight requests (exports included) to finish.
+"""
+
+import os
+import logging
+import threading
+from typing import Callable, List
+
+DRAIN_TIMEOUT_SEC = int(os.getenv("DRAIN_TIMEOUT_SEC", "300"))
+
+logger = logging.getLogger(__name__)
+
+_draining = threading.Event()
+_callbacks: List[Callable[[], None]] = []
+
+
+def on_drain(callback: Callable[[], None]) -> Callable[[], None]:
+    _callbacks.append(callback)
+    return callback
+
+
+def draining() -> bool:
+    return _draining.is_set()
+
+
+def begin_drain():
+    if _draining.is_set():
+        return
+    _draining.set()
+    logger.info("🛑 Draining: finishing in-flight requests (up to %ss)", DRAIN_TIMEOUT_SEC)
+    for callback in _callbacks:
+        try:
+            callback()
+        except Exception:
+            logger.exception("Drain callback failed")
@@ -0,0 +1,222 @@
+"""
+Logging setup: JSON lines through a background thread, tagged with the
+request id, with repeated warnings and errors sampled.
+
+Loggers only put records on a bounded queue; one listener thread formats
+(including tracebacks) and writes them, so a slow stdout never blocks a
+request. If the queue is full the record is dropped and counted, and the
+next record that gets through carries `dropped`.
+
+During an outage the same error repeats on every request. Per logger and
+error class (exception type, or the message template), the first
+LOG_ERROR_BURST warnings/errors per LOG_ERROR_WINDOW_SEC are logged, then
+one in LOG_ERROR_SAMPLE; the next record logged for that class carries
+`suppressed`, the number skipped. Pass values as logger arguments
+(`logger.error("Upload failed for %s", path)`), not f-strings, so the
+template stays the same across calls.
+
+LOG_FORMAT=text gives human-readable lines (scripts use it), LOG_LEVEL
+sets the level (INFO).
+"""
+
+import os
+import sys
+import time
+import uuid
+import queue
+import atexit
+import logging
+import logging.handlers
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_ERROR_BURST = int(os.getenv("LOG_ERROR_BURST", "10"))
+LOG_ERROR_WINDOW_SEC = float(os.getenv("LOG_ERROR_WINDOW_SEC", "60"))
+LOG_ERROR_SAMPLE = int(os.getenv("LOG_ERROR_SAMPLE", "100"))
+
+# Libraries that log every request at INFO (httpx: each PostgREST/Storage call)
+QUIET_LOGGERS = ("httpx", "httpcore", "hpack", "urllib3")
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+# LogRecord attributes; anything else on a record came from `extra=` or a filter
+# (uvicorn adds an ANSI-colored copy of its messages)
+RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "color_message"}
+
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class RequestContext(logging.Filter):
+    """Adds the current request id (None outside requests)."""
+
+    def filter(self, record):
+        record.request_id = request_id.get()
+        return True
+
+
+class ErrorSampler(logging.Filter):
+    """Logs a burst of each warning/error class per window, then one in `sample`."""
+
+    MAX_KEYS = 1000
+
+    def __init__(self, burst: int = LOG_ERROR_BURST, window: float = LOG_ERROR_WINDOW_SEC, sample: int = LOG_ERROR_SAMPLE):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.sample = max(1, sample)
+        self.lock = threading.Lock()
+        self.state = {}  # key -> [window start, seen in window, suppressed since last logged]
+
+    def filter(self, record):
+        if record.levelno < logging.WARNING:
+            return True
+        if record.exc_info and record.exc_info[0] is not None:
+            key = (record.name, record.exc_info[0].__name__)
+        else:
+            key = (record.name, str(record.msg))
+
+        now = time.monotonic()
+        with self.lock:
+            state = self.state.get(key)
+            if state is None or now - state[0] >= self.window:
+                if state is None and len(self.state) >= self.MAX_KEYS:
+                    self.state.clear()
+                pending = state[2] if state else 0
+                state = self.state[key] = [now, 0, pending]
+            state[1] += 1
+            over = state[1] - self.burst
+            if over > 0 and over % self.sample:
+                state[2] += 1
+                return False
+            if state[2]:
+                record.suppressed = state[2]
+                state[2] = 0
+        return True
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """Never blocks: drops (and counts) records when the queue is full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Merge the arguments now (they may change later) but leave
+        # formatting, tracebacks included, to the listener thread
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        if self.dropped:
+            record.dropped = self.dropped
+        try:
+            self.queue.put_nowait(record)
+            self.dropped = 0
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_ATTRS and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_type"] = record.exc_info[0].__name__
+            entry["exc"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        extras = [
+            f"{key}={value}"
+            for key, value in record.__dict__.items()
+            if key not in RESERVED_ATTRS and value is not None
+        ]
+        if not extras:
+            return line
+        head, _, tail = line.partition("\n")
+        return f"{head} [{' '.join(extras)}]" + (f"\n{tail}" if tail else "")
+
+
+def setup_logging(fmt: str = LOG_FORMAT, level: str = LOG_LEVEL):
+    """Route all logging through the queue; safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(TextFormatter() if fmt == "text" else JsonFormatter())
+
+    handler = QueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    handler.addFilter(ErrorSampler())
+    handler.addFilter(RequestContext())
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+    if fmt != "text":
+        # uvicorn installs its own plain-text handlers; send its lines through ours
+        for name in UVICORN_LOGGERS:
+            uvicorn_logger = logging.getLogger(name)
+            uvicorn_logger.handlers.clear()
+            uvicorn_logger.propagate = True
+
+    _listener = logging.handlers.QueueListener(handler.queue, output)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+class RequestIdMiddleware:
+    """Takes X-Request-ID from the request (or makes one), sets it for logging and echoes it."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        incoming = Headers(scope=scope).get("x-request-id", "")
+        current = incoming[:64] if incoming.isprintable() and incoming else uuid.uuid4().hex
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Request-ID"] = current
+            await send(message)
+
+        token = request_id.set(current)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id.reset(token)
@@ -1,27 +1,102 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse, Response
 from pydantic import BaseModel
-from typing import Optional, List, Union
+from typing import Optional, List, Tuple, Union
 import os
 import json
+import asyncio
+import logging
 import uuid
 import zipfile
 import io
+import math
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import numpy as np
 from dotenv import load_dotenv
 
 # Load environment variables FIRST before importing modules that need them
 load_dotenv()
 
-from supabase import create_client, Client
+# Logging next, so the modules below log through it from import on (see logs.py)
+import logs
+from logs import RequestIdMiddleware
+logs.setup_logging()
+logger = logging.getLogger(__name__)
+
 from emailer import (
     send_waitlist_welcome,
     send_lab_request_confirmation,
     send_lab_request_admin_notification,
+    warm_email_client,
+)
+from qc import QCRules, rules_for_task, evaluate
+from rescore import rescore_episodes, apply_updates, RescoreProgress, DEFAULT_CHUNK_SIZE
+from detectors import detect
+from blobs import read_and_hash, hash_bytes, find_blob, store_blob
+from cache import cached, invalidate, ValueCache, CACHE_TTL_SEC
+from events import job_events, JobFilter
+import events
+import database
+from admission import admit, AdmissionMiddleware
+from responses import FastJSONResponse, trusted_json
+from compression import CompressionMiddleware, compression
+import telemetry
+from telemetry import TracingMiddleware
+import profiling
+from profiling import ProfilingMiddleware
+from projection import (
+    EPISODE_COLUMNS,
+    JOB_COLUMNS,
+    EPISODE_STATS_COLUMNS,
+    JOB_STATS_COLUMNS,
+    EPISODE_EXPORT_COLUMNS,
+    EPISODE_URL_COLUMNS,
+    columns,
+    select_fields,
 )
+import media
+import pipeline
+from clients import Lazy, pool_supabase
+import lifecycle
+from trajectory import (
+    parse_trajectory,
+    validate_trajectory,
+    encode_trajectory,
+    trajectory_path,
+    build_pyramid,
+    rebucket,
+    lod_path,
+    TrajectoryReader,
+    MANIFEST_NAME,
+)
+
+app = FastAPI(title="Robot Motion Data Platform API", default_response_class=FastJSONResponse)
+
+
+@app.on_event("startup")
+async def start_job_events():
+    telemetry.log_status()
+    await job_events.start_listener()
+    await database.connect()
+
+
+@app.on_event("shutdown")
+async def shutdown_background():
+    await job_events.stop_listener()
+    await database.close()
+    pipeline.shutdown()
+    telemetry.mark_process_dead()
 
-app = FastAPI(title="Robot Motion Data Platform API")
+
+# Open SSE streams would hold up a graceful shutdown; end them as soon as it begins
+lifecycle.on_drain(job_events.close_streams)
+
+# Upload admission before the body is read (see admission.py); innermost,
+# so its 429s still get CORS and tracing headers
+app.add_middleware(AdmissionMiddleware)
 
 # CORS middleware - Allow localhost and Vercel deployments
 app.add_middleware(
@@ -36,19 +111,57 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# brotli/gzip for large JSON responses (see compression.py)
+app.add_middleware(CompressionMiddleware)
+
+# X-Request-ID on every response and log line
+app.add_middleware(RequestIdMiddleware)
+
+# Per-request sampling profiles (X-Profile: 1); only installed with DEBUG_TOKEN
+if profiling.enabled():
+    app.add_middleware(ProfilingMiddleware)
+
+# Request/dependency latency metrics and Server-Timing (see telemetry.py);
+# added last so it is outermost and times the whole request
+app.add_middleware(TracingMiddleware)
+
 # Supabase client
 supabase_url = os.getenv("SUPABASE_URL")
 supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 dev_user_id = os.getenv("DEV_USER_ID", "00000000-0000-0000-0000-000000000000")
+# Public base URL of this API; when set, video_url points at the range-capable
+# /api/episodes/{id}/video proxy instead of a signed Storage URL
+media_proxy_url = os.getenv("MEDIA_PROXY_URL", "").rstrip("/")
 
 # For MVP: allow starting without Supabase, but warn
 if not supabase_url or not supabase_key:
-    print("⚠️  WARNING: SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY not set")
-    print("   Backend will start but Supabase operations will fail")
-    print("   Create a .env file with your Supabase credentials")
-    supabase: Optional[Client] = None
-else:
-    supabase: Client = create_client(supabase_url, supabase_key)
+    logger.warning(
+        "⚠️  SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY not set; backend will start but "
+        "Supabase operations will fail. Create a .env file with your Supabase credentials"
+    )
+
+
+def create_supabase():
+    from supabase import create_client
+
+    client = create_client(supabase_url, supabase_key)
+    pool_supabase(client)
+    telemetry.instrument_supabase(client)
+    return client
+
+
+# Created on first use (see clients.py); falsy when credentials are missing
+supabase = Lazy(create_supabase, configured=bool(supabase_url and supabase_key))
+
+SIGNED_URL_EXPIRES_SEC = 3600
+# A cached signed URL is handed out only while it stays valid at least this long
+SIGNED_URL_MIN_VALID_SEC = int(os.getenv("SIGNED_URL_MIN_VALID_SEC", "900"))
+WORKER_NAME_CACHE_SEC = int(os.getenv("WORKER_NAME_CACHE_SEC", "600"))
+
+# Shared by all workers when the cache backend is (see cache.py)
+signed_urls = ValueCache("signed_url", ttl=SIGNED_URL_EXPIRES_SEC - SIGNED_URL_MIN_VALID_SEC)
+task_rows = ValueCache("task", ttl=CACHE_TTL_SEC)
+worker_names = ValueCache("worker_name", ttl=WORKER_NAME_CACHE_SEC)
 
 
 # Pydantic models
@@ -77,36 +190,6 @@ class JobResponse(BaseModel):
     video_url: Optional[str] = None
 
 
-# QC Functions
-def compute_quality_score(episode: dict) -> int:
-    score = 50
-    if episode.get("success"):
-        score += 30
-    if episode.get("duration_sec", 0) > 15:
-        score -= 20
-    if episode.get("failure_reason"):
-        score -= 10
-    return max(0, min(100, score))
-
-
-def is_edge_case(episode: dict) -> bool:
-    if not episode.get("success"):
-        return True
-    if episode.get("duration_sec", 0) > 20:
-        return True
-    if episode.get("failure_reason"):
-        return True
-    return False
-
-
-def is_accepted(episode: dict) -> bool:
-    return episode.get("success") and episode.get("duration_sec", 0) <= 20
-
-
-def is_fix_accepted(episode: dict) -> bool:
-    return episode.get("success") and episode.get("duration_sec", 0) <= 10
-
-
 # Helper to check Supabase is configured
 def require_supabase():
     if not supabase:
@@ -115,8 +198,21 @@ def require_supabase():
             detail="Supabase not configured. Please set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY in .env file"
         )
 
+def require_debug_token(request: Request):
+    # Debug endpoints don't exist unless DEBUG_TOKEN is configured
+    if not profiling.enabled():
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not profiling.authorized(request.headers.get("x-debug-token")):
+        raise HTTPException(status_code=403, detail="Invalid or missing X-Debug-Token")
+
+
+def profile_response(profile: "profiling.Profile", format: str):
+    if format == "json":
+        return profile.summary()
+    return Response(content=profile.collapsed(), media_type="text/plain")
+
 # Storage helpers
-def get_signed_url(storage_path: str, expires_in: int = 3600) -> str:
+def get_signed_url(storage_path: str, expires_in: int = SIGNED_URL_EXPIRES_SEC) -> str:
     require_supabase()
     try:
         # Supabase Python client returns signed URL directly or in a dict
@@ -131,38 +227,291 @@ def get_signed_url(storage_path: str, expires_in: int = 3600) -> str:
         elif isinstance(response, str):
             return response
         
-        print(f"Warning: Unexpected signed URL response format: {response}")
+        logger.warning("Unexpected signed URL response format: %r", response)
         return ""
-    except Exception as e:
-        print(f"Error creating signed URL for {storage_path}: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Error creating signed URL for %s", storage_path)
         return ""
 
 
+def get_signed_urls(storage_paths: List[str], expires_in: int = SIGNED_URL_EXPIRES_SEC) -> dict:
+    """Signed URLs for many paths, reusing cached ones. Returns path -> URL."""
+    require_supabase()
+    paths = [p for p in storage_paths if p]
+    if expires_in != SIGNED_URL_EXPIRES_SEC:
+        return sign_urls(paths, expires_in)
+    return signed_urls.load_many(
+        paths, lambda missing: {path: url for path, url in sign_urls(missing, expires_in).items() if url}
+    )
+
+
+def sign_urls(storage_paths: List[str], expires_in: int) -> dict:
+    """Sign many paths with one Storage request. Returns path -> URL."""
+    paths = list(dict.fromkeys(storage_paths))
+    if not paths:
+        return {}
+    try:
+        response = supabase.storage.from_("episodes").create_signed_urls(paths, expires_in)
+        return {item["path"]: item["signedURL"] for item in response if item.get("path")}
+    except Exception as e:
+        # A single missing object fails the whole batch; sign one by one instead
+        logger.warning("Batch signing failed, falling back to single URLs: %s", e)
+        return {path: get_signed_url(path, expires_in) for path in paths}
+
+
+def get_task(task_id: str) -> Optional[dict]:
+    """A task's lab and QC rules (cached)."""
+    def load(task_id):
+        result = supabase.table("tasks").select("id, lab_id, qc_rules").eq("id", task_id).execute()
+        return result.data[0] if result.data else None
+
+    return task_rows.load(task_id, load)
+
+
+def get_worker_names(worker_ids: List[str]) -> dict:
+    """Worker id -> name with one query for the ones not cached."""
+    def load(missing):
+        result = supabase.table("workers").select("id, name").in_("id", missing).execute()
+        return {row["id"]: row.get("name") for row in result.data or []}
+
+    return worker_names.load_many([w for w in worker_ids if w], load)
+
+
+def media_urls(media_paths: Optional[dict], signed: dict) -> dict:
+    """thumbnail_url / preview_url / failure_clip_url for an episode's derived media."""
+    media_paths = media_paths or {}
+    return {f"{name}_url": signed.get(media_paths.get(name)) or None for name in media.MEDIA_FILES}
+
+
+def episode_video_url(episode: dict, signed: dict) -> Optional[str]:
+    """video_url for an episode: the streaming proxy if MEDIA_PROXY_URL is set, else a signed URL."""
+    if not episode.get("video_path"):
+        return None
+    if media_proxy_url:
+        return f"{media_proxy_url}/api/episodes/{episode['id']}/video"
+    return signed.get(episode["video_path"]) or None
+
+
+def execute_raw(query) -> bytes:
+    """Run a PostgREST query and return its JSON body as is, without parsing it."""
+    response = query.session.request(
+        query.http_method, query.path, json=query.json, params=query.params, headers=query.headers
+    )
+    if not response.is_success:
+        from postgrest.exceptions import APIError
+        raise APIError(response.json())
+    return response.content
+
+
+def fetch_storage_range(path: str, start: Optional[int] = None, end: Optional[int] = None) -> bytes:
+    """Download an object from the episodes bucket, or only bytes [start, end) of it."""
+    require_supabase()
+    headers = {"Range": f"bytes={start}-{end - 1}"} if start is not None else {}
+    response = supabase.storage.session.get(f"/object/episodes/{path}", headers=headers)
+    if response.status_code in (400, 404):
+        raise FileNotFoundError(path)
+    response.raise_for_status()
+    if start is not None and response.status_code == 200:
+        # Server ignored the Range header
+        return response.content[start:end]
+    return response.content
+
+
+# Trajectory chunks written by this process are also kept on local disk
+# (TRAJECTORY_CACHE_DIR) and memory-mapped on read
+trajectory_reader = TrajectoryReader(fetch_storage_range, cache_dir=os.getenv("TRAJECTORY_CACHE_DIR"))
+
+
+def upload_trajectory(storage_path: str, arrays: dict, hz: float) -> dict:
+    """Store trajectory arrays in the chunked columnar layout. Returns the manifest."""
+    manifest, files = encode_trajectory(arrays, hz)
+    base_path = trajectory_path(storage_path)
+    trajectory_reader.write_through(base_path, files)
+    manifest_bytes = files.pop(MANIFEST_NAME)
+    
+    def upload_chunk(item):
+        path, data = item
+        supabase.storage.from_("episodes").upload(
+            f"{base_path}/{path}",
+            data,
+            file_options={"content-type": "application/octet-stream"},
+        )
+    
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(upload_chunk, files.items()))
+    
+    # Manifest goes last so its presence means the trajectory is complete
+    supabase.storage.from_("episodes").upload(
+        f"{base_path}/{MANIFEST_NAME}",
+        manifest_bytes,
+        file_options={"content-type": "application/json"},
+    )
+    return manifest
+
+
+async def store_video(upload: UploadFile) -> Tuple[bytes, str, str]:
+    """
+    Read an uploaded video and make sure its blob is stored.
+    Returns (video bytes, sha256 of the blob, blob path).
+
+    A file uploaded before is found by the hash of its bytes (also when it
+    was stored remuxed), costing one lookup. A new one is remuxed to
+    fast-start first if needed (moov at the end of the file forces browsers
+    to download everything before playback): blobs are never rewritten.
+    """
+    video_bytes, upload_sha256 = await read_and_hash(upload)
+    existing = find_blob(supabase, upload_sha256)
+    if existing:
+        path, sha256 = existing
+        return video_bytes, sha256, path
+    
+    sha256 = upload_sha256
+    if media.ffmpeg_available():
+        remuxed = await pipeline.run(media.fast_start_bytes, video_bytes)
+        if remuxed:
+            video_bytes, sha256 = remuxed, await asyncio.to_thread(hash_bytes, remuxed)
+    path, _ = store_blob(supabase, video_bytes, sha256, source_sha256=upload_sha256)
+    return video_bytes, sha256, path
+
+
+# Background ingest stages. Plain functions: Starlette runs them in its
+# threadpool, so their Storage and database calls never block the event loop
+def detect_edge_case(episode: dict, arrays: dict, rules: QCRules):
+    """
+    Run signal-based detection on an uploaded trajectory in the ingest pool.
+    Fills failure_reason/failure_time_sec when the uploader left them empty,
+    then re-runs QC, which opens a job if the episode became an edge case.
+    """
+    try:
+        detection = pipeline.call(detect, arrays, episode["hz"])
+        if not detection:
+            return
+        
+        update = {}
+        if not episode.get("failure_reason"):
+            update["failure_reason"] = detection.failure_reason
+        if episode.get("failure_time_sec") is None:
+            update["failure_time_sec"] = detection.failure_time_sec
+        if not update:
+            return
+        
+        logger.info(
+            "🔎 Detected %s at %ss in episode %s",
+            detection.failure_reason, detection.failure_time_sec, episode["id"],
+        )
+        supabase.table("episodes").update(update).eq("id", episode["id"]).execute()
+        
+        qc_result = evaluate({**episode, **update}, rules)
+        if any(qc_result[key] != episode[key] for key in qc_result):
+            apply_updates(supabase, [{
+                "id": episode["id"],
+                **qc_result,
+                "prev_edge_case": episode["edge_case"],
+                "is_fix": False,
+            }])
+        invalidate("episodes", "jobs")
+    except Exception:
+        logger.exception("❌ Edge case detection error for episode %s", episode.get("id"))
+
+
+def build_previews(storage_path: str, arrays: dict):
+    """Precompute min/max/mean pyramids for charts in the ingest pool and store them."""
+    try:
+        files = pipeline.call(build_pyramid, arrays)
+        base_path = trajectory_path(storage_path)
+        trajectory_reader.write_through(base_path, files)
+        for path, data in files.items():
+            supabase.storage.from_("episodes").upload(
+                f"{base_path}/{path}",
+                data,
+                file_options={"content-type": "application/octet-stream"},
+            )
+    except Exception:
+        logger.exception("❌ Preview pyramid error for %s", storage_path)
+
+
+def generate_episode_media(episode_id: str, storage_path: str, video_bytes: bytes):
+    """Produce thumbnail, preview and failure clip with ffmpeg in the ingest pool."""
+    if not media.ffmpeg_available():
+        return
+    video_file = tempfile.NamedTemporaryFile(suffix=".mp4", delete=False)
+    try:
+        with video_file:
+            video_file.write(video_bytes)
+        
+        # Read back failure_time_sec: signal detection may have filled it in
+        episode_result = supabase.table("episodes").select(
+            "failure_time_sec, duration_sec"
+        ).eq("id", episode_id).execute()
+        episode = episode_result.data[0] if episode_result.data else {}
+        
+        outputs = pipeline.call(
+            media.generate_media,
+            video_file.name,
+            episode.get("failure_time_sec"),
+            episode.get("duration_sec"),
+        )
+        
+        media_paths = {}
+        for name, (data, content_type) in outputs.items():
+            path = f"{storage_path}/{media.MEDIA_FILES[name][0]}"
+            supabase.storage.from_("episodes").upload(
+                path,
+                data,
+                file_options={"content-type": content_type},
+            )
+            media_paths[name] = path
+        
+        if media_paths:
+            supabase.table("episodes").update({"media_paths": media_paths}).eq("id", episode_id).execute()
+    except Exception:
+        logger.exception("❌ Media pipeline error for episode %s", episode_id)
+    finally:
+        os.unlink(video_file.name)
+
+
 # API Endpoints
 @app.post("/api/episodes/upload")
+@admit("upload")
 async def upload_episode(
+    background_tasks: BackgroundTasks,
     meta_json: str = Form(...),
     video: Optional[UploadFile] = File(None),
     lab_id: Optional[str] = Form(None),
+    trajectory: Optional[UploadFile] = File(None),
 ):
-    """Upload an episode and create a job if it's an edge case."""
+    """
+    Upload an episode and create a job if it's an edge case.
+    `trajectory` optionally carries per-step arrays (.npz or JSON object of
+    field -> steps x dims lists); every array must have `steps` rows.
+    """
     require_supabase()
     try:
         meta = json.loads(meta_json)
         episode_id = str(uuid.uuid4())
         
+        # Parse and validate per-step trajectory arrays
+        trajectory_arrays = None
+        if trajectory:
+            try:
+                trajectory_arrays = parse_trajectory(await trajectory.read())
+                validate_trajectory(trajectory_arrays, meta["steps"], meta["hz"], meta["duration_sec"])
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=f"Invalid trajectory: {e}")
+        
+        # Hash the video while reading it: identical files are stored only once
+        video_bytes = video_sha256 = video_path = None
+        if video:
+            video_bytes, video_sha256, video_path = await store_video(video)
+        
         # Default to Rutgers lab if lab_id not provided
         if not lab_id:
             lab_id = "00000000-0000-0000-0000-000000000001"
         
-        # Get task to ensure lab_id matches
-        task_result = supabase.table("tasks").select("lab_id").eq("id", meta["task_id"]).execute()
-        if task_result.data:
-            task_lab_id = task_result.data[0].get("lab_id")
-            if task_lab_id:
-                lab_id = task_lab_id
+        # Get task to ensure lab_id matches and to pick up its QC rules
+        task = get_task(meta["task_id"])
+        if task and task.get("lab_id"):
+            lab_id = task["lab_id"]
         
         # Create episode record
         episode_data = {
@@ -171,7 +520,9 @@ async def upload_episode(
             "lab_id": lab_id,
             "uploader_user_id": dev_user_id,
             "storage_path": f"episodes/{episode_id}",
-            "video_path": f"episodes/{episode_id}/video.mp4" if video else None,
+            "video_path": video_path,
+            "video_sha256": video_sha256,
+            "trajectory_path": trajectory_path(f"episodes/{episode_id}") if trajectory_arrays else None,
             "success": meta["success"],
             "failure_reason": meta.get("failure_reason"),
             "failure_time_sec": meta.get("failure_time_sec"),
@@ -184,9 +535,8 @@ async def upload_episode(
         }
         
         # Run QC
-        episode_data["edge_case"] = is_edge_case(episode_data)
-        episode_data["accepted"] = is_accepted(episode_data)
-        episode_data["quality_score"] = compute_quality_score(episode_data)
+        rules = rules_for_task(task)
+        episode_data.update(evaluate(episode_data, rules))
         
         # Upload files to Supabase storage
         storage_path = f"episodes/{episode_id}"
@@ -199,14 +549,9 @@ async def upload_episode(
             file_options={"content-type": "application/json"},
         )
         
-        # Upload video if provided
-        if video:
-            video_bytes = await video.read()
-            supabase.storage.from_("episodes").upload(
-                f"{storage_path}/video.mp4",
-                video_bytes,
-                file_options={"content-type": "video/mp4"},
-            )
+        # Upload trajectory if provided
+        if trajectory_arrays:
+            upload_trajectory(storage_path, trajectory_arrays, meta["hz"])
         
         # Insert episode into database
         result = supabase.table("episodes").insert(episode_data).execute()
@@ -226,6 +571,17 @@ async def upload_episode(
             job_result = supabase.table("jobs").insert(job_data).execute()
             if job_result.data:
                 job_id = job_result.data[0]["id"]
+            job_events.publish("insert", job_result.data[0] if job_result.data else job_data)
+        invalidate("episodes", "jobs")
+        
+        # Look for silent failures in the trajectory off the request path
+        if trajectory_arrays:
+            background_tasks.add_task(detect_edge_case, dict(episode_data), trajectory_arrays, rules)
+            background_tasks.add_task(build_previews, storage_path, trajectory_arrays)
+        
+        # Thumbnail, preview and failure clip for the fix queue
+        if video_bytes:
+            background_tasks.add_task(generate_episode_media, episode_id, storage_path, video_bytes)
         
         return {
             "episode": result.data[0] if result.data else episode_data,
@@ -234,13 +590,12 @@ async def upload_episode(
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        error_trace = traceback.format_exc()
-        print(f"❌ Upload error: {error_trace}")  # Log full traceback to console
+        logger.exception("❌ Upload error")
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 
 @app.get("/api/jobs")
+@admit("interactive")
 async def get_jobs(
     status: Optional[str] = None,
     lab_id: Optional[str] = None,
@@ -251,12 +606,13 @@ async def get_jobs(
     require_supabase()
     try:
         query = supabase.table("jobs").select(
-            """
-            *,
+            f"""
+            {columns(*JOB_COLUMNS)},
             episodes (
                 failure_reason,
                 failure_time_sec,
-                video_path
+                video_path,
+                media_paths
             ),
             labs (
                 name
@@ -273,7 +629,7 @@ async def get_jobs(
         
         result = query.order("created_at", desc=True).execute()
         
-        jobs = []
+        rows = []
         for job in result.data:
             # Handle episodes relation (could be dict or list)
             episode = job.get("episodes")
@@ -289,24 +645,28 @@ async def get_jobs(
             elif not isinstance(lab, dict):
                 lab = {}
             
-            # Get worker name if claimed
-            worker_name = None
-            if job.get("claimed_by_worker_id"):
-                try:
-                    worker_result = supabase.table("workers").select("name").eq("id", job["claimed_by_worker_id"]).execute()
-                    if worker_result.data:
-                        worker_name = worker_result.data[0].get("name")
-                except:
-                    pass
-            
             # Filter by failure_reason if specified
             if failure_reason and episode.get("failure_reason") != failure_reason:
                 continue
             
-            video_url = None
-            if episode.get("video_path"):
-                video_url = get_signed_url(episode["video_path"])
-            
+            rows.append((job, episode, lab))
+        
+        # Names of the claiming workers, one query for all of them
+        try:
+            names = get_worker_names([job.get("claimed_by_worker_id") for job, _, _ in rows])
+        except Exception:
+            logger.warning("Could not load worker names", exc_info=True)
+            names = {}
+        
+        # Sign every video and derived media path with one Storage request
+        signed = get_signed_urls([
+            path
+            for _, episode, _ in rows
+            for path in [episode.get("video_path"), *(episode.get("media_paths") or {}).values()]
+        ])
+        
+        jobs = []
+        for job, episode, lab in rows:
             jobs.append({
                 "id": job["id"],
                 "task_id": job["task_id"],
@@ -316,27 +676,58 @@ async def get_jobs(
                 "status": job["status"],
                 "claimed_by": job.get("claimed_by"),
                 "claimed_by_worker_id": job.get("claimed_by_worker_id"),
-                "claimed_by_worker_name": worker_name,
+                "claimed_by_worker_name": names.get(job.get("claimed_by_worker_id")),
                 "fix_episode_id": job.get("fix_episode_id"),
                 "created_at": job["created_at"],
                 "updated_at": job["updated_at"],
                 "failure_reason": episode.get("failure_reason"),
                 "failure_time_sec": episode.get("failure_time_sec"),
-                "video_url": video_url,
+                "video_url": episode_video_url(episode, signed),
+                **media_urls(episode.get("media_paths"), signed),
             })
         
-        return {"jobs": jobs}
+        return trusted_json({"jobs": jobs})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Declared before /api/jobs/{job_id} so "events" is not taken for a job id
+@app.get("/api/jobs/events")
+async def stream_job_events(
+    request: Request,
+    lab_id: Optional[str] = None,
+    task_id: Optional[str] = None,
+    status: Optional[str] = None,
+):
+    """
+    Server-Sent Events stream of job inserts and status changes.
+    `status` is a comma-separated list; a job moving out of a listed status is
+    sent too, so clients can drop it. Events: insert, update, resync (refetch).
+    """
+    subscription = job_events.subscribe(JobFilter.from_query(lab_id, task_id, status))
+    return StreamingResponse(
+        events.stream(subscription, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/api/jobs/{job_id}")
-async def get_job(job_id: str):
-    """Get job detail with signed video URL."""
+@admit("interactive")
+async def get_job(job_id: str, fields: Optional[str] = None):
+    """
+    Get job detail with signed video URL.
+    `fields` (comma-separated) limits the columns of the nested episode.
+    """
     require_supabase()
     try:
+        try:
+            episode_columns = select_fields(fields, EPISODE_COLUMNS, EPISODE_URL_COLUMNS)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
         # First get the job
-        job_result = supabase.table("jobs").select("*").eq("id", job_id).execute()
+        job_result = supabase.table("jobs").select(columns(*JOB_COLUMNS)).eq("id", job_id).execute()
         
         if not job_result.data:
             raise HTTPException(status_code=404, detail="Job not found")
@@ -345,7 +736,7 @@ async def get_job(job_id: str):
         episode_id = job["episode_id"]
         
         # Get episode separately to avoid relationship ambiguity
-        episode_result = supabase.table("episodes").select("*").eq("id", episode_id).execute()
+        episode_result = supabase.table("episodes").select(episode_columns).eq("id", episode_id).execute()
         
         if not episode_result.data:
             raise HTTPException(status_code=404, detail="Episode not found")
@@ -355,9 +746,7 @@ async def get_job(job_id: str):
         # Get worker name if claimed
         worker_name = None
         if job.get("claimed_by_worker_id"):
-            worker_result = supabase.table("workers").select("name").eq("id", job["claimed_by_worker_id"]).execute()
-            if worker_result.data:
-                worker_name = worker_result.data[0].get("name")
+            worker_name = get_worker_names([job["claimed_by_worker_id"]]).get(job["claimed_by_worker_id"])
         
         # Get lab name
         lab_name = None
@@ -366,16 +755,13 @@ async def get_job(job_id: str):
             if lab_result.data:
                 lab_name = lab_result.data[0].get("name")
         
-        # Generate signed URL for video if it exists
-        video_url = None
+        # Generate signed URLs for the video and its derived media
         video_path = episode.get("video_path")
-        if video_path:
-            try:
-                video_url = get_signed_url(video_path)
-                if not video_url:
-                    print(f"Warning: Failed to generate signed URL for {video_path}")
-            except Exception as e:
-                print(f"Error generating signed URL: {e}")
+        media_paths = episode.get("media_paths") or {}
+        signed = get_signed_urls([video_path, *media_paths.values()])
+        video_url = episode_video_url(episode, signed)
+        if video_path and not video_url:
+            logger.warning("Failed to generate signed URL for %s", video_path)
         
         return {
             "id": job["id"],
@@ -392,6 +778,7 @@ async def get_job(job_id: str):
             "updated_at": job["updated_at"],
             "episode": episode,
             "video_url": video_url,
+            **media_urls(media_paths, signed),
         }
     except HTTPException:
         raise
@@ -400,6 +787,7 @@ async def get_job(job_id: str):
 
 
 @app.post("/api/jobs/{job_id}/claim")
+@admit("interactive")
 async def claim_job(job_id: str, worker_id: Optional[str] = None):
     """Claim a job."""
     require_supabase()
@@ -422,6 +810,8 @@ async def claim_job(job_id: str, worker_id: Optional[str] = None):
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Job not found or already claimed")
+        invalidate("jobs")
+        job_events.publish("update", result.data[0], previous_status="open")
         
         return {"job": result.data[0]}
     except HTTPException:
@@ -431,8 +821,10 @@ async def claim_job(job_id: str, worker_id: Optional[str] = None):
 
 
 @app.post("/api/jobs/{job_id}/submit_fix")
+@admit("interactive")
 async def submit_fix(
     job_id: str,
+    background_tasks: BackgroundTasks,
     meta_json: str = Form(...),
     video: Optional[UploadFile] = File(None),
 ):
@@ -440,7 +832,7 @@ async def submit_fix(
     require_supabase()
     try:
         # Get job
-        job_result = supabase.table("jobs").select("*").eq("id", job_id).execute()
+        job_result = supabase.table("jobs").select(columns(*JOB_COLUMNS)).eq("id", job_id).execute()
         if not job_result.data:
             raise HTTPException(status_code=404, detail="Job not found")
         
@@ -452,13 +844,18 @@ async def submit_fix(
         meta = json.loads(meta_json)
         fix_episode_id = str(uuid.uuid4())
         
+        video_bytes = video_sha256 = video_path = None
+        if video:
+            video_bytes, video_sha256, video_path = await store_video(video)
+        
         # Create fix episode
         fix_episode_data = {
             "id": fix_episode_id,
             "task_id": meta["task_id"],
             "uploader_user_id": dev_user_id,
             "storage_path": f"episodes/{fix_episode_id}",
-            "video_path": f"episodes/{fix_episode_id}/video.mp4" if video else None,
+            "video_path": video_path,
+            "video_sha256": video_sha256,
             "success": meta["success"],
             "failure_reason": meta.get("failure_reason"),
             "failure_time_sec": meta.get("failure_time_sec"),
@@ -466,13 +863,13 @@ async def submit_fix(
             "steps": meta["steps"],
             "duration_sec": meta["duration_sec"],
             "edge_case": False,
-            "quality_score": compute_quality_score(meta),
+            "quality_score": 0,
             "accepted": False,
         }
         
         # QC the fix
-        fix_episode_data["accepted"] = is_fix_accepted(fix_episode_data)
-        fix_episode_data["edge_case"] = is_edge_case(fix_episode_data)
+        task = get_task(meta["task_id"])
+        fix_episode_data.update(evaluate(fix_episode_data, rules_for_task(task), fix=True))
         
         # Upload files
         storage_path = f"episodes/{fix_episode_id}"
@@ -483,13 +880,8 @@ async def submit_fix(
             file_options={"content-type": "application/json"},
         )
         
-        if video:
-            video_bytes = await video.read()
-            supabase.storage.from_("episodes").upload(
-                f"{storage_path}/video.mp4",
-                video_bytes,
-                file_options={"content-type": "video/mp4"},
-            )
+        if video_bytes:
+            background_tasks.add_task(generate_episode_media, fix_episode_id, storage_path, video_bytes)
         
         # Insert fix episode
         episode_result = supabase.table("episodes").insert(fix_episode_data).execute()
@@ -503,6 +895,8 @@ async def submit_fix(
         }
         
         job_update_result = supabase.table("jobs").update(job_update).eq("id", job_id).execute()
+        invalidate("episodes", "jobs")
+        job_events.publish("update", {**job, **job_update}, previous_status=job["status"])
         
         return {
             "job": job_update_result.data[0] if job_update_result.data else job,
@@ -514,111 +908,125 @@ async def submit_fix(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/export")
-async def export_dataset(task_id: str):
-    """Export accepted episodes and fixes as a ZIP."""
-    require_supabase()
-    try:
-        # Get all accepted episodes for the task
-        episodes_result = supabase.table("episodes").select("*").eq(
-            "task_id", task_id
-        ).eq("accepted", True).execute()
-        
-        # Get all accepted fixes (episodes that are fix_episode_id in jobs)
-        jobs_result = supabase.table("jobs").select("fix_episode_id").eq(
-            "task_id", task_id
-        ).eq("status", "accepted").execute()
-        
-        fix_episode_ids = [j["fix_episode_id"] for j in jobs_result.data if j.get("fix_episode_id")]
-        
-        fixes_result = supabase.table("episodes").select("*").in_(
-            "id", fix_episode_ids
-        ).execute() if fix_episode_ids else {"data": []}
-        
-        # Create ZIP in memory
-        zip_buffer = io.BytesIO()
-        manifest = {
-            "task_id": task_id,
-            "exported_at": datetime.utcnow().isoformat(),
-            "accepted_episodes": [],
-            "accepted_fixes": [],
-        }
-        
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-            # Add accepted episodes
-            for episode in episodes_result.data:
-                episode_id = episode["id"]
-                manifest["accepted_episodes"].append({
-                    "episode_id": episode_id,
-                    "storage_path": episode["storage_path"],
-                })
-                
-                # Download and add meta.json
+def build_export_zip(task_id: str, episodes: List[dict], fixes: List[dict]) -> bytes:
+    """ZIP of the episodes' and fixes' meta.json and video, plus a manifest."""
+    # Create ZIP in memory
+    zip_buffer = io.BytesIO()
+    manifest = {
+        "task_id": task_id,
+        "exported_at": datetime.utcnow().isoformat(),
+        "accepted_episodes": [],
+        "accepted_fixes": [],
+    }
+    
+    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        # Add accepted episodes
+        for episode in episodes:
+            episode_id = episode["id"]
+            manifest["accepted_episodes"].append({
+                "episode_id": episode_id,
+                "storage_path": episode["storage_path"],
+            })
+    
+            # Download and add meta.json
+            try:
+                meta_data = supabase.storage.from_("episodes").download(
+                    f"{episode['storage_path']}/meta.json"
+                )
+                zip_file.writestr(
+                    f"episodes/{episode_id}/meta.json",
+                    meta_data
+                )
+            except:
+                pass
+    
+            # Download and add video if exists
+            if episode.get("video_path"):
                 try:
-                    meta_data = supabase.storage.from_("episodes").download(
-                        f"{episode['storage_path']}/meta.json"
+                    video_data = supabase.storage.from_("episodes").download(
+                        episode["video_path"]
                     )
                     zip_file.writestr(
-                        f"episodes/{episode_id}/meta.json",
-                        meta_data
+                        f"episodes/{episode_id}/video.mp4",
+                        video_data
                     )
                 except:
                     pass
-                
-                # Download and add video if exists
-                if episode.get("video_path"):
-                    try:
-                        video_data = supabase.storage.from_("episodes").download(
-                            episode["video_path"]
-                        )
-                        zip_file.writestr(
-                            f"episodes/{episode_id}/video.mp4",
-                            video_data
-                        )
-                    except:
-                        pass
-            
-            # Add accepted fixes
-            for fix in fixes_result.data:
-                fix_id = fix["id"]
-                manifest["accepted_fixes"].append({
-                    "episode_id": fix_id,
-                    "storage_path": fix["storage_path"],
-                })
-                
+    
+        # Add accepted fixes
+        for fix in fixes:
+            fix_id = fix["id"]
+            manifest["accepted_fixes"].append({
+                "episode_id": fix_id,
+                "storage_path": fix["storage_path"],
+            })
+    
+            try:
+                meta_data = supabase.storage.from_("episodes").download(
+                    f"{fix['storage_path']}/meta.json"
+                )
+                zip_file.writestr(
+                    f"fixes/{fix_id}/meta.json",
+                    meta_data
+                )
+            except:
+                pass
+    
+            if fix.get("video_path"):
                 try:
-                    meta_data = supabase.storage.from_("episodes").download(
-                        f"{fix['storage_path']}/meta.json"
+                    video_data = supabase.storage.from_("episodes").download(
+                        fix["video_path"]
                     )
                     zip_file.writestr(
-                        f"fixes/{fix_id}/meta.json",
-                        meta_data
+                        f"fixes/{fix_id}/video.mp4",
+                        video_data
                     )
                 except:
                     pass
-                
-                if fix.get("video_path"):
-                    try:
-                        video_data = supabase.storage.from_("episodes").download(
-                            fix["video_path"]
-                        )
-                        zip_file.writestr(
-                            f"fixes/{fix_id}/video.mp4",
-                            video_data
-                        )
-                    except:
-                        pass
+    
+        # Add manifest
+        zip_file.writestr(
+            "manifest.json",
+            json.dumps(manifest, indent=2)
+        )
+    
+    return zip_buffer.getvalue()
+
+
+@app.get("/api/export")
+@compression(enabled=False)  # ZIP is compressed already
+@admit("export")
+async def export_dataset(task_id: str):
+    """Export accepted episodes and fixes as a ZIP."""
+    require_supabase()
+    if lifecycle.draining():
+        # Exports run for minutes; start them on a worker that is staying up
+        raise HTTPException(status_code=503, detail="Server is shutting down", headers={"Retry-After": "5"})
+    try:
+        if database.enabled():
+            episodes, fixes = await database.export_selection(task_id, columns(*EPISODE_EXPORT_COLUMNS))
+        else:
+            # Get all accepted episodes for the task
+            episodes = supabase.table("episodes").select(columns(*EPISODE_EXPORT_COLUMNS)).eq(
+                "task_id", task_id
+            ).eq("accepted", True).execute().data
             
-            # Add manifest
-            zip_file.writestr(
-                "manifest.json",
-                json.dumps(manifest, indent=2)
-            )
+            # Get all accepted fixes (episodes that are fix_episode_id in jobs)
+            jobs_result = supabase.table("jobs").select("fix_episode_id").eq(
+                "task_id", task_id
+            ).eq("status", "accepted").execute()
+            
+            fix_episode_ids = [j["fix_episode_id"] for j in jobs_result.data if j.get("fix_episode_id")]
+            
+            fixes = supabase.table("episodes").select(columns(*EPISODE_EXPORT_COLUMNS)).in_(
+                "id", fix_episode_ids
+            ).execute().data if fix_episode_ids else []
         
-        zip_buffer.seek(0)
+        # Downloads and compression block; keep them off the event loop
+        archive = await asyncio.to_thread(build_export_zip, task_id, episodes, fixes)
         
         return StreamingResponse(
-            io.BytesIO(zip_buffer.read()),
+            io.BytesIO(archive),
             media_type="application/zip",
             headers={"Content-Disposition": f"attachment; filename=dataset_{task_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"}
         )
@@ -627,6 +1035,7 @@ async def export_dataset(task_id: str):
 
 
 @app.get("/api/tasks")
+@cached("tasks")
 async def get_tasks(lab_id: Optional[str] = None):
     """Get all tasks, optionally filtered by lab_id."""
     require_supabase()
@@ -641,19 +1050,24 @@ async def get_tasks(lab_id: Optional[str] = None):
 
 
 @app.get("/api/dataset/stats")
+@cached("episodes", "jobs")
+@admit("bulk_read")
 async def get_dataset_stats(task_id: str, lab_id: Optional[str] = None):
     """Get dataset statistics for a task, optionally filtered by lab_id."""
     require_supabase()
     try:
+        if database.enabled():
+            return await database.dataset_stats(task_id, lab_id)
+        
         # Get all episodes for the task
-        episodes_query = supabase.table("episodes").select("*").eq("task_id", task_id)
+        episodes_query = supabase.table("episodes").select(columns(*EPISODE_STATS_COLUMNS)).eq("task_id", task_id)
         if lab_id:
             episodes_query = episodes_query.eq("lab_id", lab_id)
         episodes_result = episodes_query.execute()
         episodes = episodes_result.data
         
         # Get all jobs for the task
-        jobs_query = supabase.table("jobs").select("*").eq("task_id", task_id)
+        jobs_query = supabase.table("jobs").select(columns(*JOB_STATS_COLUMNS)).eq("task_id", task_id)
         if lab_id:
             jobs_query = jobs_query.eq("lab_id", lab_id)
         jobs_result = jobs_query.execute()
@@ -703,6 +1117,63 @@ async def get_dataset_stats(task_id: str, lab_id: Optional[str] = None):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Re-scoring
+rescore_progress: Optional[RescoreProgress] = None
+
+
+def run_rescore(progress: RescoreProgress, after_id: Optional[str], chunk_size: int, dry_run: bool):
+    def on_progress(progress: RescoreProgress):
+        if not dry_run:
+            invalidate("episodes", "jobs")
+    
+    try:
+        rescore_episodes(
+            supabase,
+            chunk_size=chunk_size,
+            after_id=after_id,
+            dry_run=dry_run,
+            on_progress=on_progress,
+            progress=progress,
+        )
+    except Exception as e:
+        logger.exception("❌ Rescore error")
+        progress.error = str(e)
+
+
+@app.post("/api/rescore")
+async def start_rescore(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    dry_run: bool = False,
+    resume: bool = False,
+):
+    """
+    Re-score all episodes with the current QC rules in the background
+    (needs X-Debug-Token: it rewrites episodes and opens/closes jobs).
+    With resume=true, continues after the last episode of the previous run.
+    Progress lives in the worker that runs it: under serve.py, GET
+    /api/rescore and resume=true only see it when they reach that worker.
+    """
+    require_debug_token(request)
+    require_supabase()
+    global rescore_progress
+    if rescore_progress and not rescore_progress.done and not rescore_progress.error:
+        raise HTTPException(status_code=409, detail="A rescore is already running")
+    
+    after_id = rescore_progress.last_id if resume and rescore_progress else None
+    rescore_progress = RescoreProgress()
+    background_tasks.add_task(run_rescore, rescore_progress, after_id, chunk_size, dry_run)
+    return {"rescore": rescore_progress.to_dict()}
+
+
+@app.get("/api/rescore")
+async def get_rescore_status(request: Request):
+    """Get progress of the current or last rescore started on this worker (needs X-Debug-Token)."""
+    require_debug_token(request)
+    return {"rescore": rescore_progress.to_dict() if rescore_progress else None}
+
+
 # Waitlist and Lab Requests
 class WaitlistEntry(BaseModel):
     email: str
@@ -844,14 +1315,13 @@ async def create_lab_request(request: LabRequest):
         
         return {"success": True, "request": request_data}
     except Exception as e:
-        # Log error but still return success (don't crash on email failures)
-        import traceback
-        print(f"Error in create_lab_request: {traceback.format_exc()}")
+        logger.exception("Error in create_lab_request")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # Labs endpoints
 @app.get("/api/labs")
+@cached("labs")
 async def get_labs():
     """Get all labs."""
     require_supabase()
@@ -871,12 +1341,14 @@ async def create_lab(request: CreateLabRequest):
             "name": request.name,
             "use_case": request.use_case
         }).execute()
+        invalidate("labs")
         return {"lab": result.data[0] if result.data else None}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/labs/{lab_id}/summary")
+@cached("episodes", "jobs")
 async def get_lab_summary(lab_id: str):
     """Get high-level summary for a lab."""
     require_supabase()
@@ -910,16 +1382,30 @@ async def get_lab_summary(lab_id: str):
 
 
 @app.get("/api/labs/{lab_id}/episodes")
+@admit("bulk_read")
 async def get_lab_episodes(
     lab_id: str,
     accepted: Optional[bool] = None,
     edge_case: Optional[bool] = None,
     task_id: Optional[str] = None,
+    fields: Optional[str] = None,
 ):
-    """Get episodes for a lab with optional filters."""
+    """
+    Get episodes for a lab with optional filters.
+    `fields` (comma-separated) selects columns; default is all episode columns.
+    """
     require_supabase()
     try:
-        query = supabase.table("episodes").select("*").eq("lab_id", lab_id)
+        try:
+            episode_columns = select_fields(fields, EPISODE_COLUMNS)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        if database.enabled():
+            episodes = await database.lab_episodes(lab_id, episode_columns, accepted, edge_case, task_id or None)
+            return trusted_json({"episodes": episodes})
+        
+        query = supabase.table("episodes").select(episode_columns).eq("lab_id", lab_id)
         
         if accepted is not None:
             query = query.eq("accepted", accepted)
@@ -928,14 +1414,18 @@ async def get_lab_episodes(
         if task_id:
             query = query.eq("task_id", task_id)
         
-        result = query.order("created_at", desc=True).execute()
-        return {"episodes": result.data}
+        # PostgREST's JSON goes out as is rather than parsed and encoded again
+        rows = execute_raw(query.order("created_at", desc=True))
+        return Response(content=b'{"episodes":' + rows + b"}", media_type="application/json")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # Projects endpoints
 @app.get("/api/projects")
+@cached("projects")
 async def get_projects(lab_id: Optional[str] = None):
     """Get all projects, optionally filtered by lab_id."""
     require_supabase()
@@ -960,6 +1450,7 @@ async def create_project(request: CreateProjectRequest):
             "description": request.description,
             "robot_type": request.robot_type
         }).execute()
+        invalidate("projects")
         return {"project": result.data[0] if result.data else None}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -982,20 +1473,32 @@ async def create_worker(request: CreateWorkerRequest):
 
 
 # Job approval/rejection
+def review_job(job_id: str, status: str) -> dict:
+    """Set a job's review outcome; the event carries the status it left."""
+    current = supabase.table("jobs").select("status").eq("id", job_id).execute()
+    if not current.data:
+        raise HTTPException(status_code=404, detail="Job not found")
+    previous_status = current.data[0]["status"]
+    
+    # Only if nobody changed it since: previous_status must be what it left
+    result = supabase.table("jobs").update({
+        "status": status,
+        "updated_at": datetime.utcnow().isoformat()
+    }).eq("id", job_id).eq("status", previous_status).execute()
+    if not result.data:
+        raise HTTPException(status_code=409, detail="Job changed while it was being reviewed; reload it")
+    invalidate("jobs")
+    job_events.publish("update", result.data[0], previous_status=previous_status)
+    return result.data[0]
+
+
 @app.post("/api/jobs/{job_id}/approve")
+@admit("interactive")
 async def approve_job(job_id: str):
     """Approve a job submission."""
     require_supabase()
     try:
-        result = supabase.table("jobs").update({
-            "status": "accepted",
-            "updated_at": datetime.utcnow().isoformat()
-        }).eq("id", job_id).execute()
-        
-        if not result.data:
-            raise HTTPException(status_code=404, detail="Job not found")
-        
-        return {"job": result.data[0]}
+        return {"job": review_job(job_id, "accepted")}
     except HTTPException:
         raise
     except Exception as e:
@@ -1003,19 +1506,12 @@ async def approve_job(job_id: str):
 
 
 @app.post("/api/jobs/{job_id}/reject")
+@admit("interactive")
 async def reject_job(job_id: str, request: RejectJobRequest):
     """Reject a job submission."""
     require_supabase()
     try:
-        result = supabase.table("jobs").update({
-            "status": "rejected",
-            "updated_at": datetime.utcnow().isoformat()
-        }).eq("id", job_id).execute()
-        
-        if not result.data:
-            raise HTTPException(status_code=404, detail="Job not found")
-        
-        return {"job": result.data[0]}
+        return {"job": review_job(job_id, "rejected")}
     except HTTPException:
         raise
     except Exception as e:
@@ -1024,23 +1520,29 @@ async def reject_job(job_id: str, request: RejectJobRequest):
 
 # Episodes endpoints
 @app.get("/api/episodes/{episode_id}")
-async def get_episode(episode_id: str):
-    """Get episode by ID with signed video URL."""
+async def get_episode(episode_id: str, fields: Optional[str] = None):
+    """
+    Get episode by ID with signed video URL.
+    `fields` (comma-separated) limits the episode columns returned.
+    """
     require_supabase()
     try:
-        result = supabase.table("episodes").select("*").eq("id", episode_id).execute()
+        try:
+            episode_columns = select_fields(fields, EPISODE_COLUMNS, EPISODE_URL_COLUMNS)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        result = supabase.table("episodes").select(episode_columns).eq("id", episode_id).execute()
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Episode not found")
         
         episode = result.data[0]
         
-        # Get signed video URL if video_path exists
-        video_url = None
-        if episode.get("video_path"):
-            video_url = get_signed_url(episode["video_path"])
-        
-        episode["video_url"] = video_url
+        # Get signed URLs for the video and its derived media
+        signed = get_signed_urls([episode.get("video_path"), *(episode.get("media_paths") or {}).values()])
+        episode["video_url"] = episode_video_url(episode, signed)
+        episode.update(media_urls(episode.get("media_paths"), signed))
         return episode
     except HTTPException:
         raise
@@ -1048,7 +1550,283 @@ async def get_episode(episode_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+
+# Headers passed through from Storage so browsers can seek with range requests
+VIDEO_PROXY_HEADERS = ("content-type", "content-length", "content-range", "accept-ranges", "etag", "last-modified")
+VIDEO_STREAM_CHUNK_BYTES = 256 * 1024
+
+
+@app.get("/api/episodes/{episode_id}/video")
+async def stream_episode_video(episode_id: str, request: Request):
+    """
+    Stream an episode's video through the API.
+    A `Range` header is forwarded to Storage and answered with 206, so seeking
+    to failure_time_sec only transfers the bytes the player asks for.
+    """
+    require_supabase()
+    try:
+        result = supabase.table("episodes").select("video_path").eq("id", episode_id).execute()
+        if not result.data or not result.data[0].get("video_path"):
+            raise HTTPException(status_code=404, detail="Video not found")
+        
+        headers = {}
+        if request.headers.get("range"):
+            headers["Range"] = request.headers["range"]
+        session = supabase.storage.session
+        # Waiting for Storage to answer happens in a thread, not on the event loop
+        upstream = await asyncio.to_thread(
+            session.send,
+            session.build_request("GET", f"/object/episodes/{result.data[0]['video_path']}", headers=headers),
+            stream=True,
+        )
+        if upstream.status_code in (400, 404):
+            upstream.close()
+            raise HTTPException(status_code=404, detail="Video not found")
+        if upstream.status_code == 416:
+            upstream.close()
+            return Response(status_code=416, headers={"Content-Range": upstream.headers.get("content-range", "bytes */*")})
+        if upstream.status_code >= 400:
+            upstream.close()
+            upstream.raise_for_status()
+        
+        response_headers = {
+            name: upstream.headers[name] for name in VIDEO_PROXY_HEADERS if name in upstream.headers
+        }
+        response_headers.setdefault("accept-ranges", "bytes")
+        
+        # A sync iterator: StreamingResponse reads each chunk in its threadpool
+        def body():
+            try:
+                yield from upstream.iter_bytes(VIDEO_STREAM_CHUNK_BYTES)
+            finally:
+                upstream.close()
+        
+        return StreamingResponse(body(), status_code=upstream.status_code, headers=response_headers)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# The trajectory endpoints are plain functions, run in Starlette's threadpool:
+# their Storage range reads and NumPy work would otherwise block the event loop
+@app.get("/api/episodes/{episode_id}/trajectory")
+@compression(gzip_level=1, brotli_quality=1)  # Float arrays: favor speed over ratio
+def get_episode_trajectory(
+    episode_id: str,
+    start_sec: float = 0.0,
+    end_sec: Optional[float] = None,
+    fields: Optional[str] = None,
+    format: str = "json",
+):
+    """
+    Get a time slice of an episode's trajectory.
+    Only the chunks overlapping [start_sec, end_sec) are read, as byte ranges.
+    `fields` is a comma-separated list (default: all fields); `format` is
+    json or npz.
+    """
+    require_supabase()
+    if format not in ("json", "npz"):
+        raise HTTPException(status_code=400, detail="format must be json or npz")
+    try:
+        base_path = trajectory_path(f"episodes/{episode_id}")
+        try:
+            manifest = trajectory_reader.manifest(base_path)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Trajectory not found")
+        
+        hz = manifest["hz"]
+        steps = manifest["steps"]
+        start_step = max(0, min(steps, int(start_sec * hz)))
+        end_step = steps if end_sec is None else max(0, min(steps, math.ceil(end_sec * hz)))
+        if end_step <= start_step:
+            raise HTTPException(status_code=400, detail="Empty time range")
+        
+        field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+        try:
+            arrays = trajectory_reader.read(base_path, start_step, end_step, field_list)
+        except KeyError as e:
+            raise HTTPException(status_code=400, detail=str(e.args[0]))
+        
+        if format == "npz":
+            buffer = io.BytesIO()
+            np.savez(buffer, **arrays)
+            return Response(
+                content=buffer.getvalue(),
+                media_type="application/octet-stream",
+                headers={
+                    "Content-Disposition": f"attachment; filename={episode_id}_{start_step}_{end_step}.npz",
+                    "X-Trajectory-Hz": str(hz),
+                    "X-Trajectory-Start-Step": str(start_step),
+                },
+            )
+        
+        # Arrays are serialized directly by orjson, no tolist() round trip
+        return trusted_json({
+            "episode_id": episode_id,
+            "hz": hz,
+            "start_step": start_step,
+            "end_step": end_step,
+            "start_sec": start_step / hz,
+            "end_sec": end_step / hz,
+            "fields": arrays,
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+
+@app.get("/api/episodes/{episode_id}/trajectory/preview")
+def get_episode_trajectory_preview(
+    episode_id: str,
+    width: int = 1000,
+    fields: Optional[str] = None,
+):
+    """
+    Get a chart-sized overview of an episode's trajectory.
+    Picks the coarsest precomputed level with at least `width` buckets and
+    merges it down to `width` min/max/mean buckets, so the response size
+    depends on `width`, not on the episode length.
+    """
+    require_supabase()
+    if not 1 <= width <= 10000:
+        raise HTTPException(status_code=400, detail="width must be between 1 and 10000")
+    try:
+        base_path = trajectory_path(f"episodes/{episode_id}")
+        try:
+            manifest = trajectory_reader.manifest(base_path)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Trajectory not found")
+        
+        hz = manifest["hz"]
+        steps = manifest["steps"]
+        field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else list(manifest["fields"])
+        unknown = [f for f in field_list if f not in manifest["fields"]]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown trajectory field(s): {', '.join(unknown)}")
+        
+        # Coarsest level that still has `width` buckets; raw rows if none does
+        factor = max(
+            (f for f in manifest.get("lod_factors", []) if -(-steps // f) >= width),
+            default=1,
+        )
+        
+        result = {}
+        starts = None
+        for field in field_list:
+            if factor == 1:
+                raw = trajectory_reader.read(base_path, 0, steps, [field])[field]
+                level = np.stack([raw, raw, raw], axis=1)
+            else:
+                try:
+                    level = trajectory_reader.read_file(base_path, lod_path(factor, field))
+                except FileNotFoundError:
+                    raise HTTPException(status_code=404, detail="Trajectory preview not ready yet")
+            merged, starts = rebucket(level, width)
+            result[field] = {
+                "min": merged[:, 0],
+                "max": merged[:, 1],
+                "mean": merged[:, 2],
+            }
+        
+        return trusted_json({
+            "episode_id": episode_id,
+            "hz": hz,
+            "steps": steps,
+            "lod_factor": factor,
+            "t": starts * factor / hz if starts is not None else [],
+            "fields": result,
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/health", include_in_schema=False)
+async def health():
+    """Liveness: the process is serving. Touches no dependency."""
+    return {"status": "ok"}
+
+
+def readiness_check(call) -> str:
+    try:
+        call()
+        return "ok"
+    except Exception as e:
+        return f"error: {e}"
+
+
+@app.get("/ready", include_in_schema=False)
+async def ready():
+    """
+    Readiness: creates the Supabase client and makes one PostgREST and one
+    Storage round trip, so a fresh worker has its connections (and TLS
+    sessions) open before it is sent traffic. 503 until both succeed (and
+    Postgres answers, with direct reads on).
+    """
+    if lifecycle.draining():
+        return trusted_json({"ready": False, "checks": {"lifecycle": "draining"}}, status_code=503)
+    if not supabase:
+        return trusted_json({"ready": False, "checks": {"supabase": "not configured"}}, status_code=503)
+    postgrest, storage, email = await asyncio.gather(
+        asyncio.to_thread(readiness_check, lambda: supabase.table("tasks").select("id").limit(1).execute()),
+        asyncio.to_thread(readiness_check, lambda: supabase.storage.get_bucket("episodes")),
+        asyncio.to_thread(readiness_check, warm_email_client),
+    )
+    checks = {"postgrest": postgrest, "storage": storage, "email": email}
+    is_ready = postgrest == "ok" and storage == "ok"
+    if database.enabled():
+        try:
+            await database.ping()
+            checks["postgres"] = "ok"
+        except Exception as e:
+            checks["postgres"] = f"error: {e}"
+            is_ready = False
+    return trusted_json({"ready": is_ready, "checks": checks}, status_code=200 if is_ready else 503)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics: request and dependency latency (see telemetry.py)"""
+    if not telemetry.metrics_available():
+        raise HTTPException(status_code=404, detail="prometheus_client is not installed")
+    body, content_type = telemetry.render_metrics()
+    return Response(content=body, headers={"Content-Type": content_type})
+
+
+@app.get("/api/debug/profile", include_in_schema=False)
+async def profile_process(request: Request, seconds: float = 10, hz: int = profiling.PROFILE_DEFAULT_HZ, format: str = "collapsed"):
+    """
+    Sample every thread's stack for `seconds` and return the profile as
+    collapsed stacks (flamegraph.pl / speedscope input) or, with
+    format=json, the hottest functions. Requires X-Debug-Token.
+    """
+    require_debug_token(request)
+    if format not in ("collapsed", "json"):
+        raise HTTPException(status_code=400, detail="format must be 'collapsed' or 'json'")
+    profile = await profiling.profile_for(seconds, hz)
+    if profile is None:
+        raise HTTPException(status_code=409, detail="Another profile is already running")
+    return profile_response(profile, format)
+
+
+@app.get("/api/debug/profiles/{profile_id}", include_in_schema=False)
+async def get_request_profile(profile_id: str, request: Request, format: str = "collapsed"):
+    """Profile of a request sent with `X-Profile: 1` (id from its X-Profile-Id header)."""
+    require_debug_token(request)
+    if format not in ("collapsed", "json"):
+        raise HTTPException(status_code=400, detail="format must be 'collapsed' or 'json'")
+    profile = profiling.recent(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile_response(profile, format)
+
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # log_config=None: uvicorn's own loggers go through logs.py too
+    uvicorn.run(app, host="0.0.0.0", port=8000, log_config=None)
 
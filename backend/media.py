@@ -0,0 +1,177 @@
+"""
+Derived media for episode videos, generated with a local ffmpeg binary.
+
+For every uploaded video the ingest pipeline produces:
+- thumbnail.jpg: poster frame at the failure moment (or the first second)
+- preview.mp4: small, low-bitrate copy for list views
+- failure_clip.mp4: a few seconds centered on failure_time_sec
+
+so the fix queue never has to download the full video just to show what
+went wrong. Before an upload is hashed and stored, its video is remuxed to
+fast-start (moov atom before mdat) when needed, so browsers can start
+playback and seek with range requests instead of downloading the whole
+file first.
+"""
+
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+from typing import Optional, Dict, Tuple, List
+
+FFMPEG_BIN = os.getenv("FFMPEG_BIN", "ffmpeg")
+FFMPEG_TIMEOUT_SEC = int(os.getenv("FFMPEG_TIMEOUT_SEC", "300"))
+
+CLIP_BEFORE_SEC = 3.0
+CLIP_AFTER_SEC = 2.0
+
+# name -> (file name next to video.mp4, content type)
+MEDIA_FILES = {
+    "thumbnail": ("thumbnail.jpg", "image/jpeg"),
+    "preview": ("preview.mp4", "video/mp4"),
+    "failure_clip": ("failure_clip.mp4", "video/mp4"),
+}
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which(FFMPEG_BIN) is not None
+
+
+def run_ffmpeg(*args: str):
+    subprocess.run(
+        [FFMPEG_BIN, "-hide_banner", "-loglevel", "error", "-y", *args],
+        check=True,
+        capture_output=True,
+        timeout=FFMPEG_TIMEOUT_SEC,
+    )
+
+
+def top_level_atoms(path: str) -> List[str]:
+    """Types of the top-level MP4 boxes in file order (reads only box headers)."""
+    atoms = []
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        offset = 0
+        while offset + 8 <= size:
+            f.seek(offset)
+            box_size, box_type = struct.unpack(">I4s", f.read(8))
+            if box_size == 1:
+                box_size = struct.unpack(">Q", f.read(8))[0]
+            elif box_size == 0:
+                box_size = size - offset
+            if box_size < 8:
+                break
+            atoms.append(box_type.decode("latin-1"))
+            offset += box_size
+    return atoms
+
+
+def is_fast_start(path: str) -> bool:
+    """True if the moov atom comes before mdat (or the file is not a plain MP4)."""
+    atoms = top_level_atoms(path)
+    if "moov" not in atoms or "mdat" not in atoms:
+        return True
+    return atoms.index("moov") < atoms.index("mdat")
+
+
+def make_fast_start(src: str, dst: str):
+    # Stream copy: no re-encode, only moves the moov atom to the front
+    run_ffmpeg("-i", src, "-map", "0", "-c", "copy", "-movflags", "+faststart", dst)
+
+
+def fast_start_video(video_path: str) -> Optional[bytes]:
+    """
+    Remux a local MP4 to fast-start. Runs in the ingest pool.
+
+    Returns:
+        The remuxed bytes, or None if the video is already fast-start
+        (or could not be remuxed, in which case the original is kept).
+    """
+    if is_fast_start(video_path):
+        return None
+    with tempfile.TemporaryDirectory() as tmp:
+        dst = os.path.join(tmp, "video.mp4")
+        try:
+            make_fast_start(video_path, dst)
+        except (subprocess.SubprocessError, OSError):
+            return None
+        if not os.path.exists(dst) or not is_fast_start(dst):
+            return None
+        with open(dst, "rb") as f:
+            return f.read()
+
+
+def fast_start_bytes(data: bytes) -> Optional[bytes]:
+    """`fast_start_video` for an upload still in memory. Runs in the ingest pool."""
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "upload.mp4")
+        with open(src, "wb") as f:
+            f.write(data)
+        return fast_start_video(src)
+
+
+def make_thumbnail(src: str, dst: str, at_sec: float = 0.0):
+    run_ffmpeg("-ss", f"{at_sec:.3f}", "-i", src, "-frames:v", "1", "-vf", "scale=480:-2", "-q:v", "4", dst)
+
+
+def make_preview(src: str, dst: str):
+    run_ffmpeg(
+        "-i", src,
+        "-vf", "scale=-2:360",
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", "32",
+        "-an", "-movflags", "+faststart",
+        dst,
+    )
+
+
+def make_clip(src: str, dst: str, center_sec: float, before_sec: float = CLIP_BEFORE_SEC, after_sec: float = CLIP_AFTER_SEC):
+    start = max(0.0, center_sec - before_sec)
+    run_ffmpeg(
+        "-ss", f"{start:.3f}", "-i", src,
+        "-t", f"{center_sec - start + after_sec:.3f}",
+        "-vf", "scale=-2:480",
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", "28",
+        "-an", "-movflags", "+faststart",
+        dst,
+    )
+
+
+def generate_media(
+    video_path: str,
+    failure_time_sec: Optional[float] = None,
+    duration_sec: Optional[float] = None,
+) -> Dict[str, Tuple[bytes, str]]:
+    """
+    Generate derived media for a local video file. Runs in the ingest pool.
+    `duration_sec` (the episode's) keeps the clip inside the video.
+
+    Returns:
+        name -> (bytes, content type) for every output that could be produced;
+        a failing step is skipped rather than failing the others.
+    """
+    if failure_time_sec is not None and duration_sec:
+        failure_time_sec = min(failure_time_sec, max(0.0, duration_sec - CLIP_AFTER_SEC))
+
+    outputs = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        def produce(name: str, make, *args):
+            filename, content_type = MEDIA_FILES[name]
+            dst = os.path.join(tmp, filename)
+            try:
+                make(video_path, dst, *args)
+            except (subprocess.SubprocessError, OSError):
+                return
+            if os.path.exists(dst) and os.path.getsize(dst) > 0:
+                with open(dst, "rb") as f:
+                    outputs[name] = (f.read(), content_type)
+
+        poster_sec = failure_time_sec if failure_time_sec is not None else 1.0
+        produce("thumbnail", make_thumbnail, poster_sec)
+        if "thumbnail" not in outputs:
+            # Seek point past the end of the video: fall back to the first frame
+            produce("thumbnail", make_thumbnail, 0.0)
+        produce("preview", make_preview)
+        if failure_time_sec is not None:
+            produce("failure_clip", make_clip, failure_time_sec)
+    return outputs
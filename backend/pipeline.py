@@ -0,0 +1,71 @@
+"""
+Background ingest pipeline.
+
+Work that does not have to finish before an upload returns (signal-based
+edge-case detection, ...) is handed to a process pool here, so CPU-heavy
+NumPy work never runs on the request path or holds the GIL of the API
+process. Pool size is INGEST_WORKERS (default: number of cores; serve.py
+divides the cores between its workers).
+
+Workers are started by a fork server rather than forked from the API process:
+by the time the pool is created that process runs the event loop, the request
+threadpool and HTTP connection pools, and a fork copies their locks in
+whatever state they are in. The fork server is a fresh process with the
+ingest modules preloaded, so workers still start quickly. Functions handed
+to the pool must be importable module-level functions.
+"""
+
+import os
+import asyncio
+import threading
+import multiprocessing
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Callable, Any
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "0")) or os.cpu_count() or 1
+# forkserver is POSIX-only; spawn elsewhere
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+# Imported once by the fork server instead of by every worker
+PRELOAD_MODULES = ["numpy", "detectors", "trajectory", "media"]
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Process pool shared by all ingest stages, created on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                context = multiprocessing.get_context(START_METHOD)
+                if START_METHOD == "forkserver":
+                    context.set_forkserver_preload(PRELOAD_MODULES)
+                pool = ProcessPoolExecutor(max_workers=INGEST_WORKERS, mp_context=context)
+                # Start the first worker here: it waits for the fork server
+                # to come up and import PRELOAD_MODULES (~150 ms)
+                pool.submit(int).result()
+                _pool = pool
+    return _pool
+
+
+async def run(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run `fn(*args, **kwargs)` in the ingest pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    # Creating the pool starts the fork server, which must not happen on the loop
+    pool = _pool or await asyncio.to_thread(get_pool)
+    return await loop.run_in_executor(pool, partial(fn, *args, **kwargs))
+
+
+def call(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run `fn(*args, **kwargs)` in the ingest pool and wait (from a worker thread)."""
+    return get_pool().submit(fn, *args, **kwargs).result()
+
+
+def shutdown(wait: bool = True):
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait)
+            _pool = None
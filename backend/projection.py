@@ -0,0 +1,76 @@
+"""
+Column projection for episode and job reads.
+
+Read paths select the columns they use instead of `select("*")`, so wide
+columns added to episodes later (trajectory-derived data, media paths, ...)
+are only transferred where they are needed. Read endpoints also accept a
+`fields` query parameter (comma-separated) to narrow their default set.
+"""
+
+from typing import Optional, Sequence
+
+EPISODE_COLUMNS = (
+    "id",
+    "task_id",
+    "lab_id",
+    "project_id",
+    "uploader_user_id",
+    "storage_path",
+    "video_path",
+    "video_sha256",
+    "trajectory_path",
+    "media_paths",
+    "success",
+    "failure_reason",
+    "failure_time_sec",
+    "hz",
+    "steps",
+    "duration_sec",
+    "edge_case",
+    "quality_score",
+    "accepted",
+    "created_at",
+)
+
+JOB_COLUMNS = (
+    "id",
+    "task_id",
+    "lab_id",
+    "project_id",
+    "episode_id",
+    "status",
+    "claimed_by",
+    "claimed_by_worker_id",
+    "fix_episode_id",
+    "created_at",
+    "updated_at",
+)
+
+# What each internal read path actually uses
+EPISODE_STATS_COLUMNS = ("edge_case", "accepted", "quality_score", "failure_reason")
+JOB_STATS_COLUMNS = ("status", "fix_episode_id")
+EPISODE_EXPORT_COLUMNS = ("id", "storage_path", "video_path")
+# Needed to build video_url / thumbnail_url etc. on episode responses
+EPISODE_URL_COLUMNS = ("id", "video_path", "media_paths")
+
+
+def columns(*names: str) -> str:
+    """select() argument for a list of columns."""
+    return ", ".join(dict.fromkeys(names))
+
+
+def select_fields(
+    fields: Optional[str],
+    allowed: Sequence[str],
+    required: Sequence[str] = (),
+) -> str:
+    """
+    select() argument for a `fields` query parameter: the requested columns
+    (all of `allowed` if empty) plus the `required` ones the handler needs.
+    Raises ValueError for columns not in `allowed`.
+    """
+    requested = [f.strip() for f in fields.split(",") if f.strip()] if fields else []
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return columns(*required, *(requested or allowed))
@@ -0,0 +1,194 @@
+"""
+Quality-control rules for episodes.
+
+Rules are plain thresholds collected in a `QCRules` object so they can be
+overridden per task (`tasks.qc_rules`) and evaluated either on a single
+episode dict or on a whole batch of episode columns with NumPy.
+"""
+
+import logging
+from dataclasses import dataclass, fields, replace, astuple
+from typing import Optional, Mapping, Sequence, Any, Dict
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class QCRules:
+    """Thresholds and weights used by the QC checks."""
+
+    # Quality score
+    base_score: int = 50
+    success_bonus: int = 30
+    long_duration_sec: float = 15.0
+    long_duration_penalty: int = 20
+    failure_reason_penalty: int = 10
+    min_score: int = 0
+    max_score: int = 100
+
+    # Edge case / acceptance
+    edge_case_max_duration_sec: float = 20.0
+    accept_max_duration_sec: float = 20.0
+    fix_accept_max_duration_sec: float = 10.0
+
+    @classmethod
+    def from_dict(cls, overrides: Optional[Mapping[str, Any]], base: "QCRules" = None) -> "QCRules":
+        """Build rules from a (possibly partial) dict of overrides."""
+        base = base or DEFAULT_RULES
+        if not overrides:
+            return base
+        known = {f.name for f in fields(cls)}
+        unknown = set(overrides) - known
+        if unknown:
+            raise ValueError(f"Unknown QC rule(s): {', '.join(sorted(unknown))}")
+        not_numbers = [
+            name for name, value in overrides.items()
+            if isinstance(value, bool) or not isinstance(value, (int, float))
+        ]
+        if not_numbers:
+            raise ValueError(f"QC rule(s) must be numbers: {', '.join(sorted(not_numbers))}")
+        return replace(base, **overrides)
+
+
+DEFAULT_RULES = QCRules()
+
+_RULE_FIELDS = [f.name for f in fields(QCRules)]
+
+
+def rules_for_task(task: Optional[dict]) -> QCRules:
+    """
+    Return the QC rules for a task row. Falls back to the defaults when the
+    task has none, or when its qc_rules are invalid (logged, so one bad
+    override does not fail every upload to the task).
+    """
+    if not task:
+        return DEFAULT_RULES
+    try:
+        return QCRules.from_dict(task.get("qc_rules"))
+    except (ValueError, TypeError) as e:
+        logger.warning("⚠️  Ignoring qc_rules of task %s: %s", task.get("id"), e)
+        return DEFAULT_RULES
+
+
+# Single-episode checks
+def compute_quality_score(episode: dict, rules: QCRules = DEFAULT_RULES) -> int:
+    score = rules.base_score
+    if episode.get("success"):
+        score += rules.success_bonus
+    if (episode.get("duration_sec") or 0) > rules.long_duration_sec:
+        score -= rules.long_duration_penalty
+    if episode.get("failure_reason"):
+        score -= rules.failure_reason_penalty
+    return max(rules.min_score, min(rules.max_score, score))
+
+
+def is_edge_case(episode: dict, rules: QCRules = DEFAULT_RULES) -> bool:
+    if not episode.get("success"):
+        return True
+    if (episode.get("duration_sec") or 0) > rules.edge_case_max_duration_sec:
+        return True
+    if episode.get("failure_reason"):
+        return True
+    return False
+
+
+def is_accepted(episode: dict, rules: QCRules = DEFAULT_RULES) -> bool:
+    return bool(episode.get("success")) and (episode.get("duration_sec") or 0) <= rules.accept_max_duration_sec
+
+
+def is_fix_accepted(episode: dict, rules: QCRules = DEFAULT_RULES) -> bool:
+    return bool(episode.get("success")) and (episode.get("duration_sec") or 0) <= rules.fix_accept_max_duration_sec
+
+
+def evaluate(episode: dict, rules: QCRules = DEFAULT_RULES, fix: bool = False) -> Dict[str, Any]:
+    """Run all QC checks on one episode. Returns edge_case, accepted and quality_score."""
+    return {
+        "edge_case": is_edge_case(episode, rules),
+        "accepted": is_fix_accepted(episode, rules) if fix else is_accepted(episode, rules),
+        "quality_score": compute_quality_score(episode, rules),
+    }
+
+
+# Batch checks
+def columns_from_episodes(episodes: Sequence[dict]) -> Dict[str, np.ndarray]:
+    """Convert a list of episode dicts into the columns used by `evaluate_batch`."""
+    n = len(episodes)
+    return {
+        "success": np.fromiter((bool(e.get("success")) for e in episodes), dtype=bool, count=n),
+        "duration_sec": np.fromiter((e.get("duration_sec") or 0 for e in episodes), dtype=np.float64, count=n),
+        "failure_reason": np.fromiter((bool(e.get("failure_reason")) for e in episodes), dtype=bool, count=n),
+        "task_id": np.array([e.get("task_id") for e in episodes], dtype=object),
+    }
+
+
+def _has_value(column) -> np.ndarray:
+    """Truthiness of a failure_reason column (bool array or array of str/None)."""
+    arr = np.asarray(column)
+    if arr.dtype == bool:
+        return arr
+    if arr.dtype.kind in "US":
+        return arr != ""
+    return (arr != None) & (arr != "")  # noqa: E711 - elementwise comparison
+
+
+def _rule_columns(n: int, rules: QCRules, task_id, rules_by_task: Optional[Mapping[str, QCRules]]):
+    """Per-row rule parameters; scalars when every row shares the same rules."""
+    if not rules_by_task or task_id is None:
+        return rules
+    task_id = np.asarray(task_id)
+    # Row 0 of the table holds the fallback rules; overridden tasks follow
+    table = np.array(
+        [astuple(rules)] + [astuple(r) for r in rules_by_task.values()],
+        dtype=np.float64,
+    )
+    codes = np.zeros(n, dtype=np.intp)
+    for code, task in enumerate(rules_by_task, start=1):
+        codes[task_id == task] = code
+    per_row = table[codes]
+    return {name: per_row[:, i] for i, name in enumerate(_RULE_FIELDS)}
+
+
+def evaluate_batch(
+    columns: Mapping[str, Any],
+    rules: QCRules = DEFAULT_RULES,
+    rules_by_task: Optional[Mapping[str, QCRules]] = None,
+    fix=False,
+) -> Dict[str, np.ndarray]:
+    """
+    Run all QC checks on a batch of episodes stored as columns.
+
+    Args:
+        columns: Mapping with `success`, `duration_sec` and `failure_reason`
+            arrays (failure_reason may be a bool mask or strings/None), plus
+            an optional `task_id` array used with `rules_by_task`.
+        rules: Rules used for rows whose task has no override.
+        rules_by_task: Optional task_id -> QCRules overrides.
+        fix: Bool or bool array; rows marked as fixes use the fix acceptance rule.
+
+    Returns:
+        Dict of `edge_case`, `accepted` (bool) and `quality_score` (int) arrays.
+    """
+    success = np.asarray(columns["success"], dtype=bool)
+    duration = np.asarray(columns["duration_sec"], dtype=np.float64)
+    has_reason = _has_value(columns["failure_reason"])
+    n = success.shape[0]
+
+    r = _rule_columns(n, rules, columns.get("task_id"), rules_by_task)
+    get = r.get if isinstance(r, dict) else lambda name: getattr(r, name)
+
+    score = np.full(n, get("base_score"), dtype=np.float64)
+    score += success * get("success_bonus")
+    score -= (duration > get("long_duration_sec")) * get("long_duration_penalty")
+    score -= has_reason * get("failure_reason_penalty")
+    np.clip(score, get("min_score"), get("max_score"), out=score)
+
+    edge_case = ~success | (duration > get("edge_case_max_duration_sec")) | has_reason
+    max_duration = np.where(fix, get("fix_accept_max_duration_sec"), get("accept_max_duration_sec"))
+    accepted = success & (duration <= max_duration)
+
+    return {
+        "edge_case": edge_case,
+        "accepted": accepted,
+        "quality_score": score.astype(np.int32),
+    }
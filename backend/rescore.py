@@ -0,0 +1,155 @@
+"""
+Bulk re-scoring of episodes after QC rule changes.
+
+Episodes are streamed in `id` order (keyset pagination), evaluated with the
+batch QC engine, and only rows whose quality_score, edge_case or accepted
+changed are written back. Each chunk is applied by the `apply_episode_qc`
+database function, which also opens or closes jobs when an episode's
+edge-case status flips, so a chunk is either fully applied or not at all.
+The jobs it changed are published to live job subscribers (events.py); with
+the LISTEN feed the database trigger announces them instead.
+"""
+
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Optional, Callable, Dict, List, Iterator, Set
+import numpy as np
+
+from events import job_events
+from qc import QCRules, rules_for_task, columns_from_episodes, evaluate_batch
+
+QC_COLUMNS = "id, task_id, success, duration_sec, failure_reason, quality_score, edge_case, accepted"
+DEFAULT_CHUNK_SIZE = 1000
+
+
+@dataclass
+class RescoreProgress:
+    scanned: int = 0
+    changed: int = 0
+    jobs_opened: int = 0
+    jobs_closed: int = 0
+    last_id: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    done: bool = False
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def load_task_rules(client) -> Dict[str, QCRules]:
+    """Load per-task QC overrides for every task that has them."""
+    result = client.table("tasks").select("id, qc_rules").execute()
+    return {
+        task["id"]: rules_for_task(task)
+        for task in result.data
+        if task.get("qc_rules")
+    }
+
+
+def iter_episode_chunks(client, chunk_size: int = DEFAULT_CHUNK_SIZE, after_id: Optional[str] = None) -> Iterator[List[dict]]:
+    """Yield episodes in id order, `chunk_size` at a time, starting after `after_id`."""
+    while True:
+        query = client.table("episodes").select(QC_COLUMNS).order("id").limit(chunk_size)
+        if after_id:
+            query = query.gt("id", after_id)
+        rows = query.execute().data
+        # Stop only on an empty page: PostgREST may cap the page below chunk_size
+        if not rows:
+            return
+        yield rows
+        after_id = rows[-1]["id"]
+
+
+def fix_episode_ids(client, first_id: str, last_id: str) -> Set[str]:
+    """Ids of fix episodes in [first_id, last_id] (fixes use the fix acceptance rule)."""
+    result = client.table("jobs").select("fix_episode_id").gte(
+        "fix_episode_id", first_id
+    ).lte("fix_episode_id", last_id).execute()
+    return {row["fix_episode_id"] for row in result.data}
+
+
+def diff_chunk(rows: List[dict], fix_ids: Set[str], rules_by_task: Dict[str, QCRules]) -> List[dict]:
+    """Re-evaluate a chunk and return update payloads for the rows that changed."""
+    n = len(rows)
+    is_fix = np.fromiter((row["id"] in fix_ids for row in rows), dtype=bool, count=n)
+    new = evaluate_batch(columns_from_episodes(rows), rules_by_task=rules_by_task, fix=is_fix)
+
+    old_score = np.fromiter((row.get("quality_score") or 0 for row in rows), dtype=np.int32, count=n)
+    old_edge_case = np.fromiter((bool(row.get("edge_case")) for row in rows), dtype=bool, count=n)
+    old_accepted = np.fromiter((bool(row.get("accepted")) for row in rows), dtype=bool, count=n)
+
+    changed = (
+        (new["quality_score"] != old_score)
+        | (new["edge_case"] != old_edge_case)
+        | (new["accepted"] != old_accepted)
+    )
+    return [
+        {
+            "id": rows[i]["id"],
+            "quality_score": int(new["quality_score"][i]),
+            "edge_case": bool(new["edge_case"][i]),
+            "accepted": bool(new["accepted"][i]),
+            "prev_edge_case": bool(old_edge_case[i]),
+            "is_fix": bool(is_fix[i]),
+        }
+        for i in np.flatnonzero(changed)
+    ]
+
+
+def apply_updates(client, updates: List[dict]) -> dict:
+    """Write QC updates (as produced by `diff_chunk`) in one transaction. Returns counts."""
+    result = client.rpc("apply_episode_qc", {"updates": updates}).execute()
+    counts = dict(result.data or {})
+    # Opened, reopened and closed jobs (013_rescore_job_events.sql)
+    for event in counts.pop("jobs", []):
+        job_events.publish(event["type"], event["job"], previous_status=event["previous_status"])
+    return counts
+
+
+def rescore_episodes(
+    client,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    after_id: Optional[str] = None,
+    dry_run: bool = False,
+    on_progress: Optional[Callable[[RescoreProgress], None]] = None,
+    progress: Optional[RescoreProgress] = None,
+) -> RescoreProgress:
+    """
+    Re-score every episode after `after_id` with the current QC rules.
+
+    Args:
+        client: Supabase client
+        chunk_size: Episodes fetched and written per round trip
+        after_id: Resume after this episode id (the `last_id` of a previous run)
+        dry_run: Compute changes without writing them
+        on_progress: Called after each chunk with the running totals
+        progress: Optional progress object to update in place
+
+    Returns:
+        Final progress; `last_id` is the resume point if the run is interrupted.
+    """
+    progress = progress or RescoreProgress()
+    progress.last_id = after_id
+    progress.started_at = datetime.utcnow().isoformat()
+    rules_by_task = load_task_rules(client)
+
+    for rows in iter_episode_chunks(client, chunk_size, after_id):
+        fix_ids = fix_episode_ids(client, rows[0]["id"], rows[-1]["id"])
+        updates = diff_chunk(rows, fix_ids, rules_by_task)
+
+        if updates and not dry_run:
+            counts = apply_updates(client, updates)
+            progress.jobs_opened += counts.get("jobs_opened", 0)
+            progress.jobs_closed += counts.get("jobs_closed", 0)
+
+        progress.scanned += len(rows)
+        progress.changed += len(updates)
+        progress.last_id = rows[-1]["id"]
+        if on_progress:
+            on_progress(progress)
+
+    progress.done = True
+    progress.finished_at = datetime.utcnow().isoformat()
+    return progress
@@ -0,0 +1,44 @@
+"""
+JSON responses rendered with orjson.
+
+FastAPI's default path runs every returned value through jsonable_encoder
+and then stdlib json, both walking the whole structure in Python. DB rows
+from Supabase are already plain dicts of JSON types, so list endpoints hand
+them straight to orjson with `trusted_json`, which skips the encoder pass.
+NumPy arrays and scalars are serialized natively as well.
+"""
+
+import numpy as np
+import orjson
+from fastapi.responses import JSONResponse
+
+from telemetry import span
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value):
+    # orjson only serializes C-contiguous arrays natively (not slices)
+    if isinstance(value, np.ndarray):
+        return np.ascontiguousarray(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, option=ORJSON_OPTIONS, default=_default)
+
+
+class FastJSONResponse(JSONResponse):
+    """App-wide default response class. NaN and Infinity are rendered as null."""
+
+    def render(self, content) -> bytes:
+        with span("serialize", "orjson"):
+            return dumps(content)
+
+
+def trusted_json(content, status_code: int = 200, headers: dict = None) -> FastJSONResponse:
+    """
+    Respond with `content` without FastAPI's jsonable_encoder pass. Only for
+    content made of JSON types, datetimes, UUIDs and NumPy values (DB rows).
+    """
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test of the API.
+Drives a running API (or one started with --start-server) with simulated
+users and reports requests/s, latency percentiles and errors per endpoint,
+plus the server's memory (RSS):
+
+- uploaders post new episodes (POST /api/episodes/upload)
+- fixers poll the open queue, claim jobs and submit fixes
+- admins read lab summaries, episode lists and dataset stats and export ZIPs
+
+Point the API at a local Supabase stack (`supabase start`: Postgres,
+PostgREST and Storage) and seed it first with --seed-episodes, which runs
+scripts/reset_and_seed_demo.py and so wipes the database (refused unless
+SUPABASE_URL is local). --per-endpoint hammers one endpoint at a time
+instead of the mix, so memory is attributed per endpoint.
+
+Results are saved as JSON under backend/bench_results/; --compare checks a
+run against an earlier one and exits non-zero on regressions.
+
+Usage: python scripts/bench_api.py [--start-server] [--seed-episodes N]
+           [--duration SEC] [--uploaders N] [--fixers N] [--admins N]
+           [--per-endpoint] [--save NAME] [--compare FILE]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import signal
+import asyncio
+import argparse
+import subprocess
+from pathlib import Path
+from datetime import datetime, timezone
+from collections import defaultdict, Counter
+from typing import Optional, Dict, List
+from urllib.parse import urlparse
+
+import httpx
+import numpy as np
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+BACKEND_DIR = Path(__file__).parent.parent
+RESULTS_DIR = BACKEND_DIR / "bench_results"
+VIDEO_PATH = BACKEND_DIR.parent / "jarvis.mp4"
+LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1", "0.0.0.0", "host.docker.internal")
+
+FAILURE_REASONS = ["slip_after_grasp", "missed_grasp", "timeout", "collision_spike"]
+
+
+class Recorder:
+    """Per-endpoint latencies and status codes of requests started while recording."""
+
+    def __init__(self):
+        self.recording = False
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.bytes: Counter = Counter()
+        self.started_at = 0.0
+        self.stopped_at = 0.0
+        self.last_finished_at = 0.0
+
+    def start(self):
+        self.recording = True
+        self.started_at = time.perf_counter()
+
+    def stop(self):
+        self.recording = False
+        self.stopped_at = time.perf_counter()
+
+    async def request(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        recording = self.recording
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            response = None
+            status = type(e).__name__
+        finished = time.perf_counter()
+        elapsed = finished - started
+        if recording:
+            self.last_finished_at = max(self.last_finished_at, finished)
+            self.latencies[label].append(elapsed)
+            self.statuses[label][status] += 1
+            if response is not None:
+                self.bytes[label] += len(response.content)
+        return response
+
+    def summary(self) -> Dict[str, dict]:
+        # Slow requests started in the window count; so does their tail
+        elapsed = max(max(self.stopped_at, self.last_finished_at) - self.started_at, 1e-9)
+        endpoints = {}
+        for label, latencies in sorted(self.latencies.items()):
+            ms = np.array(latencies) * 1000
+            statuses = self.statuses[label]
+            errors = sum(n for status, n in statuses.items() if not status.isdigit() or int(status) >= 500)
+            endpoints[label] = {
+                "requests": len(latencies),
+                "rps": round(len(latencies) / elapsed, 2),
+                "p50_ms": round(float(np.percentile(ms, 50)), 2),
+                "p90_ms": round(float(np.percentile(ms, 90)), 2),
+                "p99_ms": round(float(np.percentile(ms, 99)), 2),
+                "max_ms": round(float(ms.max()), 2),
+                "errors": errors,
+                "statuses": dict(statuses),
+                "bytes": self.bytes[label],
+            }
+        return endpoints
+
+
+class MemorySampler:
+    """Samples a process's resident memory (Linux /proc, else `ps`)."""
+
+    def __init__(self, pid: Optional[int], interval: float = 0.25):
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[tuple] = []
+        self._task = None
+
+    def rss_mb(self) -> Optional[float]:
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        try:
+            out = subprocess.run(["ps", "-o", "rss=", "-p", str(self.pid)], capture_output=True, text=True)
+            return int(out.stdout.strip()) / 1024
+        except (OSError, ValueError):
+            return None
+
+    def sample(self):
+        rss = self.rss_mb() if self.pid else None
+        if rss is not None:
+            self.samples.append((time.perf_counter(), rss))
+
+    async def _run(self):
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.pid:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def window(self, start: float, end: float) -> Optional[dict]:
+        values = [rss for t, rss in self.samples if start <= t <= end]
+        if not values:
+            return None
+        return {"start_mb": round(values[0], 1), "peak_mb": round(max(values), 1), "end_mb": round(values[-1], 1)}
+
+
+class Context:
+    """Shared state of one run: ids to work with and the test video."""
+
+    def __init__(self, video: bytes, tasks: List[dict], labs: List[str], worker_ids: List[str], think: float):
+        self.video = video
+        self.tasks = tasks
+        self.labs = labs
+        self.worker_ids = worker_ids
+        self.think = think
+        self.rng = random.Random(0)
+        self.stop = asyncio.Event()
+
+    def meta(self, fix: bool = False) -> str:
+        task_id = self.rng.choice(self.tasks)["id"]
+        failed = not fix and self.rng.random() < 0.4
+        duration = round(self.rng.uniform(3.0, 10.0) if fix else self.rng.uniform(4.0, 20.0), 2)
+        return json.dumps({
+            "task_id": task_id,
+            "hz": 20,
+            "steps": round(duration * 20),
+            "duration_sec": duration,
+            "success": not failed,
+            "failure_reason": self.rng.choice(FAILURE_REASONS) if failed else None,
+            "failure_time_sec": round(self.rng.uniform(2.0, duration - 0.5), 2) if failed else None,
+        })
+
+    def files(self) -> dict:
+        return {"video": ("video.mp4", self.video, "video/mp4")}
+
+    async def pause(self, scale: float = 1.0):
+        # Jittered think time; returns early when the run stops
+        try:
+            await asyncio.wait_for(self.stop.wait(), timeout=self.think * scale * self.rng.uniform(0.5, 1.5))
+        except asyncio.TimeoutError:
+            pass
+
+
+# Simulated users
+async def uploader(client, recorder: Recorder, ctx: Context):
+    while not ctx.stop.is_set():
+        await recorder.request(
+            client, "POST /api/episodes/upload", "POST", "/api/episodes/upload",
+            data={"meta_json": ctx.meta()}, files=ctx.files(),
+        )
+        await ctx.pause()
+
+
+async def fixer(client, recorder: Recorder, ctx: Context, worker_id: str):
+    etag, jobs = None, []
+    while not ctx.stop.is_set():
+        # Poll the queue like the UI does, revalidating with the last ETag
+        headers = {"If-None-Match": etag} if etag else {}
+        response = await recorder.request(
+            client, "GET /api/jobs", "GET", "/api/jobs", params={"status": "open"}, headers=headers,
+        )
+        if response is None or response.status_code not in (200, 304):
+            await ctx.pause()
+            continue
+        if response.status_code == 200:
+            etag = response.headers.get("etag")
+            jobs = response.json().get("jobs", [])
+        if not jobs:
+            await ctx.pause()
+            continue
+
+        job_id = ctx.rng.choice(jobs[:20])["id"]
+        response = await recorder.request(
+            client, "POST /api/jobs/{job_id}/claim", "POST", f"/api/jobs/{job_id}/claim",
+            params={"worker_id": worker_id},
+        )
+        if response is None or response.status_code != 200:
+            # Someone else got it first
+            continue
+        await recorder.request(client, "GET /api/jobs/{job_id}", "GET", f"/api/jobs/{job_id}")
+        await ctx.pause(2.0)
+        await recorder.request(
+            client, "POST /api/jobs/{job_id}/submit_fix", "POST", f"/api/jobs/{job_id}/submit_fix",
+            data={"meta_json": ctx.meta(fix=True)}, files=ctx.files(),
+        )
+        await ctx.pause()
+
+
+async def admin(client, recorder: Recorder, ctx: Context):
+    iteration = 0
+    while not ctx.stop.is_set():
+        lab_id = ctx.rng.choice(ctx.labs)
+        task_id = ctx.rng.choice(ctx.tasks)["id"]
+        await recorder.request(client, "GET /api/labs/{lab_id}/summary", "GET", f"/api/labs/{lab_id}/summary")
+        await recorder.request(client, "GET /api/labs/{lab_id}/episodes", "GET", f"/api/labs/{lab_id}/episodes")
+        await recorder.request(client, "GET /api/dataset/stats", "GET", "/api/dataset/stats", params={"task_id": task_id})
+        if iteration % 5 == 0:
+            await recorder.request(client, "GET /api/export", "GET", "/api/export", params={"task_id": task_id})
+        iteration += 1
+        await ctx.pause(3.0)
+
+
+# Isolated endpoint phases (--per-endpoint)
+async def hammer_jobs(client, recorder: Recorder, ctx: Context):
+    while not ctx.stop.is_set():
+        await recorder.request(client, "GET /api/jobs", "GET", "/api/jobs", params={"status": "open"})
+
+
+async def hammer_upload(client, recorder: Recorder, ctx: Context):
+    while not ctx.stop.is_set():
+        await recorder.request(
+            client, "POST /api/episodes/upload", "POST", "/api/episodes/upload",
+            data={"meta_json": ctx.meta()}, files=ctx.files(),
+        )
+
+
+async def open_job_ids(client) -> List[str]:
+    response = await client.get("/api/jobs", params={"status": "open"})
+    return [job["id"] for job in response.json().get("jobs", [])] if response.status_code == 200 else []
+
+
+async def hammer_claim(client, recorder: Recorder, ctx: Context, queue: asyncio.Queue):
+    while not ctx.stop.is_set() and not queue.empty():
+        job_id = queue.get_nowait()
+        await recorder.request(
+            client, "POST /api/jobs/{job_id}/claim", "POST", f"/api/jobs/{job_id}/claim",
+            params={"worker_id": ctx.rng.choice(ctx.worker_ids)},
+        )
+
+
+async def hammer_submit_fix(client, recorder: Recorder, ctx: Context, queue: asyncio.Queue):
+    while not ctx.stop.is_set() and not queue.empty():
+        job_id = queue.get_nowait()
+        # Claiming is setup here, not part of the measurement
+        response = await client.post(f"/api/jobs/{job_id}/claim", params={"worker_id": ctx.rng.choice(ctx.worker_ids)})
+        if response.status_code != 200:
+            continue
+        await recorder.request(
+            client, "POST /api/jobs/{job_id}/submit_fix", "POST", f"/api/jobs/{job_id}/submit_fix",
+            data={"meta_json": ctx.meta(fix=True)}, files=ctx.files(),
+        )
+
+
+async def hammer_export(client, recorder: Recorder, ctx: Context):
+    while not ctx.stop.is_set():
+        task_id = ctx.rng.choice(ctx.tasks)["id"]
+        await recorder.request(client, "GET /api/export", "GET", "/api/export", params={"task_id": task_id})
+
+
+async def run_for(ctx: Context, recorder: Recorder, coroutines: list, warmup: float, duration: float):
+    """Run simulated users: `warmup` seconds unrecorded, then `duration` recorded."""
+    ctx.stop.clear()
+    if warmup <= 0:
+        recorder.start()
+    tasks = [asyncio.create_task(coroutine) for coroutine in coroutines]
+    finished = asyncio.gather(*tasks)
+    if warmup > 0:
+        try:
+            await asyncio.wait_for(asyncio.shield(finished), timeout=warmup)
+        except asyncio.TimeoutError:
+            pass
+        recorder.start()
+    try:
+        await asyncio.wait_for(asyncio.shield(finished), timeout=duration)
+    except asyncio.TimeoutError:
+        pass
+    recorder.stop()
+    ctx.stop.set()
+    await finished
+
+
+async def setup(client, video: bytes, fixers: int, think: float) -> Context:
+    tasks = (await client.get("/api/tasks")).json()["tasks"]
+    labs = (await client.get("/api/labs")).json()["labs"]
+    if not tasks or not labs:
+        raise RuntimeError("No tasks or labs found; seed the database first (--seed-episodes N)")
+
+    # One worker per fixer so claims are attributed like real traffic
+    run_id = datetime.now().strftime("%Y%m%d%H%M%S")
+    worker_ids = []
+    for i in range(max(fixers, 1)):
+        response = await client.post("/api/workers", json={"email": f"bench-{run_id}-{i}@example.com", "name": f"Bench {i}"})
+        response.raise_for_status()
+        worker_ids.append(response.json()["worker"]["id"])
+    return Context(video, tasks, [lab["id"] for lab in labs], worker_ids, think)
+
+
+async def benchmark(args, server_pid: Optional[int]) -> dict:
+    video = Path(args.video).read_bytes()
+    limits = httpx.Limits(max_connections=args.uploaders + args.fixers + args.admins + args.concurrency + 4)
+    sampler = MemorySampler(server_pid)
+    results = {"endpoints": {}, "memory": {}}
+
+    async with httpx.AsyncClient(base_url=args.api_url, timeout=120, limits=limits) as client:
+        ctx = await setup(client, video, args.fixers, args.think)
+        sampler.start()
+
+        if not args.per_endpoint:
+            recorder = Recorder()
+            users = (
+                [uploader(client, recorder, ctx) for _ in range(args.uploaders)]
+                + [fixer(client, recorder, ctx, worker_id) for worker_id in ctx.worker_ids[:args.fixers]]
+                + [admin(client, recorder, ctx) for _ in range(args.admins)]
+            )
+            print(f"🏃 {args.uploaders} uploaders, {args.fixers} fixers, {args.admins} admins: "
+                  f"{args.warmup:.0f}s warmup, {args.duration:.0f}s measured")
+            await run_for(ctx, recorder, users, args.warmup, args.duration)
+            sampler.sample()
+            results["endpoints"] = recorder.summary()
+            results["memory"]["mix"] = sampler.window(recorder.started_at, time.perf_counter())
+        else:
+            n = args.concurrency
+            # (endpoint, users, whether the phase uses up open jobs)
+            phases = [
+                ("GET /api/jobs", hammer_jobs, False),
+                ("POST /api/episodes/upload", hammer_upload, False),
+                ("POST /api/jobs/{job_id}/claim", hammer_claim, True),
+                ("POST /api/jobs/{job_id}/submit_fix", hammer_submit_fix, True),
+                ("GET /api/export", hammer_export, False),
+            ]
+            # Each open job can be claimed (and fixed) once: split them up
+            job_ids = await open_job_ids(client)
+            job_queues = [asyncio.Queue(), asyncio.Queue()]
+            for i, job_id in enumerate(job_ids):
+                job_queues[i % 2].put_nowait(job_id)
+
+            for label, hammer, uses_jobs in phases:
+                recorder = Recorder()
+                extra = ()
+                if uses_jobs:
+                    queue = job_queues.pop(0)
+                    if queue.empty():
+                        print(f"⚠️  {label}: no open jobs, skipped")
+                        continue
+                    extra = (queue,)
+                print(f"🏃 {label}: {n} concurrent, {args.duration:.0f}s")
+                users = [hammer(client, recorder, ctx, *extra) for _ in range(n)]
+                await run_for(ctx, recorder, users, 0 if uses_jobs else args.warmup, args.duration)
+                # Short phases can fall between periodic samples
+                sampler.sample()
+                results["endpoints"].update(recorder.summary())
+                results["memory"][label] = sampler.window(recorder.started_at, time.perf_counter())
+
+        await sampler.stop()
+    return results
+
+
+# Server, seeding, results
+def start_server(port: int) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/tasks", timeout=2)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("API server did not start within 60s")
+
+
+def seed(episodes: int, allow_remote: bool):
+    host = urlparse(os.getenv("SUPABASE_URL", "")).hostname
+    if host not in LOCAL_HOSTS and not allow_remote:
+        print(f"❌ Error: refusing to reset non-local Supabase ({host}); pass --allow-remote-reset to override")
+        sys.exit(1)
+    subprocess.run(
+        [sys.executable, "scripts/reset_and_seed_demo.py", "--episodes", str(episodes), "--no-meta", "--seed", "0"],
+        cwd=BACKEND_DIR,
+        check=True,
+    )
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_results(results: dict):
+    print()
+    print(f"{'endpoint':42} {'reqs':>7} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for label, stats in results["endpoints"].items():
+        print(f"{label:42} {stats['requests']:>7} {stats['rps']:>8.1f} {stats['p50_ms']:>8.1f} "
+              f"{stats['p90_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['errors']:>7}")
+    memory = {phase: window for phase, window in results["memory"].items() if window}
+    if memory:
+        print()
+        for phase, window in memory.items():
+            print(f"🧠 {phase}: RSS {window['start_mb']} → peak {window['peak_mb']} MB (end {window['end_mb']} MB)")
+
+
+def compare(results: dict, baseline_path: str, max_regression: float) -> int:
+    """Print changes against a saved run; returns the number of regressions."""
+    baseline = json.loads(Path(baseline_path).read_text())
+    print()
+    print(f"📊 Compared with {baseline_path} ({baseline.get('commit') or 'unknown commit'})")
+    regressions = 0
+    for label, stats in results["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(label)
+        if not before or not before["rps"] or not before["p99_ms"]:
+            continue
+        rps_change = stats["rps"] / before["rps"] - 1
+        p99_change = stats["p99_ms"] / before["p99_ms"] - 1
+        regressed = rps_change < -max_regression or p99_change > max_regression
+        regressions += regressed
+        print(f"{'❌' if regressed else '✅'} {label:42} req/s {rps_change:+7.1%}   p99 {p99_change:+7.1%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API")
+    parser.add_argument("--api-url", default=os.getenv("API_URL", "http://localhost:8000"), help="API to test")
+    parser.add_argument("--start-server", action="store_true", help="Start the API (uvicorn) for the run and track its memory")
+    parser.add_argument("--port", type=int, default=8055, help="Port for --start-server (default: 8055)")
+    parser.add_argument("--server-pid", type=int, help="PID of an already running API, to track its memory")
+    parser.add_argument("--seed-episodes", type=int, help="Reset and seed N episodes first (local Supabase only)")
+    parser.add_argument("--allow-remote-reset", action="store_true", help="Allow --seed-episodes on a non-local Supabase")
+    parser.add_argument("--video", default=str(VIDEO_PATH), help="Video uploaded with episodes and fixes")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds (per phase with --per-endpoint)")
+    parser.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds before measuring")
+    parser.add_argument("--uploaders", type=int, default=2)
+    parser.add_argument("--fixers", type=int, default=8)
+    parser.add_argument("--admins", type=int, default=1)
+    parser.add_argument("--think", type=float, default=0.5, help="Mean think time between user actions in seconds")
+    parser.add_argument("--per-endpoint", action="store_true", help="Load one endpoint at a time instead of the mix")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent requests per --per-endpoint phase")
+    parser.add_argument("--save", help="Name of the results file (default: timestamp)")
+    parser.add_argument("--compare", help="Earlier results file to compare with")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed req/s drop or p99 increase (default: 0.2)")
+    args = parser.parse_args()
+
+    if not Path(args.video).exists():
+        print(f"❌ Error: Video file not found at {args.video} (pass --video)")
+        sys.exit(1)
+
+    if args.seed_episodes:
+        seed(args.seed_episodes, args.allow_remote_reset)
+        print()
+
+    server = None
+    server_pid = args.server_pid
+    if args.start_server:
+        server = start_server(args.port)
+        server_pid = server.pid
+        args.api_url = f"http://127.0.0.1:{args.port}"
+        print(f"🚀 Started API on {args.api_url} (pid {server_pid})")
+
+    try:
+        results = asyncio.run(benchmark(args, server_pid))
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGINT)
+            server.wait(timeout=30)
+
+    results = {
+        "name": args.save,
+        "commit": git_commit(),
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            key: getattr(args, key)
+            for key in ("duration", "warmup", "uploaders", "fixers", "admins", "think", "per_endpoint", "concurrency", "seed_episodes")
+        },
+        **results,
+    }
+    print_results(results)
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    path = RESULTS_DIR / f"{args.save or datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    path.write_text(json.dumps(results, indent=2))
+    print()
+    print(f"💾 Saved results to {path}")
+
+    if args.compare and compare(results, args.compare, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
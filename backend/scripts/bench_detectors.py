@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark signal-based edge-case detection.
+Builds a synthetic 10-minute, 500 Hz episode with a torque spike injected
+near the end and times detectors.detect on it.
+
+Usage: python scripts/bench_detectors.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path to import detectors
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from detectors import detect
+
+HZ = 500
+DURATION_SEC = 600
+SPIKE_SEC = 512.3
+
+
+def generate_arrays(steps: int) -> dict:
+    rng = np.random.default_rng(0)
+    t = np.arange(steps, dtype=np.float32) / HZ
+    joint_pos = (0.5 * np.sin(0.2 * t)[:, None] + 0.001 * rng.standard_normal((steps, 7))).astype(np.float32)
+    effort = (5.0 + rng.standard_normal((steps, 7))).astype(np.float32)
+    spike = int(SPIKE_SEC * HZ)
+    effort[spike:spike + 50] += 80.0
+    return {
+        "joint_pos": joint_pos,
+        "effort": effort,
+        "gripper": np.full(steps, 0.02, dtype=np.float32),
+    }
+
+
+if __name__ == "__main__":
+    steps = HZ * DURATION_SEC
+    arrays = generate_arrays(steps)
+    print(f"⏱️  Edge-case detection on a {DURATION_SEC}s, {HZ} Hz episode ({steps:,} steps)\n")
+
+    timings = []
+    for _ in range(10):
+        start = time.perf_counter()
+        detection = detect(arrays, HZ)
+        timings.append(time.perf_counter() - start)
+
+    print(f"   detection: {detection.to_dict() if detection else None}")
+    print(f"   best: {min(timings) * 1000:.1f} ms, median: {sorted(timings)[len(timings) // 2] * 1000:.1f} ms")
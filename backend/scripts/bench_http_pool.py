@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark outbound connection reuse.
+Sends the same requests three ways: a new connection per call (what the
+resend SDK did, and what any per-request client does), then through a
+shared pool (clients.py) over HTTP/1.1 and over HTTP/2. Reports
+throughput, latency percentiles, the connections opened and the TCP + TLS
+setup time they cost, read from the pool metrics that /metrics exports.
+
+By default the requests are one-row PostgREST selects on SUPABASE_URL;
+--url benchmarks any other endpoint. HTTP/2 is negotiated during the TLS
+handshake, so against a plain http:// URL the HTTP/2 row is HTTP/1.1 too.
+
+Usage: python scripts/bench_http_pool.py [--url URL] [--requests 400] [--concurrency 16]
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import numpy as np
+from dotenv import load_dotenv
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Load environment variables
+load_dotenv()
+
+import telemetry
+from clients import new_pool, HTTP_POOL_MAX_CONNECTIONS
+
+
+def pool_stats(name: str) -> tuple:
+    """(connections opened, seconds spent opening them) for a metered pool."""
+    value = telemetry.REGISTRY.get_sample_value
+    labels = {"pool": name}
+    return (
+        int(value("http_pool_connect_duration_seconds_count", labels) or 0),
+        value("http_pool_connect_duration_seconds_sum", labels) or 0.0,
+    )
+
+
+def run(name: str, send, requests: int, concurrency: int) -> dict:
+    def timed(_):
+        started = time.perf_counter()
+        send().raise_for_status()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        latencies = np.array(list(executor.map(timed, range(requests)))) * 1000
+    elapsed = time.perf_counter() - started
+
+    connections, setup_sec = pool_stats(name)
+    return {
+        "rps": requests / elapsed,
+        "p50": np.percentile(latencies, 50),
+        "p90": np.percentile(latencies, 90),
+        "p99": np.percentile(latencies, 99),
+        "connections": connections,
+        "setup_ms": setup_sec * 1000 / max(connections, 1),
+        "reuse": 1 - connections / requests,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark outbound connection pooling")
+    parser.add_argument("--url", help="Endpoint to GET (default: a PostgREST select on SUPABASE_URL)")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    if not telemetry.metrics_available():
+        print("❌ prometheus_client is required (pip install prometheus-client)")
+        sys.exit(1)
+
+    headers = {}
+    url = args.url
+    if not url:
+        supabase_url = os.getenv("SUPABASE_URL")
+        key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+        if not supabase_url or not key:
+            print("❌ Set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY, or pass --url")
+            sys.exit(1)
+        url = f"{supabase_url.rstrip('/')}/rest/v1/tasks?select=id&limit=1"
+        headers = {"apikey": key, "Authorization": f"Bearer {key}"}
+
+    print(f"⏱️  {args.requests} requests, {args.concurrency} at a time: GET {url}")
+    print(f"   pool limit {HTTP_POOL_MAX_CONNECTIONS} connections\n")
+
+    def per_call():
+        with httpx.Client(headers=headers, transport=new_pool("per-call", http2=False, max_connections=1)) as client:
+            return client.get(url)
+
+    http1 = httpx.Client(headers=headers, transport=new_pool("pooled-http1", http2=False))
+    http2 = httpx.Client(headers=headers, transport=new_pool("pooled-http2", http2=True))
+    modes = [
+        ("per-call", per_call),
+        ("pooled-http1", lambda: http1.get(url)),
+        ("pooled-http2", lambda: http2.get(url)),
+    ]
+
+    print(f"   {'mode':<14} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'conns':>6} {'setup ms':>9} {'reuse':>6}")
+    for name, send in modes:
+        result = run(name, send, args.requests, args.concurrency)
+        print(
+            f"   {name:<14} {result['rps']:8.1f} {result['p50']:8.1f} {result['p90']:8.1f} {result['p99']:8.1f} "
+            f"{result['connections']:6d} {result['setup_ms']:9.1f} {result['reuse']:6.0%}"
+        )
+    http1.close()
+    http2.close()
+    print("\n   setup ms: mean TCP + TLS time per new connection; reuse: requests that skipped it")
+
+
+if __name__ == "__main__":
+    main()
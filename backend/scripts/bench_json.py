@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON serialization of large list responses.
+Generates N synthetic episode rows (as returned by Supabase) and times
+FastAPI's default encoding against the orjson response paths.
+
+Usage: python scripts/bench_json.py [N]
+"""
+
+import sys
+import timeit
+import uuid
+import random
+from pathlib import Path
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from responses import FastJSONResponse, trusted_json
+
+TASK_IDS = ['pick_reflective_v1', 'pick_bin_v1', 'peg_v1', 'place_precise_v1', 'tool_handoff_v1', 'pose_hold_v1']
+FAILURE_REASONS = [None, 'slip_after_grasp', 'missed_grasp', 'timeout', 'collision_spike']
+# Each timing is the best of REPEAT runs
+REPEAT = 5
+
+
+def generate_rows(n: int, seed: int = 0) -> list:
+    """Generate n episode rows shaped like `select * from episodes`."""
+    rng = random.Random(seed)
+    now = datetime(2024, 1, 1)
+    rows = []
+    for _ in range(n):
+        episode_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        success = rng.random() < 0.6
+        rows.append({
+            'id': episode_id,
+            'task_id': rng.choice(TASK_IDS),
+            'lab_id': '11111111-1111-1111-1111-111111111111',
+            'project_id': None,
+            'uploader_user_id': '00000000-0000-0000-0000-000000000000',
+            'storage_path': f'episodes/{episode_id}',
+            'video_path': f'episodes/{episode_id}/video.mp4',
+            'success': success,
+            'failure_reason': None if success else rng.choice(FAILURE_REASONS),
+            'failure_time_sec': None if success else round(rng.uniform(1, 10), 2),
+            'hz': 20,
+            'steps': 200,
+            'duration_sec': round(rng.uniform(3, 25), 2),
+            'edge_case': not success,
+            'quality_score': rng.randint(0, 100),
+            'accepted': success,
+            'created_at': (now + timedelta(seconds=rng.randint(0, 10**7))).isoformat(),
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    content = {'episodes': generate_rows(n)}
+    size = len(trusted_json(content).body)
+
+    print(f"⏱️  Serializing {n:,} episode rows ({size / 1e6:.1f} MB)\n")
+    default_sec = min(timeit.repeat(lambda: JSONResponse(jsonable_encoder(content)), number=1, repeat=REPEAT))
+    print(f"   jsonable_encoder + json:   {default_sec * 1000:8.1f} ms")
+    encoder_sec = min(timeit.repeat(lambda: FastJSONResponse(jsonable_encoder(content)), number=1, repeat=REPEAT))
+    print(f"   jsonable_encoder + orjson: {encoder_sec * 1000:8.1f} ms")
+    trusted_sec = min(timeit.repeat(lambda: trusted_json(content), number=1, repeat=REPEAT))
+    print(f"   trusted_json (orjson):     {trusted_sec * 1000:8.1f} ms  ({default_sec / trusted_sec:.0f}x)")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Benchmark the batch QC rule engine.
+Generates N synthetic episode metas and times qc.evaluate_batch on them.
+
+Usage: python scripts/bench_qc.py [N]
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path to import qc
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from qc import QCRules, evaluate_batch
+
+TASK_IDS = np.array(['pick_reflective_v1', 'pick_bin_v1', 'peg_v1', 'place_precise_v1', 'tool_handoff_v1', 'pose_hold_v1'], dtype=object)
+FAILURE_REASONS = np.array([None, 'slip_after_grasp', 'missed_grasp', 'timeout', 'collision_spike'], dtype=object)
+# Each timing is the best of REPEAT runs
+REPEAT = 5
+
+
+def generate_columns(n: int, seed: int = 0) -> dict:
+    """Generate n random episode metas as columns."""
+    rng = np.random.default_rng(seed)
+    success = rng.random(n) < 0.6
+    return {
+        'success': success,
+        'duration_sec': rng.uniform(3.0, 25.0, n),
+        'failure_reason': np.where(success, None, FAILURE_REASONS[rng.integers(0, len(FAILURE_REASONS), n)]),
+        'task_id': TASK_IDS[rng.integers(0, len(TASK_IDS), n)],
+    }
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    columns = generate_columns(n)
+    rules_by_task = {
+        'peg_v1': QCRules.from_dict({'accept_max_duration_sec': 25.0}),
+        'pose_hold_v1': QCRules.from_dict({'long_duration_sec': 20.0}),
+    }
+
+    print(f"⏱️  QC batch evaluation on {n:,} episodes\n")
+    default_sec = min(timeit.repeat(lambda: evaluate_batch(columns), number=1, repeat=REPEAT))
+    print(f"   default rules:      {default_sec * 1000:8.1f} ms")
+    per_task_sec = min(timeit.repeat(lambda: evaluate_batch(columns, rules_by_task=rules_by_task), number=1, repeat=REPEAT))
+    print(f"   per-task overrides: {per_task_sec * 1000:8.1f} ms")
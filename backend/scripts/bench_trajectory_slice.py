@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark trajectory window reads.
+Encodes a synthetic 1 kHz, hour-long episode and times 2-second window reads
+through TrajectoryReader, both from the memory-mapped local cache and through
+byte-range fetches (served from memory, so network time is excluded).
+
+Usage: python scripts/bench_trajectory_slice.py
+"""
+
+import sys
+import time
+import random
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path to import trajectory
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from trajectory import encode_trajectory, TrajectoryReader
+
+HZ = 1000
+DURATION_SEC = 3600
+WINDOW_SEC = 2.0
+BASE_PATH = "episodes/bench/trajectory"
+
+
+def generate_arrays(steps: int) -> dict:
+    rng = np.random.default_rng(0)
+    return {
+        "joint_pos": rng.standard_normal((steps, 7), dtype=np.float32),
+        "joint_vel": rng.standard_normal((steps, 7), dtype=np.float32),
+        "effort": rng.standard_normal((steps, 7), dtype=np.float32),
+        "gripper": rng.random(steps, dtype=np.float32),
+    }
+
+
+def time_windows(reader: TrajectoryReader, steps: int, repeat: int = 200) -> list:
+    window = int(WINDOW_SEC * HZ)
+    timings = []
+    for _ in range(repeat):
+        start = random.randrange(0, steps - window)
+        t0 = time.perf_counter()
+        arrays = reader.read(BASE_PATH, start, start + window)
+        assert all(a.shape[0] == window for a in arrays.values())
+        timings.append((time.perf_counter() - t0) * 1000)
+    return sorted(timings)
+
+
+def report(label: str, timings: list):
+    p50 = timings[len(timings) // 2]
+    p99 = timings[int(len(timings) * 0.99) - 1]
+    print(f"   {label:<22} p50={p50:6.2f} ms  p99={p99:6.2f} ms")
+
+
+if __name__ == "__main__":
+    steps = HZ * DURATION_SEC
+    print(f"⏱️  {WINDOW_SEC:.0f}s windows from a {HZ} Hz, {DURATION_SEC}s episode ({steps:,} steps)\n")
+    arrays = generate_arrays(steps)
+    manifest, files = encode_trajectory(arrays, HZ)
+    print(f"   {manifest['num_chunks']} chunks x {len(arrays)} fields, {sum(len(d) for d in files.values()) / 1e6:.0f} MB total\n")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        reader = TrajectoryReader(fetch=None, cache_dir=cache_dir)
+        reader.write_through(BASE_PATH, files)
+        report("memory-mapped cache", time_windows(reader, steps))
+
+    def fetch(path, start=None, end=None):
+        data = files[path[len(BASE_PATH) + 1:]]
+        return data if start is None else data[start:end]
+
+    report("byte-range fetch", time_windows(TrajectoryReader(fetch), steps))
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Check the edge-case detectors on synthetic episodes: clean grasps, releases
+and an idle gripper must not fire, slips and a collision must fire at the
+right time. Exits 1 when a case fails.
+
+Usage: python scripts/check_detectors.py
+"""
+
+import sys
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+# Add parent directory to path to import detectors
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from detectors import detect
+
+HZ = 100
+DURATION_SEC = 6.0
+
+
+def ramp(values: np.ndarray, start_sec: float, seconds: float, to: float) -> np.ndarray:
+    """Move linearly from the current value to `to` over `seconds`, then stay there."""
+    t = np.arange(values.shape[0]) / HZ
+    start = int(start_sec * HZ)
+    frm = values[start]
+    progress = np.clip((t - start_sec) / seconds, 0.0, 1.0)
+    values = values.copy()
+    values[start:] = frm + (to - frm) * progress[start:]
+    return values
+
+
+def grasp(close_to: float = 1.0, release_sec: Optional[float] = 4.5) -> np.ndarray:
+    """Open at 0, a 0.5 s close at 1 s, held, and released again at `release_sec`."""
+    gripper = ramp(np.zeros(int(DURATION_SEC * HZ)), 1.0, 0.5, close_to)
+    if release_sec is not None:
+        gripper = ramp(gripper, release_sec, 0.5, 0.0)
+    return gripper
+
+
+def noisy(values: np.ndarray, sigma: float = 0.002) -> np.ndarray:
+    return values + np.random.default_rng(0).normal(0.0, sigma, values.shape)
+
+
+def cases() -> list:
+    """(name, arrays, expected failure_reason or None, expected time window or None)."""
+    steps = int(DURATION_SEC * HZ)
+    effort = np.full((steps, 7), 5.0)
+    effort[int(3.0 * HZ):int(3.1 * HZ)] += 80.0
+    closed_on_object = grasp(close_to=0.6, release_sec=None)
+    slid_out = ramp(closed_on_object, 3.0, 0.3, 0.95)
+    forced_open = ramp(closed_on_object, 3.0, 0.3, 0.3)
+    command = ramp(ramp(np.zeros(steps), 1.0, 0.01, 1.0), 4.5, 0.01, 0.0)
+    return [
+        ("clean grasp and release", {"gripper": grasp()}, None, None),
+        ("clean grasp, noisy sensor", {"gripper": noisy(grasp())}, None, None),
+        ("grasp on an object, two fingers", {"gripper_pos": np.stack([grasp(0.6), grasp(0.6)], axis=1)}, None, None),
+        ("commanded grasp and release", {"gripper": grasp(0.6), "gripper_cmd": command}, None, None),
+        ("idle gripper", {"gripper": noisy(np.full(steps, 0.02), 0.0005)}, None, None),
+        ("object slides out", {"gripper": slid_out}, "gripper_slip", (3.0, 3.4)),
+        ("forced open against the command", {"gripper": forced_open, "gripper_cmd": command}, "gripper_slip", (3.0, 3.4)),
+        ("collision", {"effort": effort, "gripper": grasp()}, "collision_spike", (2.9, 3.2)),
+    ]
+
+
+if __name__ == "__main__":
+    print(f"🔎 Edge-case detectors on synthetic {DURATION_SEC:.0f}s, {HZ} Hz episodes\n")
+    failed = 0
+    for name, arrays, reason, window in cases():
+        detection = detect(arrays, HZ)
+        got = detection.failure_reason if detection else None
+        ok = got == reason and (
+            window is None or window[0] <= detection.failure_time_sec <= window[1]
+        )
+        failed += not ok
+        detail = f"{got} at {detection.failure_time_sec}s" if detection else "no detection"
+        print(f"{'✅' if ok else '❌'} {name}: {detail}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Check the API's cold start: how long `import main` takes in a fresh
+interpreter (`python -X importtime`), which modules dominate, and that the
+SDKs meant to load lazily (Supabase, httpx, see clients.py) stay out of
+the import. Exits 1 when the median import time is over --budget-ms or a
+deferred SDK was imported.
+
+Usage: python scripts/check_startup.py [--runs 5] [--budget-ms 1200] [--top 15]
+"""
+
+import sys
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Top-level packages that must only be imported on first use
+DEFERRED = ("supabase", "postgrest", "storage3", "gotrue", "httpx", "h2", "requests", "asyncpg", "email_templates")
+
+
+def import_profile() -> tuple:
+    """(total microseconds for `import main`, {module: (self us, cumulative us)}) in a fresh process."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "import main failed")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules["main"][1], modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check `import main` time and lazy imports")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time (median is used)")
+    parser.add_argument("--budget-ms", type=float, default=1200, help="Fail above this median import time")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    # The first run warms the bytecode cache
+    import_profile()
+    totals, modules = [], {}
+    for _ in range(args.runs):
+        total, modules = import_profile()
+        totals.append(total / 1000)
+    median = statistics.median(totals)
+
+    print(f"⏱️  import main: median {median:.0f} ms over {args.runs} runs (min {min(totals):.0f}, max {max(totals):.0f})")
+    print()
+    print("🔍 Slowest imports (cumulative):")
+    packages = {name: cumulative for name, (_, cumulative) in modules.items() if "." not in name and name != "main"}
+    for name, cumulative in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"   {cumulative / 1000:8.1f} ms  {name}")
+    print()
+
+    failed = False
+    eager = [name for name in DEFERRED if name in modules]
+    if eager:
+        print(f"❌ Imported at startup but meant to load lazily: {', '.join(eager)}")
+        failed = True
+    else:
+        print(f"✅ Deferred SDKs not imported: {', '.join(DEFERRED)}")
+    if median > args.budget_ms:
+        print(f"❌ Import time {median:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    else:
+        print(f"✅ Import time within the {args.budget_ms:.0f} ms budget")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
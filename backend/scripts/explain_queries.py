@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Check that the API's hot queries are served by an index (migrations 010 and
+014). Runs EXPLAIN on the SQL each endpoint sends through PostgREST, using a
+lab and task from the database, and fails if a query's plan does not scan one
+of the indexes expected for it.
+
+Plans use the real costs, so the result is what the database would do with
+the data it holds. On small tables Postgres prefers sequential scans whatever
+the indexes; --force-index disables sequential scans to check that each
+query can use its index at all. --analyze also executes the queries and
+reports their timings.
+
+Needs DATABASE_URL (the Postgres connection string) and `pip install asyncpg`.
+
+Usage: python scripts/explain_queries.py [--force-index] [--analyze]
+"""
+
+import os
+import sys
+import json
+import asyncio
+import argparse
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+INDEX_SCANS = ("Index Scan", "Index Only Scan", "Bitmap Index Scan")
+
+# (endpoint, SQL, acceptable indexes); :lab_id and :task_id are bound to samples
+QUERIES = [
+    (
+        "GET /api/jobs",
+        "SELECT * FROM jobs ORDER BY created_at DESC",
+        ("idx_jobs_created",),
+    ),
+    (
+        "GET /api/jobs?status=open",
+        "SELECT * FROM jobs WHERE status = 'open' ORDER BY created_at DESC",
+        ("idx_jobs_open_created", "idx_jobs_status"),
+    ),
+    (
+        "GET /api/jobs?status=open&lab_id=",
+        "SELECT * FROM jobs WHERE status = 'open' AND lab_id = :lab_id ORDER BY created_at DESC",
+        ("idx_jobs_lab_status_created",),
+    ),
+    (
+        "GET /api/jobs?task_id=",
+        "SELECT * FROM jobs WHERE task_id = :task_id ORDER BY created_at DESC",
+        ("idx_jobs_task_status_created",),
+    ),
+    (
+        "GET /api/labs/{id}/summary (episodes)",
+        "SELECT id, accepted, edge_case FROM episodes WHERE lab_id = :lab_id",
+        ("idx_episodes_lab_created", "idx_episodes_lab_task_created"),
+    ),
+    (
+        "GET /api/labs/{id}/summary (jobs)",
+        "SELECT id, status, fix_episode_id FROM jobs WHERE lab_id = :lab_id",
+        ("idx_jobs_lab_status_created",),
+    ),
+    (
+        "GET /api/labs/{id}/episodes",
+        "SELECT * FROM episodes WHERE lab_id = :lab_id ORDER BY created_at DESC",
+        ("idx_episodes_lab_created",),
+    ),
+    (
+        "GET /api/labs/{id}/episodes?task_id=",
+        "SELECT * FROM episodes WHERE lab_id = :lab_id AND task_id = :task_id ORDER BY created_at DESC",
+        ("idx_episodes_lab_task_created",),
+    ),
+    (
+        "GET /api/dataset/stats (episodes)",
+        "SELECT edge_case, accepted, quality_score, failure_reason FROM episodes WHERE task_id = :task_id AND lab_id = :lab_id",
+        ("idx_episodes_task_id", "idx_episodes_lab_task_created"),
+    ),
+    (
+        "GET /api/dataset/stats (jobs)",
+        "SELECT status, fix_episode_id FROM jobs WHERE task_id = :task_id AND lab_id = :lab_id",
+        ("idx_jobs_task_status_created", "idx_jobs_lab_status_created"),
+    ),
+    (
+        "GET /api/export (episodes)",
+        "SELECT id, storage_path, video_path FROM episodes WHERE task_id = :task_id AND accepted = TRUE",
+        ("idx_episodes_task_accepted",),
+    ),
+    (
+        "GET /api/export (fixes)",
+        "SELECT fix_episode_id FROM jobs WHERE task_id = :task_id AND status = 'accepted'",
+        ("idx_jobs_task_status_created",),
+    ),
+    (
+        "GET /api/tasks?lab_id=",
+        "SELECT * FROM tasks WHERE lab_id = :lab_id",
+        ("idx_tasks_lab_id",),
+    ),
+    (
+        "GET /api/projects?lab_id=",
+        "SELECT * FROM projects WHERE lab_id = :lab_id ORDER BY created_at DESC",
+        ("idx_projects_lab_created",),
+    ),
+    (
+        "scripts/gc_media_blobs.py",
+        "SELECT sha256, storage_path FROM media_blobs WHERE ref_count <= 0 AND created_at < NOW() - INTERVAL '1 hour'",
+        ("idx_media_blobs_unreferenced",),
+    ),
+]
+
+
+def scanned_indexes(plan: dict) -> list:
+    """Index names scanned anywhere in a plan tree."""
+    found = []
+    if plan.get("Node Type") in INDEX_SCANS:
+        found.append(plan.get("Index Name"))
+    for child in plan.get("Plans", []):
+        found.extend(scanned_indexes(child))
+    return found
+
+
+def bind(sql: str, lab_id: str, task_id: str) -> tuple:
+    """Number the named placeholders that occur in `sql` ($1, $2, ...)."""
+    args = []
+    for name, value, cast in (("lab_id", lab_id, "uuid"), ("task_id", task_id, "text")):
+        if f":{name}" in sql:
+            args.append(value)
+            sql = sql.replace(f":{name}", f"${len(args)}::{cast}")
+    return sql, args
+
+
+async def sample_ids(conn) -> tuple:
+    """A lab and one of its tasks, so the plans use realistic values."""
+    row = await conn.fetchrow(
+        "SELECT lab_id::text, task_id FROM episodes WHERE lab_id IS NOT NULL ORDER BY created_at DESC LIMIT 1"
+    )
+    if row is None:
+        return "00000000-0000-0000-0000-000000000000", "pick_v1"
+    return row["lab_id"], row["task_id"]
+
+
+async def explain(conn, sql: str, args: list, analyze: bool) -> dict:
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    result = await conn.fetchval(f"EXPLAIN ({options}) {sql}", *args)
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result[0]
+
+
+async def run(force_index: bool, analyze: bool) -> int:
+    import asyncpg
+
+    conn = await asyncpg.connect(DATABASE_URL)
+    try:
+        lab_id, task_id = await sample_ids(conn)
+        print(f"🔍 Explaining {len(QUERIES)} queries (lab {lab_id}, task {task_id})")
+        if force_index:
+            print("   Sequential scans disabled (plans do not reflect real costs)")
+        print()
+
+        failures = 0
+        async with conn.transaction():
+            if force_index:
+                await conn.execute("SET LOCAL enable_seqscan = off")
+            for endpoint, sql, expected in QUERIES:
+                result = await explain(conn, *bind(sql, lab_id, task_id), analyze)
+                plan = result["Plan"]
+                used = scanned_indexes(plan)
+                ok = any(name in expected for name in used)
+                failures += not ok
+
+                timing = f", {result['Execution Time']:.2f} ms" if analyze else ""
+                scans = ", ".join(used) if used else plan["Node Type"]
+                print(f"{'✅' if ok else '❌'} {endpoint}")
+                print(f"   {scans} (cost {plan['Total Cost']:.1f}{timing})")
+                if not ok:
+                    print(f"   expected one of: {', '.join(expected)}")
+    finally:
+        await conn.close()
+
+    print()
+    if failures:
+        print(f"❌ {failures} of {len(QUERIES)} queries do not use their index (are migrations 010 and 014 applied?)")
+        if not force_index:
+            print("   Small tables are scanned sequentially anyway; --force-index checks the indexes are usable")
+        return 1
+    print(f"✅ All {len(QUERIES)} queries use an index")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that API queries are served by indexes")
+    parser.add_argument("--force-index", action="store_true", help="Plan with sequential scans disabled")
+    parser.add_argument("--analyze", action="store_true", help="Execute the queries and report timings")
+    args = parser.parse_args()
+
+    if not DATABASE_URL:
+        print("❌ Error: DATABASE_URL must be set")
+        sys.exit(1)
+    try:
+        import asyncpg  # noqa: F401
+    except ImportError:
+        print("❌ Error: asyncpg is not installed (pip install asyncpg)")
+        sys.exit(1)
+
+    sys.exit(asyncio.run(run(args.force_index, args.analyze)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Remove content-addressed video blobs that no episode references any more.
+Reference counts are maintained by the database (migration 008); blobs
+created within the last hour are kept, since their episode row may still
+be on its way.
+
+Usage: python scripts/gc_media_blobs.py [--dry-run]
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+from dotenv import load_dotenv
+from supabase import create_client
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from blobs import collect_garbage
+from logs import setup_logging
+
+# Load environment variables
+load_dotenv()
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delete unreferenced media blobs")
+    parser.add_argument("--dry-run", action="store_true", help="List blobs without deleting them")
+    args = parser.parse_args()
+    setup_logging(fmt="text")
+
+    if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
+        print("❌ Error: SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set")
+        sys.exit(1)
+
+    supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+
+    print("🗑️  Collecting unreferenced media blobs..." + (" (dry run)" if args.dry_run else ""))
+    paths = collect_garbage(supabase, dry_run=args.dry_run)
+    for path in paths:
+        print(f"   {path}")
+    print(f"✓ {'Would delete' if args.dry_run else 'Deleted'} {len(paths)} blobs")
+
+
+if __name__ == "__main__":
+    main()
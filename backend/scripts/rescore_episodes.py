@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Re-score all episodes with the current QC rules.
+Streams episodes in id order, writes back only changed rows and opens/closes
+jobs when an episode's edge-case status flips.
+
+Progress is checkpointed after every chunk, so an interrupted run can be
+continued with --resume.
+
+Usage: python scripts/rescore_episodes.py [--chunk-size N] [--dry-run] [--resume]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from dotenv import load_dotenv
+from supabase import create_client
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from rescore import rescore_episodes, DEFAULT_CHUNK_SIZE
+from logs import setup_logging
+
+# Load environment variables
+load_dotenv()
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+CHECKPOINT_PATH = Path(__file__).parent.parent / ".rescore_checkpoint.json"
+
+
+def load_checkpoint():
+    """Return the last processed episode id, if a checkpoint exists."""
+    if not CHECKPOINT_PATH.exists():
+        return None
+    return json.loads(CHECKPOINT_PATH.read_text()).get("last_id")
+
+
+def save_checkpoint(progress):
+    CHECKPOINT_PATH.write_text(json.dumps(progress.to_dict(), indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score episodes with the current QC rules")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Episodes per chunk")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing them")
+    parser.add_argument("--resume", action="store_true", help="Continue from the last checkpoint")
+    args = parser.parse_args()
+    setup_logging(fmt="text")
+
+    if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
+        print("❌ Error: SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set")
+        sys.exit(1)
+
+    supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+
+    after_id = load_checkpoint() if args.resume else None
+    if after_id:
+        print(f"↩️  Resuming after episode {after_id}")
+
+    start = time.perf_counter()
+
+    def on_progress(progress):
+        if not args.dry_run:
+            save_checkpoint(progress)
+        rate = progress.scanned / max(time.perf_counter() - start, 1e-9)
+        print(
+            f"   scanned={progress.scanned:,} changed={progress.changed:,} "
+            f"jobs_opened={progress.jobs_opened} jobs_closed={progress.jobs_closed} "
+            f"({rate:,.0f} episodes/s)"
+        )
+
+    print("🔁 Re-scoring episodes..." + (" (dry run)" if args.dry_run else ""))
+    progress = rescore_episodes(
+        supabase,
+        chunk_size=args.chunk_size,
+        after_id=after_id,
+        dry_run=args.dry_run,
+        on_progress=on_progress,
+    )
+
+    if not args.dry_run and CHECKPOINT_PATH.exists():
+        CHECKPOINT_PATH.unlink()
+
+    print()
+    print(f"✓ Scanned {progress.scanned:,} episodes in {time.perf_counter() - start:.1f}s")
+    print(f"✓ Changed {progress.changed:,} episodes")
+    print(f"✓ Jobs opened: {progress.jobs_opened}, closed: {progress.jobs_closed}")
+
+
+if __name__ == "__main__":
+    main()
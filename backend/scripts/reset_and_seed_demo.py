@@ -4,27 +4,46 @@ Reset and seed demo data for UMM Data Factory.
 - Deletes all storage objects
 - Truncates all tables
 - Seeds realistic demo data with multiple labs, workers, projects, tasks, episodes, jobs, and fixes
+
+Episodes are generated and inserted in batches (see backend/seeding.py), so
+large datasets for load testing are quick to build, e.g.
+    python scripts/reset_and_seed_demo.py --episodes 1000000 --no-meta
+With DATABASE_URL set, --copy loads rows with COPY over a direct connection.
+
+Usage: python scripts/reset_and_seed_demo.py [--episodes N] [--copy] [--no-meta]
 """
 
 import os
 import sys
-import json
-import uuid
-import random
+import time
+import argparse
 from pathlib import Path
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from supabase import create_client
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from blobs import hash_bytes, store_blob
+from logs import setup_logging
+from seeding import (
+    TaskSpec,
+    SeedConfig,
+    RestWriter,
+    CopyWriter,
+    seed_episodes,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_UPLOAD_CONCURRENCY,
+)
+
 # Load environment variables
 load_dotenv()
 
 # Configuration
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+DATABASE_URL = os.getenv("DATABASE_URL")
 VIDEO_PATH = Path(__file__).parent.parent.parent / "jarvis.mp4"
 
 # Fixed UUIDs for consistency
@@ -35,20 +54,20 @@ LAB_IDS = {
 }
 
 PROJECT_IDS = {
-    'rutgers_reflective': 'p1111111-1111-1111-1111-111111111111',
-    'rutgers_bin': 'p1111111-1111-1111-1111-111111111112',
-    'princeton_peg': 'p2222222-2222-2222-2222-222222222221',
-    'princeton_place': 'p2222222-2222-2222-2222-222222222222',
-    'columbia_handoff': 'p3333333-3333-3333-3333-333333333331',
-    'columbia_pose': 'p3333333-3333-3333-3333-333333333332',
+    'rutgers_reflective': 'a1111111-1111-1111-1111-111111111111',
+    'rutgers_bin': 'a1111111-1111-1111-1111-111111111112',
+    'princeton_peg': 'a2222222-2222-2222-2222-222222222221',
+    'princeton_place': 'a2222222-2222-2222-2222-222222222222',
+    'columbia_handoff': 'a3333333-3333-3333-3333-333333333331',
+    'columbia_pose': 'a3333333-3333-3333-3333-333333333332',
 }
 
 WORKER_IDS = {
-    'ava': 'w1111111-1111-1111-1111-111111111111',
-    'mateo': 'w2222222-2222-2222-2222-222222222222',
-    'noor': 'w3333333-3333-3333-3333-333333333333',
-    'ethan': 'w4444444-4444-4444-4444-444444444444',
-    'sofia': 'w5555555-5555-5555-5555-555555555555',
+    'ava': 'b1111111-1111-1111-1111-111111111111',
+    'mateo': 'b2222222-2222-2222-2222-222222222222',
+    'noor': 'b3333333-3333-3333-3333-333333333333',
+    'ethan': 'b4444444-4444-4444-4444-444444444444',
+    'sofia': 'b5555555-5555-5555-5555-555555555555',
 }
 
 TASK_IDS = {
@@ -60,92 +79,51 @@ TASK_IDS = {
     'pose_hold_v1': ('columbia', 'columbia_pose'),
 }
 
-FAILURE_REASONS = ['slip_after_grasp', 'missed_grasp', 'timeout', 'collision_spike', 'other']
-
-def compute_quality_score(episode: dict) -> int:
-    """Compute quality score based on episode data."""
-    score = 50
-    if episode.get("success"):
-        score += 30
-    if episode.get("duration_sec", 0) > 15:
-        score -= 20
-    if episode.get("failure_reason"):
-        score -= 10
-    return max(0, min(100, score))
-
-def is_edge_case(episode: dict) -> bool:
-    """Check if episode is an edge case."""
-    if not episode.get("success"):
-        return True
-    if episode.get("duration_sec", 0) > 20:
-        return True
-    if episode.get("failure_reason"):
-        return True
-    return False
+STORAGE_PAGE_SIZE = 1000
 
-def is_accepted(episode: dict) -> bool:
-    """Check if episode is accepted."""
-    return episode.get("success") and episode.get("duration_sec", 0) <= 20
+def list_storage_folder(bucket, path: str):
+    """Files and subfolders directly under `path` ('' for the bucket root)."""
+    files, folders, offset = [], [], 0
+    while True:
+        items = bucket.list(path, {'limit': STORAGE_PAGE_SIZE, 'offset': offset})
+        for item in items:
+            full_path = f"{path}/{item['name']}" if path else item['name']
+            # Folders are listed without an id
+            (files if item.get('id') else folders).append(full_path)
+        if len(items) < STORAGE_PAGE_SIZE:
+            return files, folders
+        offset += STORAGE_PAGE_SIZE
 
-def is_fix_accepted(episode: dict) -> bool:
-    """Check if fix is accepted."""
-    return episode.get("success") and episode.get("duration_sec", 0) <= 10
-
-def delete_all_storage_objects(supabase_client):
+def delete_all_storage_objects(supabase_client, concurrency: int = DEFAULT_UPLOAD_CONCURRENCY):
     """Delete all objects in the episodes storage bucket."""
     print("🗑️  Deleting all storage objects...")
     try:
-        # List all files in the bucket
-        files = supabase_client.storage.from_("episodes").list()
-        
-        # Delete all files recursively
-        deleted_count = 0
-        for file_info in files:
-            if file_info.get('name'):
-                try:
-                    # Try to delete (might be a folder)
-                    supabase_client.storage.from_("episodes").remove([file_info['name']])
-                    deleted_count += 1
-                except:
-                    pass
-        
-        # Also try to remove common paths
-        for path in ['episodes/', 'episodes']:
-            try:
-                supabase_client.storage.from_("episodes").remove([path])
-            except:
-                pass
+        bucket = supabase_client.storage.from_("episodes")
+        files, folders = [], ['']
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            # Walk the bucket one folder level at a time, listing folders in parallel
+            while folders:
+                next_folders = []
+                for level_files, level_folders in pool.map(lambda path: list_storage_folder(bucket, path), folders):
+                    files.extend(level_files)
+                    next_folders.extend(level_folders)
+                folders = next_folders
+            
+            batches = [files[i:i + STORAGE_PAGE_SIZE] for i in range(0, len(files), STORAGE_PAGE_SIZE)]
+            list(pool.map(bucket.remove, batches))
         
-        print(f"   ✓ Deleted {deleted_count} storage objects")
+        print(f"   ✓ Deleted {len(files)} storage objects")
     except Exception as e:
         print(f"   ⚠ Warning: Could not delete all storage objects: {e}")
         print("   Continuing anyway...")
 
-def reset_database(supabase_client):
-    """Execute SQL reset script."""
+def reset_database(writer):
+    """Empty every table in one statement."""
     print("🔄 Resetting database...")
-    
-    # Delete all rows from tables in correct order (respecting foreign keys)
-    tables = ['jobs', 'episodes', 'tasks', 'projects', 'labs', 'workers', 'waitlist', 'lab_requests']
-    
-    for table in tables:
-        try:
-            # Get all rows and delete them
-            result = supabase_client.table(table).select('id').execute()
-            if result.data:
-                # Delete in batches if needed
-                ids = [row['id'] for row in result.data]
-                for id_val in ids:
-                    try:
-                        supabase_client.table(table).delete().eq('id', id_val).execute()
-                    except:
-                        pass
-        except Exception as e:
-            print(f"   ⚠ Could not clear {table}: {e}")
-    
+    writer.truncate()
     print("   ✓ Database reset complete")
 
-def seed_base_data(supabase_client):
+def seed_base_data(writer):
     """Seed labs, projects, workers, and tasks."""
     print("📦 Seeding base data...")
     
@@ -155,8 +133,7 @@ def seed_base_data(supabase_client):
         {'id': LAB_IDS['princeton'], 'name': 'Princeton Manipulation Group'},
         {'id': LAB_IDS['columbia'], 'name': 'Columbia Medical Robotics'},
     ]
-    for lab in labs:
-        supabase_client.table('labs').upsert(lab).execute()
+    writer.insert_rows('labs', labs)
     print(f"   ✓ Seeded {len(labs)} labs")
     
     # Seed Projects
@@ -168,8 +145,7 @@ def seed_base_data(supabase_client):
         {'id': PROJECT_IDS['columbia_handoff'], 'lab_id': LAB_IDS['columbia'], 'name': 'Surgical Tool Handoff', 'description': 'Handoff tasks in surgical scenarios'},
         {'id': PROJECT_IDS['columbia_pose'], 'lab_id': LAB_IDS['columbia'], 'name': 'Endoscope Pose Hold', 'description': 'Maintaining endoscope pose stability'},
     ]
-    for project in projects:
-        supabase_client.table('projects').upsert(project).execute()
+    writer.insert_rows('projects', projects)
     print(f"   ✓ Seeded {len(projects)} projects")
     
     # Seed Workers
@@ -180,8 +156,7 @@ def seed_base_data(supabase_client):
         {'id': WORKER_IDS['ethan'], 'name': 'Ethan Park', 'email': 'ethan.park@example.com'},
         {'id': WORKER_IDS['sofia'], 'name': 'Sofia Martinez', 'email': 'sofia.martinez@example.com'},
     ]
-    for worker in workers:
-        supabase_client.table('workers').upsert(worker).execute()
+    writer.insert_rows('workers', workers)
     print(f"   ✓ Seeded {len(workers)} workers")
     
     # Seed Tasks
@@ -193,225 +168,36 @@ def seed_base_data(supabase_client):
         {'id': 'tool_handoff_v1', 'name': 'Surgical Tool Handoff', 'description': 'Tool handoff in surgery', 'lab_id': LAB_IDS['columbia'], 'project_id': PROJECT_IDS['columbia_handoff']},
         {'id': 'pose_hold_v1', 'name': 'Endoscope Pose Hold', 'description': 'Maintain endoscope pose', 'lab_id': LAB_IDS['columbia'], 'project_id': PROJECT_IDS['columbia_pose']},
     ]
-    for task in tasks:
-        supabase_client.table('tasks').upsert(task).execute()
+    writer.insert_rows('tasks', tasks)
     print(f"   ✓ Seeded {len(tasks)} tasks")
-
-def generate_episode(task_id: str, lab_id: str, project_id: str, is_failure: bool, index: int):
-    """Generate episode data."""
-    hz = 20
-    
-    if is_failure:
-        # Failures: 6-20 seconds
-        duration_sec = random.uniform(6.0, 20.0)
-        failure_reason = random.choice(FAILURE_REASONS)
-        failure_time_sec = random.uniform(2.0, duration_sec - 0.5)
-        success = False
-    else:
-        # Successes: 4-12 seconds
-        duration_sec = random.uniform(4.0, 12.0)
-        failure_reason = None
-        failure_time_sec = None
-        success = True
-    
-    steps = round(duration_sec * hz)
-    episode_id = str(uuid.uuid4())
-    
-    episode_data = {
-        'id': episode_id,
-        'task_id': task_id,
-        'lab_id': lab_id,
-        'project_id': project_id,
-        'uploader_user_id': '00000000-0000-0000-0000-000000000000',
-        'storage_path': f'episodes/{episode_id}',
-        'video_path': f'episodes/{episode_id}/video.mp4',
-        'success': success,
-        'failure_reason': failure_reason,
-        'failure_time_sec': round(failure_time_sec, 2) if failure_time_sec else None,
-        'hz': hz,
-        'steps': steps,
-        'duration_sec': round(duration_sec, 2),
-        'edge_case': False,  # Will be set
-        'quality_score': 0,  # Will be computed
-        'accepted': False,  # Will be set
-        'created_at': (datetime.now() - timedelta(days=random.randint(1, 10))).isoformat(),
-    }
-    
-    # Compute QC
-    episode_data['edge_case'] = is_edge_case(episode_data)
-    episode_data['accepted'] = is_accepted(episode_data)
-    episode_data['quality_score'] = compute_quality_score(episode_data)
-    
-    # Meta JSON for storage
-    meta = {
-        'task_id': task_id,
-        'hz': hz,
-        'steps': steps,
-        'duration_sec': episode_data['duration_sec'],
-        'success': success,
-        'failure_reason': failure_reason,
-        'failure_time_sec': episode_data['failure_time_sec'],
-    }
-    
-    return episode_data, meta, episode_id
-
-def upload_video_and_meta(supabase_client, episode_id: str, meta: dict, video_path: Path):
-    """Upload video and meta.json to storage."""
-    storage_path = f'episodes/{episode_id}'
-    
-    # Upload meta.json
-    meta_bytes = json.dumps(meta, indent=2).encode('utf-8')
-    supabase_client.storage.from_('episodes').upload(
-        f'{storage_path}/meta.json',
-        meta_bytes,
-        file_options={'content-type': 'application/json'}
-    )
-    
-    # Upload video if it exists
-    if video_path.exists():
-        with open(video_path, 'rb') as f:
-            video_bytes = f.read()
-            supabase_client.storage.from_('episodes').upload(
-                f'{storage_path}/video.mp4',
-                video_bytes,
-                file_options={'content-type': 'video/mp4'}
-            )
-
-def seed_episodes_and_jobs(supabase_client, video_path: Path):
-    """Seed episodes and jobs."""
-    print("📹 Seeding episodes and jobs...")
-    
-    episodes = []
-    jobs = []
-    
-    # Generate ~30 episodes: 40% failures, 60% successes
-    episode_count = 30
-    failure_count = int(episode_count * 0.4)
-    
-    task_list = list(TASK_IDS.keys())
-    
-    for i in range(episode_count):
-        task_id = random.choice(task_list)
-        lab_key, project_key = TASK_IDS[task_id]
-        lab_id = LAB_IDS[lab_key]
-        project_id = PROJECT_IDS[project_key]
-        
-        is_failure = i < failure_count
-        episode_data, meta, episode_id = generate_episode(task_id, lab_id, project_id, is_failure, i)
-        
-        # Upload to storage
-        try:
-            upload_video_and_meta(supabase_client, episode_id, meta, video_path)
-        except Exception as e:
-            print(f"   ⚠ Warning: Could not upload storage for {episode_id}: {e}")
-        
-        # Insert episode
-        supabase_client.table('episodes').insert(episode_data).execute()
-        episodes.append(episode_data)
-        
-        # Create job if edge case
-        if episode_data['edge_case']:
-            job_id = str(uuid.uuid4())
-            job_data = {
-                'id': job_id,
-                'task_id': task_id,
-                'lab_id': lab_id,
-                'project_id': project_id,
-                'episode_id': episode_id,
-                'status': 'open',
-                'created_at': episode_data['created_at'],
-                'updated_at': episode_data['created_at'],
-            }
-            supabase_client.table('jobs').insert(job_data).execute()
-            jobs.append((job_id, episode_data))
-    
-    print(f"   ✓ Seeded {len(episodes)} episodes ({failure_count} failures, {episode_count - failure_count} successes)")
-    print(f"   ✓ Created {len(jobs)} jobs from edge cases")
     
-    return episodes, jobs
+    return [TaskSpec(task['id'], task['lab_id'], task['project_id']) for task in tasks]
 
-def seed_fixes(supabase_client, jobs: list, video_path: Path):
-    """Seed fixes for some jobs."""
-    print("🔧 Seeding fixes...")
-    
-    # Fix ~6 jobs (half of total jobs)
-    jobs_to_fix = random.sample(jobs, min(6, len(jobs)))
-    worker_list = list(WORKER_IDS.values())
-    
-    fixes_created = 0
-    fixes_accepted = 0
-    
-    for job_id, original_episode in jobs_to_fix:
-        # Assign worker
-        worker_id = random.choice(worker_list)
-        
-        # Update job to claimed
-        supabase_client.table('jobs').update({
-            'status': 'claimed',
-            'claimed_by_worker_id': worker_id,
-        }).eq('id', job_id).execute()
-        
-        # Generate fix episode (always success, shorter duration)
-        fix_duration = random.uniform(3.0, 10.0)
-        fix_hz = 20
-        fix_steps = round(fix_duration * fix_hz)
-        fix_episode_id = str(uuid.uuid4())
-        
-        fix_episode_data = {
-            'id': fix_episode_id,
-            'task_id': original_episode['task_id'],
-            'lab_id': original_episode['lab_id'],
-            'project_id': original_episode.get('project_id'),
-            'uploader_user_id': '00000000-0000-0000-0000-000000000000',
-            'storage_path': f'episodes/{fix_episode_id}',
-            'video_path': f'episodes/{fix_episode_id}/video.mp4',
-            'success': True,
-            'failure_reason': None,
-            'failure_time_sec': None,
-            'hz': fix_hz,
-            'steps': fix_steps,
-            'duration_sec': round(fix_duration, 2),
-            'edge_case': False,
-            'quality_score': compute_quality_score({'success': True, 'duration_sec': fix_duration}),
-            'accepted': False,
-            'created_at': datetime.now().isoformat(),
-        }
-        
-        fix_episode_data['accepted'] = is_fix_accepted(fix_episode_data)
-        
-        # Meta for fix
-        fix_meta = {
-            'task_id': original_episode['task_id'],
-            'hz': fix_hz,
-            'steps': fix_steps,
-            'duration_sec': fix_episode_data['duration_sec'],
-            'success': True,
-        }
-        
-        # Upload to storage
-        try:
-            upload_video_and_meta(supabase_client, fix_episode_id, fix_meta, video_path)
-        except Exception as e:
-            print(f"   ⚠ Warning: Could not upload fix storage: {e}")
-        
-        # Insert fix episode
-        supabase_client.table('episodes').insert(fix_episode_data).execute()
-        
-        # Update job
-        new_status = 'accepted' if fix_episode_data['accepted'] else 'rejected'
-        supabase_client.table('jobs').update({
-            'fix_episode_id': fix_episode_id,
-            'status': new_status,
-        }).eq('id', job_id).execute()
-        
-        fixes_created += 1
-        if fix_episode_data['accepted']:
-            fixes_accepted += 1
-    
-    print(f"   ✓ Created {fixes_created} fixes ({fixes_accepted} accepted, {fixes_created - fixes_accepted} rejected)")
+def upload_video_blob(supabase_client, video_path: Path):
+    """Store the demo video once (content-addressed). Returns (storage path, sha256)."""
+    with open(video_path, 'rb') as f:
+        video_bytes = f.read()
+    sha256 = hash_bytes(video_bytes)
+    storage_path, _ = store_blob(supabase_client, video_bytes, sha256)
+    print(f"   ✓ Stored demo video as {storage_path}")
+    return storage_path, sha256
 
 def main():
     """Main function."""
+    parser = argparse.ArgumentParser(description="Reset and seed demo data")
+    parser.add_argument("--episodes", type=int, default=30, help="Number of episodes to generate (default: 30)")
+    parser.add_argument("--failure-rate", type=float, default=0.4, help="Share of failed episodes (default: 0.4)")
+    parser.add_argument("--fix-rate", type=float, default=0.5, help="Share of jobs that get a fix (default: 0.5)")
+    parser.add_argument("--claim-rate", type=float, default=0.3, help="Share of unfixed jobs claimed by a worker (default: 0.3)")
+    parser.add_argument("--submitted-rate", type=float, default=0.3, help="Share of fixes awaiting review (default: 0.3)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help=f"Rows per insert (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_UPLOAD_CONCURRENCY, help=f"Parallel storage requests (default: {DEFAULT_UPLOAD_CONCURRENCY})")
+    parser.add_argument("--no-meta", action="store_true", help="Skip uploading meta.json files (export needs them)")
+    parser.add_argument("--copy", action="store_true", help="Load rows with COPY over DATABASE_URL (needs asyncpg)")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible data")
+    args = parser.parse_args()
+    setup_logging(fmt="text")
+    
     print("=" * 70)
     print("UMM Data Factory - Reset and Seed Demo Data")
     print("=" * 70)
@@ -421,8 +207,12 @@ def main():
     if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
         print("❌ Error: SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set")
         sys.exit(1)
+    if args.copy and not DATABASE_URL:
+        print("❌ Error: --copy needs DATABASE_URL")
+        sys.exit(1)
     
     supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    writer = CopyWriter(DATABASE_URL) if args.copy else RestWriter(supabase, args.batch_size)
     
     # Check video file
     if not VIDEO_PATH.exists():
@@ -434,38 +224,78 @@ def main():
         print(f"✓ Found video file: {VIDEO_PATH}")
     
     print()
+    started = time.perf_counter()
     
-    # Step 1: Delete storage
-    delete_all_storage_objects(supabase)
-    print()
-    
-    # Step 2: Reset database
-    reset_database(supabase)
-    print()
-    
-    # Step 3: Seed base data
-    seed_base_data(supabase)
-    print()
-    
-    # Step 4: Seed episodes and jobs
-    episodes, jobs = seed_episodes_and_jobs(supabase, video_path)
-    print()
-    
-    # Step 5: Seed fixes
-    seed_fixes(supabase, jobs, video_path)
-    print()
+    try:
+        # Step 1: Delete storage
+        delete_all_storage_objects(supabase, args.concurrency)
+        print()
+        
+        # Step 2: Reset database
+        reset_database(writer)
+        print()
+        
+        # Step 3: Seed base data
+        tasks = seed_base_data(writer)
+        print()
+        
+        # Step 4: Seed episodes, jobs and fixes (every episode shares one video blob)
+        video_blob = None
+        if video_path:
+            try:
+                video_blob = upload_video_blob(supabase, video_path)
+            except Exception as e:
+                print(f"   ⚠ Warning: Could not upload video: {e}")
+        
+        print(f"📹 Seeding {args.episodes} episodes with jobs and fixes...")
+        config = SeedConfig(
+            episodes=args.episodes,
+            failure_rate=args.failure_rate,
+            fix_rate=args.fix_rate,
+            claim_rate=args.claim_rate,
+            submitted_rate=args.submitted_rate,
+            batch_size=args.batch_size,
+            upload_concurrency=args.concurrency,
+            seed=args.seed,
+        )
+        seeding_started = time.perf_counter()
+        
+        def report(stats):
+            if args.episodes > args.batch_size:
+                rate = stats.episodes / (time.perf_counter() - seeding_started)
+                print(f"   … {stats.episodes}/{args.episodes} episodes ({rate:,.0f}/s)")
+        
+        stats = seed_episodes(
+            writer,
+            tasks,
+            list(WORKER_IDS.values()),
+            config,
+            video_blob=video_blob,
+            bucket=None if args.no_meta else supabase.storage.from_('episodes'),
+            on_batch=report,
+        )
+        print(f"   ✓ Seeded {stats.episodes} episodes ({stats.failures} failures, {stats.episodes - stats.failures} successes)")
+        print(f"   ✓ Created {stats.jobs} jobs from edge cases ({stats.jobs_claimed} claimed)")
+        rejected = stats.fixes - stats.fixes_submitted - stats.fixes_accepted
+        print(f"   ✓ Created {stats.fixes} fixes ({stats.fixes_submitted} awaiting review, {stats.fixes_accepted} accepted, {rejected} rejected)")
+        if not args.no_meta:
+            print(f"   ✓ Uploaded {stats.meta_uploaded} meta.json files")
+        print()
+    finally:
+        writer.close()
     
     # Summary
     print("=" * 70)
     print("Summary:")
     print("=" * 70)
-    print(f"✓ Labs: 3")
-    print(f"✓ Projects: 6")
-    print(f"✓ Workers: 5")
-    print(f"✓ Tasks: 6")
-    print(f"✓ Episodes: {len(episodes)}")
-    print(f"✓ Jobs: {len(jobs)}")
-    print(f"✓ Fixes: ~6")
+    print(f"✓ Labs: {len(LAB_IDS)}")
+    print(f"✓ Projects: {len(PROJECT_IDS)}")
+    print(f"✓ Workers: {len(WORKER_IDS)}")
+    print(f"✓ Tasks: {len(tasks)}")
+    print(f"✓ Episodes: {stats.episodes} (+{stats.fixes} fix episodes)")
+    print(f"✓ Jobs: {stats.jobs}")
+    print(f"✓ Fixes: {stats.fixes}")
+    print(f"⏱  Took {time.perf_counter() - started:.1f}s")
     print()
     print("🌐 Open http://localhost:3000/lab to see the Lab Dashboard")
     print("🌐 Open http://localhost:3000/work/queue to see the Fix Queue")
@@ -473,4 +303,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
@@ -15,6 +15,10 @@ load_dotenv(dotenv_path=Path(__file__).parent.parent / ".env")
 # Add parent directory to path to import emailer
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from logs import setup_logging
+
+setup_logging(fmt="text")
+
 from emailer import send_waitlist_welcome
 
 EMAIL_ADMIN_TO = os.getenv("EMAIL_ADMIN_TO")
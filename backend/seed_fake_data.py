@@ -1,14 +1,21 @@
 #!/usr/bin/env python3
 """
 Seed fake data for the Robot Motion Data Platform.
-Creates 10 episodes (5 failures, 5 successes) using jarvis.mp4.
+Creates 10 episodes (5 failures, 5 successes) using jarvis.mp4, uploaded
+through the API (so the full upload pipeline runs) several at a time.
+For large datasets use scripts/reset_and_seed_demo.py --episodes N instead.
+
+Usage: python seed_fake_data.py [--count N] [--concurrency N]
 """
 
 import os
 import sys
 import json
 import random
+import argparse
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from dotenv import load_dotenv
 from supabase import create_client
@@ -76,31 +83,44 @@ def generate_episode_meta(index: int, is_failure: bool) -> dict:
         "failure_time_sec": round(failure_time_sec, 2) if failure_time_sec else None
     }
 
-def upload_episode(meta: dict, video_path: Path) -> dict:
+_thread_local = threading.local()
+
+def get_session() -> requests.Session:
+    """One keep-alive session per upload thread."""
+    if not hasattr(_thread_local, "session"):
+        _thread_local.session = requests.Session()
+    return _thread_local.session
+
+def upload_episode(meta: dict, video_bytes: bytes) -> dict:
     """Upload an episode via the API."""
     try:
-        with open(video_path, 'rb') as video_file:
-            files = {
-                'video': ('video.mp4', video_file, 'video/mp4')
-            }
-            data = {
-                'meta_json': json.dumps(meta)
-            }
-            
-            response = requests.post(
-                f"{API_URL}/api/episodes/upload",
-                files=files,
-                data=data,
-                timeout=60
-            )
-            response.raise_for_status()
-            return response.json()
+        files = {
+            'video': ('video.mp4', video_bytes, 'video/mp4')
+        }
+        data = {
+            'meta_json': json.dumps(meta)
+        }
+        
+        response = get_session().post(
+            f"{API_URL}/api/episodes/upload",
+            files=files,
+            data=data,
+            timeout=60
+        )
+        response.raise_for_status()
+        return response.json()
     except Exception as e:
         print(f"  ❌ Upload failed: {e}")
         return None
 
 def main():
     """Main function to seed fake data."""
+    parser = argparse.ArgumentParser(description="Upload fake episodes through the API")
+    parser.add_argument("--count", type=int, default=10, help="Number of episodes, half of them failures (default: 10)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Uploads in flight at once (default: 4)")
+    args = parser.parse_args()
+    count = args.count
+    
     print("=" * 60)
     print("Robot Motion Data Platform - Fake Data Seeder")
     print("=" * 60)
@@ -114,6 +134,7 @@ def main():
     
     print(f"✓ Found video file: {VIDEO_PATH}")
     print()
+    video_bytes = VIDEO_PATH.read_bytes()
     
     # Ensure task exists
     if SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY:
@@ -127,42 +148,45 @@ def main():
         print("⚠ Warning: SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY not set")
         print("  Task creation will be skipped. Make sure task 'pick_v1' exists.")
     
+    failures = count // 2
     print()
-    print("Uploading 10 episodes (5 failures, 5 successes)...")
+    print(f"Uploading {count} episodes ({failures} failures, {count - failures} successes), {args.concurrency} at a time...")
     print()
     
     # Generate and upload episodes
-    # First 5 are failures, last 5 are successes
+    # The first half are failures, the rest successes
     results = []
-    for i in range(1, 11):
-        is_failure = i <= 5
-        meta = generate_episode_meta(i, is_failure)
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = {}
+        for i in range(1, count + 1):
+            meta = generate_episode_meta(i, is_failure=i <= failures)
+            futures[pool.submit(upload_episode, meta, video_bytes)] = i
         
-        print(f"[{i}/10] Uploading episode...", end=" ")
-        result = upload_episode(meta, VIDEO_PATH)
-        
-        if result:
-            episode = result.get("episode", {})
-            edge_case = episode.get("edge_case", False)
-            job_id = result.get("job_id")
-            
-            status = "✓" if result else "❌"
-            edge_case_str = "edge_case=true" if edge_case else "edge_case=false"
-            job_str = f", job_id={job_id}" if job_id else ""
+        for future in as_completed(futures):
+            i = futures[future]
+            result = future.result()
             
-            print(f"{status} Uploaded episode {i}, {edge_case_str}{job_str}")
-            results.append({
-                "index": i,
-                "success": True,
-                "edge_case": edge_case,
-                "job_id": job_id
-            })
-        else:
-            print(f"❌ Failed to upload episode {i}")
-            results.append({
-                "index": i,
-                "success": False
-            })
+            if result:
+                episode = result.get("episode", {})
+                edge_case = episode.get("edge_case", False)
+                job_id = result.get("job_id")
+                
+                edge_case_str = "edge_case=true" if edge_case else "edge_case=false"
+                job_str = f", job_id={job_id}" if job_id else ""
+                
+                print(f"[{len(results) + 1}/{count}] ✓ Uploaded episode {i}, {edge_case_str}{job_str}")
+                results.append({
+                    "index": i,
+                    "success": True,
+                    "edge_case": edge_case,
+                    "job_id": job_id
+                })
+            else:
+                print(f"[{len(results) + 1}/{count}] ❌ Failed to upload episode {i}")
+                results.append({
+                    "index": i,
+                    "success": False
+                })
     
     print()
     print("=" * 60)
@@ -173,7 +197,7 @@ def main():
     edge_cases = sum(1 for r in results if r.get("edge_case"))
     jobs_created = sum(1 for r in results if r.get("job_id"))
     
-    print(f"✓ Successfully uploaded: {successful}/10 episodes")
+    print(f"✓ Successfully uploaded: {successful}/{count} episodes")
     print(f"✓ Edge cases detected: {edge_cases}")
     print(f"✓ Jobs created: {jobs_created}")
     print()
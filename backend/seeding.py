@@ -0,0 +1,455 @@
+"""
+Bulk generation and loading of synthetic episodes, jobs and fixes.
+
+Builds realistic datasets of any size (up to millions of episodes) for demos
+and load tests. Episodes are generated a batch at a time as NumPy columns and
+scored with the batch QC engine. Edge cases get jobs in every stage of the
+fix workflow (open, claimed by a worker, fixed and awaiting review, accepted
+or rejected), all generated in their final state so every row is written
+exactly once with multi-row inserts:
+
+- `RestWriter` goes through PostgREST with the service-role client.
+- `CopyWriter` (DATABASE_URL, needs `asyncpg`) streams rows with COPY over a
+  direct connection, which is much faster for large datasets.
+
+meta.json files are uploaded to storage from a bounded thread pool.
+"""
+
+import json
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional, Sequence, Mapping, Dict, List, Tuple, Callable
+
+import numpy as np
+
+from qc import QCRules, evaluate_batch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_UPLOAD_CONCURRENCY = 16
+
+# Emptied by a reset, children first
+SEED_TABLES = ("jobs", "episodes", "tasks", "projects", "labs", "workers", "waitlist", "lab_requests", "media_blobs")
+
+UPLOADER_USER_ID = "00000000-0000-0000-0000-000000000000"
+FAILURE_REASONS = np.array(["slip_after_grasp", "missed_grasp", "timeout", "collision_spike", "other"], dtype=object)
+HZ = 20
+
+Frame = Dict[str, np.ndarray]
+
+
+@dataclass(frozen=True)
+class TaskSpec:
+    task_id: str
+    lab_id: str
+    project_id: Optional[str] = None
+
+
+@dataclass
+class SeedConfig:
+    episodes: int = 30
+    failure_rate: float = 0.4
+    # Share of jobs that already have a fix
+    fix_rate: float = 0.5
+    # Share of the remaining jobs a worker has claimed
+    claim_rate: float = 0.3
+    # Share of fixes still awaiting review ("submitted")
+    submitted_rate: float = 0.3
+    max_age_days: float = 10.0
+    batch_size: int = DEFAULT_BATCH_SIZE
+    upload_concurrency: int = DEFAULT_UPLOAD_CONCURRENCY
+    seed: Optional[int] = None
+
+
+@dataclass
+class SeedStats:
+    episodes: int = 0
+    failures: int = 0
+    jobs: int = 0
+    jobs_claimed: int = 0
+    fixes: int = 0
+    fixes_submitted: int = 0
+    fixes_accepted: int = 0
+    meta_uploaded: int = 0
+    meta_failed: int = 0
+
+
+# Generation
+def random_uuids(rng: np.random.Generator, n: int) -> np.ndarray:
+    """n random version-4 UUID strings."""
+    raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    hexes = raw.tobytes().hex()
+    ids = np.empty(n, dtype=object)
+    for i in range(n):
+        h = hexes[32 * i:32 * i + 32]
+        ids[i] = f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+    return ids
+
+
+def _offsets(seconds: np.ndarray) -> np.ndarray:
+    return (seconds * 1e6).astype(np.int64).astype("timedelta64[us]")
+
+
+def episode_frame(
+    ids: np.ndarray,
+    tasks: Sequence[TaskSpec],
+    task_index: np.ndarray,
+    success: np.ndarray,
+    duration_sec: np.ndarray,
+    failure_reason: np.ndarray,
+    failure_time_sec: np.ndarray,
+    created_at: np.ndarray,
+    video_blob: Optional[Tuple[str, str]] = None,
+    rules_by_task: Optional[Mapping[str, QCRules]] = None,
+    fix: bool = False,
+) -> Frame:
+    """Episode rows as columns, with QC results filled in."""
+    n = len(ids)
+    task_ids = np.array([t.task_id for t in tasks], dtype=object)[task_index]
+    qc = evaluate_batch(
+        {"success": success, "duration_sec": duration_sec, "failure_reason": failure_reason, "task_id": task_ids},
+        rules_by_task=rules_by_task,
+        fix=fix,
+    )
+    video_path, video_sha256 = video_blob or (None, None)
+    return {
+        "id": ids,
+        "task_id": task_ids,
+        "lab_id": np.array([t.lab_id for t in tasks], dtype=object)[task_index],
+        "project_id": np.array([t.project_id for t in tasks], dtype=object)[task_index],
+        "uploader_user_id": np.full(n, UPLOADER_USER_ID, dtype=object),
+        "storage_path": "episodes/" + ids,
+        "video_path": np.full(n, video_path, dtype=object),
+        "video_sha256": np.full(n, video_sha256, dtype=object),
+        "success": success,
+        "failure_reason": failure_reason,
+        "failure_time_sec": failure_time_sec,
+        "hz": np.full(n, HZ, dtype=np.int32),
+        "steps": np.rint(duration_sec * HZ).astype(np.int32),
+        "duration_sec": duration_sec,
+        "edge_case": qc["edge_case"],
+        "quality_score": qc["quality_score"],
+        "accepted": qc["accepted"],
+        "created_at": created_at,
+    }
+
+
+def generate_batch(
+    rng: np.random.Generator,
+    n: int,
+    tasks: Sequence[TaskSpec],
+    worker_ids: Sequence[str],
+    config: SeedConfig,
+    now: np.datetime64,
+    video_blob: Optional[Tuple[str, str]] = None,
+    rules_by_task: Optional[Mapping[str, QCRules]] = None,
+) -> Tuple[Frame, Frame, Frame]:
+    """Generate n episodes plus their jobs and fix episodes. Returns (episodes, fixes, jobs)."""
+    task_index = rng.integers(len(tasks), size=n)
+    failed = rng.random(n) < config.failure_rate
+    # Failures run 6-20 s, successes 4-12 s
+    duration = np.round(np.where(failed, rng.uniform(6.0, 20.0, n), rng.uniform(4.0, 12.0, n)), 2)
+    failure_time = np.round(2.0 + rng.random(n) * (duration - 2.5), 2)
+    reasons = FAILURE_REASONS[rng.integers(len(FAILURE_REASONS), size=n)]
+    created = now - _offsets(rng.uniform(1.0, config.max_age_days, n) * 86400)
+
+    episodes = episode_frame(
+        random_uuids(rng, n),
+        tasks,
+        task_index,
+        ~failed,
+        duration,
+        np.where(failed, reasons, None),
+        np.where(failed, failure_time.astype(object), None),
+        created,
+        video_blob,
+        rules_by_task,
+    )
+
+    # One job per edge case; some are claimed by a worker, some already fixed
+    edge = np.flatnonzero(episodes["edge_case"])
+    m = len(edge)
+    draw = rng.random(m)
+    if worker_ids:
+        fixed = draw < config.fix_rate
+        claimed = ~fixed & (draw < config.fix_rate + (1.0 - config.fix_rate) * config.claim_rate)
+    else:
+        fixed = claimed = np.zeros(m, dtype=bool)
+    fixed_of = edge[fixed]
+    k = len(fixed_of)
+    # Claims and fixes happen at a random time between the upload and now
+    since_created = (now - created[edge]).astype(np.int64)
+    touched = created[edge] + (since_created * rng.random(m)).astype(np.int64).astype("timedelta64[us]")
+    fix_created = touched[fixed]
+    fixes = episode_frame(
+        random_uuids(rng, k),
+        tasks,
+        task_index[fixed_of],
+        np.ones(k, dtype=bool),
+        np.round(rng.uniform(3.0, 10.0, k), 2),
+        np.full(k, None, dtype=object),
+        np.full(k, None, dtype=object),
+        fix_created,
+        video_blob,
+        rules_by_task,
+        fix=True,
+    )
+
+    status = np.full(m, "open", dtype=object)
+    status[claimed] = "claimed"
+    status[fixed] = np.where(
+        rng.random(k) < config.submitted_rate,
+        "submitted",
+        np.where(fixes["accepted"], "accepted", "rejected"),
+    )
+    worked = fixed | claimed
+    claimed_by = np.full(m, None, dtype=object)
+    if worked.any():
+        claimed_by[worked] = np.asarray(worker_ids, dtype=object)[rng.integers(len(worker_ids), size=int(worked.sum()))]
+    fix_episode_id = np.full(m, None, dtype=object)
+    fix_episode_id[fixed] = fixes["id"]
+    updated = np.where(worked, touched, created[edge])
+
+    jobs = {
+        "id": random_uuids(rng, m),
+        "task_id": episodes["task_id"][edge],
+        "lab_id": episodes["lab_id"][edge],
+        "project_id": episodes["project_id"][edge],
+        "episode_id": episodes["id"][edge],
+        "status": status,
+        "claimed_by_worker_id": claimed_by,
+        "fix_episode_id": fix_episode_id,
+        "created_at": created[edge],
+        "updated_at": updated,
+    }
+    return episodes, fixes, jobs
+
+
+def concat_frames(*frames: Frame) -> Frame:
+    return {name: np.concatenate([frame[name] for frame in frames]) for name in frames[0]}
+
+
+def _values(column: np.ndarray, aware: bool) -> list:
+    """Plain Python values of a column; datetimes as UTC datetimes or ISO strings."""
+    if column.dtype.kind == "M":
+        if aware:
+            return [d.replace(tzinfo=timezone.utc) for d in column.astype("datetime64[us]").astype(object)]
+        return np.datetime_as_string(column, unit="us", timezone="UTC").tolist()
+    return column.tolist()
+
+
+def frame_rows(frame: Frame) -> List[dict]:
+    names = list(frame)
+    columns = [_values(frame[name], aware=False) for name in names]
+    return [dict(zip(names, values)) for values in zip(*columns)]
+
+
+def frame_records(frame: Frame) -> List[tuple]:
+    return list(zip(*(_values(column, aware=True) for column in frame.values())))
+
+
+def episode_meta(frame: Frame) -> List[Tuple[str, dict]]:
+    """(storage path, meta.json contents) for each episode of a frame."""
+    keys = ("task_id", "hz", "steps", "duration_sec", "success", "failure_reason", "failure_time_sec")
+    columns = [frame[key].tolist() for key in keys]
+    return [
+        (path, dict(zip(keys, values)))
+        for path, *values in zip(frame["storage_path"].tolist(), *columns)
+    ]
+
+
+# Writers
+class RestWriter:
+    """Multi-row inserts through PostgREST."""
+
+    def __init__(self, client, batch_size: int = DEFAULT_BATCH_SIZE):
+        from postgrest.types import ReturnMethod
+        self.client = client
+        self.batch_size = batch_size
+        self.returning = ReturnMethod.minimal
+
+    def truncate(self):
+        try:
+            # Migration 011
+            self.client.rpc("reset_demo_data", {}).execute()
+            return
+        except Exception as e:
+            logger.warning("⚠️  reset_demo_data() unavailable (%s); deleting table by table", e)
+        for table in SEED_TABLES:
+            key = "sha256" if table == "media_blobs" else "id"
+            try:
+                self.client.table(table).delete().not_.is_(key, "null").execute()
+            except Exception as e:
+                logger.warning("⚠️  Could not clear %s: %s", table, e)
+
+    def insert_rows(self, table: str, rows: List[dict]):
+        for start in range(0, len(rows), self.batch_size):
+            self.client.table(table).insert(
+                rows[start:start + self.batch_size], returning=self.returning
+            ).execute()
+
+    def insert(self, table: str, frame: Frame):
+        self.insert_rows(table, frame_rows(frame))
+
+    @contextmanager
+    def bulk(self):
+        yield
+
+    def close(self):
+        pass
+
+
+class CopyWriter:
+    """
+    COPY over a direct Postgres connection. During `bulk()` the per-row
+    triggers on episodes and jobs (blob reference counts, job event
+    notifications) are paused and blob counts are recomputed once at the end,
+    all in one transaction.
+    """
+
+    PAUSED_TRIGGERS = (("episodes", "episodes_media_blob_refs"), ("jobs", "jobs_notify_event"))
+
+    def __init__(self, dsn: str):
+        import asyncpg
+        self.loop = asyncio.new_event_loop()
+        self.conn = self.run(asyncpg.connect(dsn))
+
+    def run(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def truncate(self):
+        self.run(self.conn.execute(f"TRUNCATE {', '.join(SEED_TABLES)}"))
+
+    def insert_rows(self, table: str, rows: List[dict]):
+        if rows:
+            names = list(rows[0])
+            self.run(self.conn.copy_records_to_table(
+                table, records=[tuple(row[name] for name in names) for row in rows], columns=names
+            ))
+
+    def insert(self, table: str, frame: Frame):
+        self.run(self.conn.copy_records_to_table(table, records=frame_records(frame), columns=list(frame)))
+
+    @contextmanager
+    def bulk(self):
+        transaction = self.conn.transaction()
+        self.run(transaction.start())
+        try:
+            for table, trigger in self.PAUSED_TRIGGERS:
+                self.run(self.conn.execute(f"ALTER TABLE {table} DISABLE TRIGGER {trigger}"))
+            yield
+            self.run(self.conn.execute(
+                "UPDATE media_blobs b SET ref_count = "
+                "(SELECT COUNT(*) FROM episodes e WHERE e.video_sha256 = b.sha256)"
+            ))
+            for table, trigger in self.PAUSED_TRIGGERS:
+                self.run(self.conn.execute(f"ALTER TABLE {table} ENABLE TRIGGER {trigger}"))
+        except BaseException:
+            self.run(transaction.rollback())
+            raise
+        self.run(transaction.commit())
+
+    def close(self):
+        self.run(self.conn.close())
+        self.loop.close()
+
+
+# Storage
+class MetaUploader:
+    """Uploads meta.json files with at most `concurrency` requests in flight."""
+
+    def __init__(self, bucket, concurrency: int = DEFAULT_UPLOAD_CONCURRENCY):
+        self.bucket = bucket
+        self.pool = ThreadPoolExecutor(max_workers=concurrency)
+        # Bounds the backlog too, so memory stays flat for millions of files
+        self.slots = threading.BoundedSemaphore(concurrency * 4)
+        self.lock = threading.Lock()
+        self.uploaded = 0
+        self.failed = 0
+        self.first_error: Optional[Exception] = None
+
+    def submit(self, storage_path: str, meta: dict):
+        self.slots.acquire()
+        future = self.pool.submit(self._upload, storage_path, meta)
+        future.add_done_callback(lambda _: self.slots.release())
+
+    def _upload(self, storage_path: str, meta: dict):
+        try:
+            self.bucket.upload(
+                f"{storage_path}/meta.json",
+                json.dumps(meta, indent=2).encode("utf-8"),
+                file_options={"content-type": "application/json"},
+            )
+            with self.lock:
+                self.uploaded += 1
+        except Exception as e:
+            with self.lock:
+                self.failed += 1
+                self.first_error = self.first_error or e
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+
+def seed_episodes(
+    writer,
+    tasks: Sequence[TaskSpec],
+    worker_ids: Sequence[str],
+    config: SeedConfig,
+    video_blob: Optional[Tuple[str, str]] = None,
+    bucket=None,
+    rules_by_task: Optional[Mapping[str, QCRules]] = None,
+    on_batch: Optional[Callable[[SeedStats], None]] = None,
+) -> SeedStats:
+    """
+    Generate and write `config.episodes` episodes with their jobs and fixes.
+    meta.json files are uploaded to `bucket` if given.
+    """
+    rng = np.random.default_rng(config.seed)
+    now = np.datetime64(datetime.now(timezone.utc).replace(tzinfo=None), "us")
+    uploader = MetaUploader(bucket, config.upload_concurrency) if bucket is not None else None
+    stats = SeedStats()
+
+    try:
+        with writer.bulk():
+            for start in range(0, config.episodes, config.batch_size):
+                n = min(config.batch_size, config.episodes - start)
+                episodes, fixes, jobs = generate_batch(
+                    rng, n, tasks, worker_ids, config, now, video_blob, rules_by_task
+                )
+                all_episodes = concat_frames(episodes, fixes)
+                # Fix episodes must exist before the jobs that point at them
+                writer.insert("episodes", all_episodes)
+                writer.insert("jobs", jobs)
+
+                if uploader is not None:
+                    for storage_path, meta in episode_meta(all_episodes):
+                        uploader.submit(storage_path, meta)
+
+                stats.episodes += n
+                stats.failures += int((~episodes["success"]).sum())
+                stats.jobs += len(jobs["id"])
+                stats.jobs_claimed += int((jobs["status"] == "claimed").sum())
+                stats.fixes += len(fixes["id"])
+                stats.fixes_submitted += int((jobs["status"] == "submitted").sum())
+                stats.fixes_accepted += int((jobs["status"] == "accepted").sum())
+                if on_batch:
+                    on_batch(stats)
+    finally:
+        if uploader is not None:
+            uploader.close()
+            stats.meta_uploaded = uploader.uploaded
+            stats.meta_failed = uploader.failed
+            if uploader.first_error:
+                logger.warning(
+                    "⚠️  %d meta.json uploads failed, first error: %s", uploader.failed, uploader.first_error
+                )
+    return stats
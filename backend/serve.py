@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Run the API with one worker process per core.
+
+Each worker is a full uvicorn server on the same listening socket. What has
+to agree across workers is shared outside the processes:
+- response and value caches (cache.py): Redis with CACHE_REDIS_URL, otherwise
+  a SQLite file that serve.py sets up in CACHE_SQLITE_PATH
+- /metrics: PROMETHEUS_MULTIPROC_DIR, so any worker reports the sum of all
+- live job events (events.py): DATABASE_URL, so every worker hears every write
+
+Each worker also has its own ingest process pool (pipeline.py). Unless
+INGEST_WORKERS is set, serve.py sizes it to cores / workers (at least 1),
+so the host runs about one ingest process per core, not one per core per
+worker.
+
+On SIGTERM/SIGINT the workers drain (lifecycle.py): SSE streams end, /ready
+turns 503, new exports are refused and in-flight requests get up to
+DRAIN_TIMEOUT_SEC to finish.
+
+Usage: python serve.py [--host 0.0.0.0] [--port 8000] [--workers auto]
+WEB_CONCURRENCY sets the worker count when --workers is not given.
+"""
+
+import os
+import atexit
+import shutil
+import logging
+import argparse
+import tempfile
+
+import uvicorn
+from dotenv import load_dotenv
+from uvicorn.supervisors.multiprocess import Multiprocess
+
+# .env first, so share_state sees the settings there before filling in defaults
+load_dotenv()
+
+import logs
+import lifecycle
+
+logger = logging.getLogger("serve")
+
+
+class DrainingServer(uvicorn.Server):
+    def handle_exit(self, sig, frame):
+        lifecycle.begin_drain()
+        super().handle_exit(sig, frame)
+
+
+class Supervisor(Multiprocess):
+    def shutdown(self):
+        # Signal every worker before waiting, so they drain together
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join()
+        logger.info("Stopping parent process [%s]", self.pid)
+
+
+def worker_count(value: str) -> int:
+    if value == "auto":
+        return os.cpu_count() or 1
+    return max(1, int(value))
+
+
+def share_state(workers: int):
+    """Point the workers at shared caches and metrics (before any is started)."""
+    metrics_dir = tempfile.mkdtemp(prefix="umm-metrics-")
+    atexit.register(shutil.rmtree, metrics_dir, ignore_errors=True)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+
+    if not os.getenv("CACHE_REDIS_URL") and not os.getenv("CACHE_SQLITE_PATH"):
+        cache_dir = tempfile.mkdtemp(prefix="umm-cache-")
+        atexit.register(shutil.rmtree, cache_dir, ignore_errors=True)
+        os.environ["CACHE_SQLITE_PATH"] = os.path.join(cache_dir, "cache.db")
+        logger.info("Sharing caches through %s (set CACHE_REDIS_URL to use Redis)", os.environ["CACHE_SQLITE_PATH"])
+
+    if not os.getenv("INGEST_WORKERS"):
+        # Each worker would default to one ingest process per core
+        os.environ["INGEST_WORKERS"] = str(max(1, (os.cpu_count() or 1) // workers))
+        logger.info("Ingest pools: %s processes per worker", os.environ["INGEST_WORKERS"])
+
+    if not os.getenv("DATABASE_URL"):
+        logger.warning(
+            "⚠️  DATABASE_URL not set; each worker only streams job events for writes it handled itself"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API with several worker processes")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument(
+        "--workers",
+        default=os.getenv("WEB_CONCURRENCY", "auto"),
+        help="Worker processes, or 'auto' for one per core",
+    )
+    args = parser.parse_args()
+    workers = worker_count(args.workers)
+
+    logs.setup_logging()
+    if workers > 1:
+        share_state(workers)
+
+    config = uvicorn.Config(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        # uvicorn's own loggers go through logs.py (set up again in each worker)
+        log_config=None,
+        timeout_graceful_shutdown=lifecycle.DRAIN_TIMEOUT_SEC,
+    )
+    server = DrainingServer(config)
+    if workers == 1:
+        server.run()
+        return
+
+    logger.info("🚀 Starting %d workers on %s:%d", workers, args.host, args.port)
+    Supervisor(config, target=server.run, sockets=[config.bind_socket()]).run()
+
+
+if __name__ == "__main__":
+    main()
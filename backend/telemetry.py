@@ -0,0 +1,464 @@
+"""
+Request tracing and latency metrics.
+
+TracingMiddleware times every request under its route template, and
+`span()` times each call the request makes to something else: PostgREST
+and Storage (every HTTP call of the Supabase client, see
+`instrument_supabase`), Resend, and orjson rendering. Both feed Prometheus
+histograms served by GET /metrics, and each response carries a
+Server-Timing header splitting its time by dependency, so a slow
+/api/jobs shows whether it waited on the database, on Storage signing or
+on serialization.
+
+When OTEL_EXPORTER_OTLP_ENDPOINT is set and the OpenTelemetry SDK is
+installed, the same spans are exported as traces (request span with one
+child per dependency call). METRICS_ENABLED=false turns the middleware off.
+
+With several worker processes (serve.py), PROMETHEUS_MULTIPROC_DIR holds
+each worker's samples and /metrics reports the sum over all of them.
+"""
+
+import os
+import time
+import logging
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+# What the import found, logged by `log_status` once logging is set up
+_status = []
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+    )
+except ImportError:
+    _status.append((logging.WARNING, "⚠️  prometheus_client not installed, /metrics is disabled (pip install prometheus-client)"))
+    Histogram = None
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+OTEL_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "umm-api")
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Seconds; PostgREST calls sit in the low buckets, exports in the high ones
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Seconds; a TLS handshake to Supabase or Resend takes tens of milliseconds
+CONNECT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Path segments after /storage/v1/object/ that name an action, not a bucket
+STORAGE_ACTIONS = {"sign", "list", "public", "authenticated", "move", "copy", "info"}
+
+# Not worth timing: the scrape itself
+UNTRACED_PATHS = {"/metrics"}
+
+if Histogram is not None:
+    REQUEST_LATENCY = Histogram(
+        "http_request_duration_seconds",
+        "API request latency by route template",
+        ["method", "route", "status"],
+        buckets=LATENCY_BUCKETS,
+    )
+    REQUESTS_IN_PROGRESS = Gauge(
+        "http_requests_in_progress",
+        "API requests currently being handled",
+        ["method"],
+        multiprocess_mode="livesum",
+    )
+    DEPENDENCY_LATENCY = Histogram(
+        "dependency_duration_seconds",
+        "Latency of calls made while handling requests, by dependency and operation",
+        ["dependency", "operation", "route", "status"],
+        buckets=LATENCY_BUCKETS,
+    )
+    HTTP_POOL_REQUESTS = Counter(
+        "http_pool_requests_total",
+        "Outbound requests sent through a connection pool",
+        ["pool"],
+    )
+    HTTP_POOL_CONNECT = Histogram(
+        "http_pool_connect_duration_seconds",
+        "TCP and TLS setup time of new outbound connections (count: connections opened)",
+        ["pool"],
+        buckets=CONNECT_BUCKETS,
+    )
+    HTTP_POOL_CONNECTIONS = Gauge(
+        "http_pool_connections",
+        "Open connections in an outbound pool, busy (active) or kept alive (idle)",
+        ["pool", "state"],
+        multiprocess_mode="livesum",
+    )
+    HTTP_POOL_LIMIT = Gauge(
+        "http_pool_max_connections",
+        "Connection limit of an outbound pool",
+        ["pool"],
+        multiprocess_mode="livesum",
+    )
+    ADMISSION_WAIT = Histogram(
+        "admission_queue_wait_seconds",
+        "Time requests waited to be admitted, by route class (admission.py)",
+        ["route_class"],
+        buckets=(0.001,) + LATENCY_BUCKETS,
+    )
+    ADMISSION_REJECTED = Counter(
+        "admission_rejected_total",
+        "Requests answered 429 because their route class was saturated",
+        ["route_class", "reason"],
+    )
+    ADMISSION_IN_FLIGHT = Gauge(
+        "admission_in_flight",
+        "Admitted requests being handled, by route class",
+        ["route_class"],
+        multiprocess_mode="livesum",
+    )
+    ADMISSION_QUEUED = Gauge(
+        "admission_queued",
+        "Requests waiting to be admitted, by route class",
+        ["route_class"],
+        multiprocess_mode="livesum",
+    )
+
+
+def _init_tracer():
+    if not OTEL_ENDPOINT:
+        return None
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError:
+        _status.append((
+            logging.WARNING,
+            "⚠️  OTEL_EXPORTER_OTLP_ENDPOINT is set but OpenTelemetry is not installed, traces are not exported "
+            "(pip install opentelemetry-sdk opentelemetry-exporter-otlp-proto-http)",
+        ))
+        return None
+    provider = TracerProvider(resource=Resource.create({"service.name": OTEL_SERVICE_NAME}))
+    # The exporter reads the endpoint and headers from the OTEL_* variables
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+    _status.append((logging.INFO, f"✅ Exporting traces to {OTEL_ENDPOINT}"))
+    return trace.get_tracer("umm.api")
+
+
+tracer = _init_tracer()
+
+
+def log_status():
+    """Log what the import set up (it runs before logging is configured)."""
+    for level, message in _status:
+        logger.log(level, message)
+    _status.clear()
+
+
+class RequestTrace:
+    """Per-request state: the ASGI scope and time spent per dependency."""
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.start = time.perf_counter()
+        self.timings = {}
+
+    @property
+    def route(self) -> str:
+        # The router stores the matched route in the (shared) scope
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
+
+    def add(self, dependency: str, seconds: float):
+        total, calls = self.timings.get(dependency, (0.0, 0))
+        self.timings[dependency] = (total + seconds, calls + 1)
+
+    def server_timing(self) -> str:
+        parts = [
+            f'{name};dur={total * 1000:.1f};desc="{calls} call{"s" if calls != 1 else ""}"'
+            for name, (total, calls) in self.timings.items()
+        ]
+        parts.append(f"app;dur={(time.perf_counter() - self.start) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+
+class Span:
+    """Handle yielded by `span()`; set `status` to record an outcome other than "ok"."""
+
+    __slots__ = ("status", "otel")
+
+    def __init__(self, otel):
+        self.status = "ok"
+        self.otel = otel
+
+    def set_attribute(self, key: str, value):
+        if self.otel is not None:
+            self.otel.set_attribute(key, value)
+
+
+@contextmanager
+def span(dependency: str, operation: str, **attributes):
+    """
+    Time one call to a dependency, e.g. span("email", "send"). Exceptions
+    are recorded with status "error" and re-raised.
+    """
+    if tracer is not None:
+        otel_span = tracer.start_as_current_span(
+            f"{dependency} {operation}",
+            attributes={"dependency": dependency, **attributes},
+        )
+    else:
+        otel_span = nullcontext()
+
+    start = time.perf_counter()
+    with otel_span as otel:
+        handle = Span(otel)
+        try:
+            yield handle
+        except BaseException:
+            handle.status = "error"
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            trace = _current.get()
+            if trace is not None:
+                trace.add(dependency, elapsed)
+            if Histogram is not None:
+                route = trace.route if trace is not None else "background"
+                DEPENDENCY_LATENCY.labels(dependency, operation, route, handle.status).observe(elapsed)
+
+
+def dependency_operation(method: str, path: str) -> tuple:
+    """
+    (dependency, operation) for a Supabase HTTP call, low-cardinality:
+    "/rest/v1/jobs" -> ("postgrest", "GET jobs"),
+    "/storage/v1/object/sign/episodes/a/b.npz" -> ("storage", "POST object/sign").
+    """
+    if "/rest/v1/" in path:
+        resource = path.split("/rest/v1/", 1)[1]
+        if resource.startswith("rpc/"):
+            return "postgrest", f"rpc {resource[4:]}"
+        return "postgrest", f"{method} {resource.split('/')[0]}"
+    if "/storage/v1/" in path:
+        parts = path.split("/storage/v1/", 1)[1].split("/")
+        action = parts[0]
+        if len(parts) > 1 and parts[1] in STORAGE_ACTIONS:
+            action += "/" + parts[1]
+        return "storage", f"{method} {action}"
+    return "http", method
+
+
+class TimedTransport:
+    """
+    Wraps an httpx transport so every request is a span. Timing stops when
+    the response headers arrive, so streamed downloads (the video proxy)
+    are not held open here. Duck-typed rather than an httpx.BaseTransport
+    subclass so importing this module doesn't import httpx.
+    """
+
+    def __init__(self, transport):
+        self.transport = transport
+
+    def __enter__(self):
+        self.transport.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        self.transport.__exit__(*args)
+
+    def handle_request(self, request):
+        dependency, operation = dependency_operation(request.method, request.url.path)
+        with span(dependency, operation, **{"http.method": request.method}) as call:
+            response = self.transport.handle_request(request)
+            call.status = str(response.status_code)
+            call.set_attribute("http.status_code", response.status_code)
+            return response
+
+    def close(self):
+        self.transport.close()
+
+
+class MeteredPool:
+    """
+    Wraps an httpx.HTTPTransport (a connection pool) to count requests and
+    new connections, time connection setup and report how many pooled
+    connections are busy or idle. Reuse is 1 - connections opened / requests.
+    """
+
+    def __init__(self, name: str, transport, max_connections: int):
+        self.name = name
+        self.transport = transport
+        if Histogram is not None:
+            HTTP_POOL_LIMIT.labels(name).set(max_connections)
+
+    def __enter__(self):
+        self.transport.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        self.transport.__exit__(*args)
+
+    def handle_request(self, request):
+        if Histogram is None:
+            return self.transport.handle_request(request)
+        HTTP_POOL_REQUESTS.labels(self.name).inc()
+        request.extensions["trace"] = self.trace(request.url.scheme == "https", request.extensions.get("trace"))
+        try:
+            return self.transport.handle_request(request)
+        finally:
+            self.observe()
+
+    def trace(self, tls: bool, inner):
+        # httpcore reports connection setup through the request's "trace" extension
+        last = "connection.start_tls.complete" if tls else "connection.connect_tcp.complete"
+        started = []
+
+        def callback(event, info):
+            if event == "connection.connect_tcp.started":
+                started.append(time.perf_counter())
+            elif event == last and started:
+                HTTP_POOL_CONNECT.labels(self.name).observe(time.perf_counter() - started.pop())
+            elif event.endswith("response_closed.complete"):
+                self.observe()
+            if inner is not None:
+                inner(event, info)
+
+        return callback
+
+    def observe(self):
+        connections = self.transport._pool.connections
+        idle = sum(1 for connection in connections if connection.is_idle())
+        HTTP_POOL_CONNECTIONS.labels(self.name, "active").set(len(connections) - idle)
+        HTTP_POOL_CONNECTIONS.labels(self.name, "idle").set(idle)
+
+    def close(self):
+        self.transport.close()
+
+
+def instrument_supabase(client):
+    """Time every PostgREST and Storage request made through `client`."""
+    for session in (client.postgrest.session, client.storage.session):
+        if not isinstance(session._transport, TimedTransport):
+            session._transport = TimedTransport(session._transport)
+
+
+def admission_waited(route_class: str, seconds: float):
+    if Histogram is not None:
+        ADMISSION_WAIT.labels(route_class).observe(seconds)
+
+
+def admission_rejected(route_class: str, reason: str):
+    if Histogram is not None:
+        ADMISSION_REJECTED.labels(route_class, reason).inc()
+
+
+def admission_state(route_class: str, in_flight: int, queued: int):
+    if Histogram is not None:
+        ADMISSION_IN_FLIGHT.labels(route_class).set(in_flight)
+        ADMISSION_QUEUED.labels(route_class).set(queued)
+
+
+def render_metrics() -> tuple:
+    """(body, content type) for the /metrics endpoint."""
+    if PROMETHEUS_MULTIPROC_DIR:
+        from prometheus_client import CollectorRegistry, multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead():
+    """Drop this worker's live gauges from the multi-process metrics (on shutdown)."""
+    if PROMETHEUS_MULTIPROC_DIR and Histogram is not None:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def metrics_available() -> bool:
+    return Histogram is not None
+
+
+class TracingMiddleware:
+    """
+    Outermost middleware: records request latency and status per route
+    template and adds the Server-Timing header. Requests are timed to their
+    last body chunk (background tasks excluded), Server-Sent Event streams
+    to their first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not METRICS_ENABLED or scope["type"] != "http" or scope["path"] in UNTRACED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(scope)
+        token = _current.set(trace)
+        method = scope["method"]
+        status = 500
+        finished = False
+
+        def finish():
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            if Histogram is not None:
+                elapsed = time.perf_counter() - trace.start
+                REQUEST_LATENCY.labels(method, trace.route, str(status)).observe(elapsed)
+                REQUESTS_IN_PROGRESS.labels(method).dec()
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", trace.server_timing())
+                if server_span is not None:
+                    server_span.update_name(f"{method} {trace.route}")
+                    server_span.set_attribute("http.route", trace.route)
+                    server_span.set_attribute("http.status_code", status)
+                if headers.get("content-type", "").startswith("text/event-stream"):
+                    finish()
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                # Background tasks run after this, outside the request's latency
+                finish()
+
+        if Histogram is not None:
+            REQUESTS_IN_PROGRESS.labels(method).inc()
+        if tracer is not None:
+            from opentelemetry.propagate import extract
+            from opentelemetry.trace import SpanKind
+
+            otel_span = tracer.start_as_current_span(
+                f"{method} {scope['path']}",
+                context=extract(dict(Headers(scope=scope))),
+                kind=SpanKind.SERVER,
+                attributes={"http.method": method, "http.target": scope["path"]},
+            )
+        else:
+            otel_span = nullcontext()
+
+        try:
+            with otel_span as server_span:
+                await self.app(scope, receive, send_with_timing)
+        finally:
+            finish()
+            _current.reset(token)
@@ -0,0 +1,353 @@
+"""
+Per-step trajectory storage.
+
+Uploaded trajectories (joint states, actions, ...) are stored column by column
+next to an episode's meta.json:
+
+    episodes/{id}/trajectory/manifest.json
+    episodes/{id}/trajectory/{field}/{chunk:05d}.npy
+
+Every field is split into chunks of `chunk_steps` rows and stored as an
+uncompressed little-endian float32 .npy file, so a time window maps to a
+contiguous byte range in each chunk and files can be memory-mapped directly.
+
+For charts, an ingest stage also writes min/max/mean level-of-detail
+pyramids (`lod/{factor}/{field}.npy`, one row per `factor` steps).
+"""
+
+import io
+import os
+import re
+import json
+import zipfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Tuple, Optional, Mapping, Callable, Sequence, List
+import numpy as np
+
+FORMAT = "umm-trajectory/1"
+DTYPE = np.dtype("<f4")
+CHUNK_STEPS = int(os.getenv("TRAJECTORY_CHUNK_STEPS", "65536"))
+MANIFEST_NAME = "manifest.json"
+TIMESTAMP_FIELD = "timestamps"
+LOD_FACTORS = (10, 100, 1000)
+
+_FIELD_NAME = re.compile(r"^[A-Za-z0-9_]{1,64}$")
+
+
+def trajectory_path(storage_path: str) -> str:
+    return f"{storage_path}/trajectory"
+
+
+def chunk_path(field: str, chunk: int) -> str:
+    """Path of a chunk file relative to the trajectory directory."""
+    return f"{field}/{chunk:05d}.npy"
+
+
+def lod_path(factor: int, field: str) -> str:
+    """Path of a pyramid level relative to the trajectory directory."""
+    return f"lod/{factor}/{field}.npy"
+
+
+def lod_factors(steps: int, factors=LOD_FACTORS) -> List[int]:
+    """Pyramid levels worth building for an episode of `steps` rows."""
+    return [factor for factor in factors if steps > factor]
+
+
+def parse_trajectory(data: bytes) -> Dict[str, np.ndarray]:
+    """
+    Parse an uploaded trajectory.
+
+    Accepts either an .npz archive (numpy.savez) or a JSON object mapping
+    field names to per-step lists, e.g. {"joint_pos": [[...], ...]}.
+    """
+    if data[:2] == b"PK":
+        try:
+            with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+                raw = {name: npz[name] for name in npz.files}
+        except (ValueError, zipfile.BadZipFile) as e:
+            raise ValueError(f"Invalid trajectory archive: {e}")
+    else:
+        try:
+            raw = json.loads(data)
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError(f"Invalid trajectory JSON: {e}")
+        if not isinstance(raw, dict):
+            raise ValueError("Trajectory JSON must be an object mapping field names to arrays")
+
+    arrays = {}
+    for name, values in raw.items():
+        if not _FIELD_NAME.match(name):
+            raise ValueError(f"Invalid trajectory field name: {name!r}")
+        try:
+            array = np.asarray(values, dtype=DTYPE)
+        except (TypeError, ValueError):
+            raise ValueError(f"Trajectory field {name!r} must be numeric")
+        if array.ndim not in (1, 2):
+            raise ValueError(f"Trajectory field {name!r} must be 1-D or 2-D (steps x dims), got {array.ndim}-D")
+        arrays[name] = array
+    if not arrays:
+        raise ValueError("Trajectory has no fields")
+    return arrays
+
+
+def validate_trajectory(arrays: Mapping[str, np.ndarray], steps: int, hz: float, duration_sec: float):
+    """Check the arrays against the episode's `steps`, `hz` and `duration_sec`."""
+    if hz <= 0:
+        raise ValueError("hz must be positive")
+    for name, array in arrays.items():
+        if array.shape[0] != steps:
+            raise ValueError(f"Trajectory field {name!r} has {array.shape[0]} steps, meta says steps={steps}")
+
+    expected_steps = duration_sec * hz
+    if abs(steps - expected_steps) > max(1.0, 0.01 * steps):
+        raise ValueError(
+            f"steps={steps} does not match duration_sec * hz = {expected_steps:.1f}"
+        )
+
+    timestamps = arrays.get(TIMESTAMP_FIELD)
+    if timestamps is not None and steps > 1:
+        if timestamps.ndim != 1:
+            raise ValueError(f"{TIMESTAMP_FIELD!r} must be 1-D")
+        dt = float(np.median(np.diff(timestamps)))
+        if dt <= 0 or abs(dt * hz - 1.0) > 0.05:
+            raise ValueError(f"{TIMESTAMP_FIELD!r} spacing ({dt:.6f}s) does not match hz={hz}")
+
+
+def _npy_bytes(array: np.ndarray) -> Tuple[bytes, int]:
+    """Serialize an array as .npy; returns (bytes, offset of the data)."""
+    buffer = io.BytesIO()
+    np.lib.format.write_array(buffer, np.ascontiguousarray(array, dtype=DTYPE), allow_pickle=False)
+    data = buffer.getvalue()
+    return data, len(data) - array.nbytes
+
+
+def encode_trajectory(
+    arrays: Mapping[str, np.ndarray],
+    hz: float,
+    chunk_steps: int = CHUNK_STEPS,
+) -> Tuple[dict, Dict[str, bytes]]:
+    """
+    Encode arrays into the chunked columnar layout.
+
+    Returns:
+        (manifest, files) where files maps paths relative to the trajectory
+        directory to their contents (manifest.json included).
+    """
+    steps = next(iter(arrays.values())).shape[0]
+    num_chunks = max(1, -(-steps // chunk_steps))
+    manifest = {
+        "format": FORMAT,
+        "dtype": DTYPE.str,
+        "hz": hz,
+        "steps": steps,
+        "chunk_steps": chunk_steps,
+        "num_chunks": num_chunks,
+        "lod_factors": lod_factors(steps),
+        "fields": {},
+    }
+    files = {}
+    for name, array in arrays.items():
+        offsets = []
+        for chunk in range(num_chunks):
+            data, offset = _npy_bytes(array[chunk * chunk_steps:(chunk + 1) * chunk_steps])
+            files[chunk_path(name, chunk)] = data
+            offsets.append(offset)
+        manifest["fields"][name] = {
+            "shape": list(array.shape[1:]),
+            "row_bytes": int(DTYPE.itemsize * int(np.prod(array.shape[1:], dtype=np.int64))),
+            "data_offsets": offsets,
+        }
+    files[MANIFEST_NAME] = json.dumps(manifest, indent=2).encode("utf-8")
+    return manifest, files
+
+
+def load_manifest(data: bytes) -> dict:
+    manifest = json.loads(data)
+    if manifest.get("format") != FORMAT:
+        raise ValueError(f"Unsupported trajectory format: {manifest.get('format')}")
+    return manifest
+
+
+def decode_chunk(data: bytes, manifest: dict, field: str, chunk: int) -> np.ndarray:
+    """Zero-copy view of a chunk file's data."""
+    info = manifest["fields"][field]
+    array = np.frombuffer(data, dtype=manifest["dtype"], offset=info["data_offsets"][chunk])
+    return array.reshape((-1, *info["shape"]))
+
+
+def decode_trajectory(files: Mapping[str, bytes], manifest: Optional[dict] = None) -> Dict[str, np.ndarray]:
+    """Reassemble full arrays from the files produced by `encode_trajectory`."""
+    manifest = manifest or load_manifest(files[MANIFEST_NAME])
+    return {
+        field: np.concatenate([
+            decode_chunk(files[chunk_path(field, chunk)], manifest, field, chunk)
+            for chunk in range(manifest["num_chunks"])
+        ])
+        for field in manifest["fields"]
+    }
+
+
+def _reduce(array: np.ndarray, factor: int, ufunc) -> np.ndarray:
+    """Reduce every `factor` consecutive rows with `ufunc` (last group may be shorter)."""
+    full = array.shape[0] // factor * factor
+    head = ufunc.reduce(array[:full].reshape(-1, factor, *array.shape[1:]), axis=1)
+    if full == array.shape[0]:
+        return head
+    return np.concatenate([head, ufunc.reduce(array[full:], axis=0, keepdims=True)])
+
+
+def build_pyramid(arrays: Mapping[str, np.ndarray], factors: Sequence[int] = LOD_FACTORS) -> Dict[str, bytes]:
+    """
+    Build min/max/mean pyramids for every field.
+
+    Each level is built from the previous one, so the raw data is scanned
+    once. Returns files keyed by `lod_path`; every file holds an array of
+    shape (buckets, 3, *dims) with [min, max, mean] per bucket.
+    """
+    files = {}
+    for field, array in arrays.items():
+        steps = array.shape[0]
+        mins = maxs = np.asarray(array, dtype=DTYPE)
+        sums = mins.astype(np.float64)
+        counts = np.ones(steps, dtype=np.int64)
+        previous = 1
+        for factor in lod_factors(steps, factors):
+            if factor % previous:
+                raise ValueError("LOD factors must be multiples of each other")
+            step = factor // previous
+            mins = _reduce(mins, step, np.minimum)
+            maxs = _reduce(maxs, step, np.maximum)
+            sums = _reduce(sums, step, np.add)
+            counts = _reduce(counts, step, np.add)
+            means = sums / counts.reshape((-1,) + (1,) * (sums.ndim - 1))
+            files[lod_path(factor, field)] = _npy_bytes(np.stack([mins, maxs, means], axis=1))[0]
+            previous = factor
+    return files
+
+
+def rebucket(level: np.ndarray, width: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge the rows of a pyramid level (buckets, 3, ...) down to `width` rows.
+    Returns (merged level, index of the first source row of each merged row).
+    """
+    n = level.shape[0]
+    if n <= width:
+        return level, np.arange(n)
+    starts = np.unique(np.linspace(0, n, width, endpoint=False).astype(np.int64))
+    sizes = np.diff(np.append(starts, n)).reshape((-1,) + (1,) * (level.ndim - 2))
+    merged = np.stack([
+        np.minimum.reduceat(level[:, 0], starts),
+        np.maximum.reduceat(level[:, 1], starts),
+        np.add.reduceat(level[:, 2].astype(np.float64), starts) / sizes,
+    ], axis=1)
+    return merged.astype(DTYPE), starts
+
+
+def chunk_slices(manifest: dict, start_step: int, end_step: int) -> List[Tuple[int, int, int]]:
+    """Split [start_step, end_step) into (chunk, row_start, row_end) pieces."""
+    chunk_steps = manifest["chunk_steps"]
+    pieces = []
+    for chunk in range(start_step // chunk_steps, (end_step - 1) // chunk_steps + 1):
+        chunk_start = chunk * chunk_steps
+        pieces.append((
+            chunk,
+            max(start_step, chunk_start) - chunk_start,
+            min(end_step, chunk_start + chunk_steps) - chunk_start,
+        ))
+    return pieces
+
+
+class TrajectoryReader:
+    """
+    Reads time windows of stored trajectories without loading whole episodes.
+
+    Chunks found in the local cache directory are memory-mapped; anything else
+    is fetched as a byte range of the stored chunk file, so only the requested
+    rows cross the network.
+
+    Args:
+        fetch: fetch(path, start, end) -> bytes, returning the whole object when
+            start/end are None. Must raise FileNotFoundError for missing objects.
+        cache_dir: Optional local directory mirroring storage paths.
+        max_manifests: Number of manifests kept in memory.
+    """
+
+    def __init__(self, fetch: Callable[..., bytes], cache_dir: Optional[str] = None, max_manifests: int = 1024):
+        self.fetch = fetch
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_manifests = max_manifests
+        self._manifests = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _local_path(self, path: str) -> Optional[Path]:
+        return self.cache_dir / path if self.cache_dir else None
+
+    def write_through(self, base_path: str, files: Mapping[str, bytes]):
+        """Copy freshly encoded files into the local cache."""
+        if not self.cache_dir:
+            return
+        for path, data in files.items():
+            local = self._local_path(f"{base_path}/{path}")
+            local.parent.mkdir(parents=True, exist_ok=True)
+            tmp = local.with_suffix(local.suffix + ".tmp")
+            tmp.write_bytes(data)
+            tmp.replace(local)
+
+    def manifest(self, base_path: str) -> dict:
+        with self._lock:
+            if base_path in self._manifests:
+                self._manifests.move_to_end(base_path)
+                return self._manifests[base_path]
+
+        local = self._local_path(f"{base_path}/{MANIFEST_NAME}")
+        if local and local.exists():
+            manifest = load_manifest(local.read_bytes())
+        else:
+            manifest = load_manifest(self.fetch(f"{base_path}/{MANIFEST_NAME}"))
+
+        with self._lock:
+            self._manifests[base_path] = manifest
+            while len(self._manifests) > self.max_manifests:
+                self._manifests.popitem(last=False)
+        return manifest
+
+    def _read_rows(self, base_path: str, manifest: dict, field: str, chunk: int, row_start: int, row_end: int) -> np.ndarray:
+        path = f"{base_path}/{chunk_path(field, chunk)}"
+        local = self._local_path(path)
+        if local and local.exists():
+            return np.load(local, mmap_mode="r")[row_start:row_end]
+
+        info = manifest["fields"][field]
+        offset = info["data_offsets"][chunk]
+        data = self.fetch(path, offset + row_start * info["row_bytes"], offset + row_end * info["row_bytes"])
+        return np.frombuffer(data, dtype=manifest["dtype"]).reshape((-1, *info["shape"]))
+
+    def read_file(self, base_path: str, path: str) -> np.ndarray:
+        """Load a whole .npy file (e.g. a pyramid level) of a trajectory."""
+        local = self._local_path(f"{base_path}/{path}")
+        if local and local.exists():
+            return np.load(local, mmap_mode="r")
+        return np.load(io.BytesIO(self.fetch(f"{base_path}/{path}")), allow_pickle=False)
+
+    def read(
+        self,
+        base_path: str,
+        start_step: int,
+        end_step: int,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Rows [start_step, end_step) of the requested fields (all fields by default)."""
+        manifest = self.manifest(base_path)
+        fields = list(fields) if fields else list(manifest["fields"])
+        unknown = [f for f in fields if f not in manifest["fields"]]
+        if unknown:
+            raise KeyError(f"Unknown trajectory field(s): {', '.join(unknown)}")
+
+        pieces = chunk_slices(manifest, start_step, end_step)
+        result = {}
+        for field in fields:
+            parts = [self._read_rows(base_path, manifest, field, *piece) for piece in pieces]
+            result[field] = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        return result
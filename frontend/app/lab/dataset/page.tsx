@@ -28,6 +28,9 @@ interface Episode {
   created_at: string
 }
 
+// Columns of the Episode interface; the API skips everything else
+const EPISODE_FIELDS = 'id,task_id,success,failure_reason,failure_time_sec,duration_sec,quality_score,video_path,created_at'
+
 interface Task {
   id: string
   name: string
@@ -80,11 +83,11 @@ export default function LabDatasetPage() {
     if (!selectedLabId) return
     setLoading(true)
     try {
-      let url = `/api/labs/${selectedLabId}/episodes?`
+      let url = `/api/labs/${selectedLabId}/episodes?fields=${EPISODE_FIELDS}`
       if (selectedTab === 'accepted') {
-        url += 'accepted=true'
+        url += '&accepted=true'
       } else if (selectedTab === 'edge_cases') {
-        url += 'edge_case=true'
+        url += '&edge_case=true'
       }
       if (selectedTaskId) {
         url += `&task_id=${selectedTaskId}`
@@ -75,7 +75,7 @@ export default function LabDashboardPage() {
 
   const fetchRecentEpisodes = async () => {
     if (!selectedLabId) return
-    const { data, error } = await apiFetch(`/api/labs/${selectedLabId}/episodes`)
+    const { data, error } = await apiFetch(`/api/labs/${selectedLabId}/episodes?fields=id,task_id,success,duration_sec,quality_score`)
     if (error) {
       setRecentEpisodes([])
       return
@@ -42,10 +42,16 @@ function StatusBadge({ status }: { status: string }) {
     submitted: 'bg-purple-50 text-purple-700 border-purple-200',
     accepted: 'bg-green-50 text-green-700 border-green-200',
     rejected: 'bg-red-50 text-red-700 border-red-200',
+    closed: 'bg-slate-100 text-slate-500 border-slate-300',
   }
+  // Closed by a QC rescore: the episode is no longer an edge case
+  const labels: Record<string, string> = {
+    closed: 'no fix needed',
+  }
+  const label = labels[status] || status
   return (
     <span className={`text-xs px-2 py-0.5 rounded font-medium border ${colors[status as keyof typeof colors] || 'bg-slate-50 text-slate-600 border-slate-200'}`} style={{ fontFamily: "'Archivo', sans-serif" }}>
-      {status}
+      {label}
     </span>
   )
 }
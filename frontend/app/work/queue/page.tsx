@@ -8,7 +8,7 @@ import { ShellHeader } from '@/components/app-shell/ShellHeader'
 import { FiZap } from 'react-icons/fi'
 import { EmptyState } from '@/components/ui/empty-state'
 
-import { apiFetch } from '@/lib/api'
+import { apiFetch, API_URL } from '@/lib/api'
 
 interface Job {
   id: string
@@ -41,10 +41,16 @@ function StatusBadge({ status }: { status: string }) {
     submitted: 'bg-purple-50 text-purple-700 border-purple-200',
     accepted: 'bg-green-50 text-green-700 border-green-200',
     rejected: 'bg-red-50 text-red-700 border-red-200',
+    closed: 'bg-slate-100 text-slate-500 border-slate-300',
   }
+  // Closed by a QC rescore: the episode is no longer an edge case
+  const labels: Record<string, string> = {
+    closed: 'no fix needed',
+  }
+  const label = labels[status] || status
   return (
     <span className={`text-xs px-2.5 py-1 rounded font-medium border ${colors[status as keyof typeof colors] || 'bg-slate-50 text-slate-600 border-slate-200'}`} style={{ fontFamily: "'Archivo', sans-serif" }}>
-      {status.toUpperCase()}
+      {label.toUpperCase()}
     </span>
   )
 }
@@ -69,6 +75,22 @@ export default function WorkQueuePage() {
     fetchJobs()
   }, [selectedLabId, selectedTaskId, selectedFailureReason])
 
+  // Live updates: patch status changes in place, refetch when jobs are added
+  useEffect(() => {
+    const params = new URLSearchParams()
+    if (selectedLabId) params.append('lab_id', selectedLabId)
+    if (selectedTaskId) params.append('task_id', selectedTaskId)
+    const source = new EventSource(`${API_URL}/api/jobs/events?${params.toString()}`)
+    source.addEventListener('update', (e) => {
+      const { job } = JSON.parse((e as MessageEvent).data)
+      setJobs(prev => prev.map(j => (j.id === job.id ? { ...j, status: job.status } : j)))
+    })
+    const refetch = () => fetchJobs(false)
+    source.addEventListener('insert', refetch)
+    source.addEventListener('resync', refetch)
+    return () => source.close()
+  }, [selectedLabId, selectedTaskId, selectedFailureReason])
+
   const fetchLabs = async () => {
     const { data, error } = await apiFetch('/api/labs')
     if (error) {
@@ -87,8 +109,8 @@ export default function WorkQueuePage() {
     setTasks(data?.tasks || [])
   }
 
-  const fetchJobs = async () => {
-    setLoading(true)
+  const fetchJobs = async (showLoading = true) => {
+    if (showLoading) setLoading(true)
     try {
       let url = '/api/jobs?'
       const params = new URLSearchParams()
@@ -105,7 +127,7 @@ export default function WorkQueuePage() {
       
       // Sort: open first, then claimed, then submitted
       const sorted = (data?.jobs || []).sort((a: Job, b: Job) => {
-        const order: Record<string, number> = { open: 0, claimed: 1, submitted: 2, accepted: 3, rejected: 4 }
+        const order: Record<string, number> = { open: 0, claimed: 1, submitted: 2, accepted: 3, rejected: 4, closed: 5 }
         return (order[a.status] || 99) - (order[b.status] || 99)
       })
       setJobs(sorted)
@@ -0,0 +1,6 @@
+-- Per-task QC rule overrides
+-- Keys match the fields of qc.QCRules in the backend, e.g.
+--   {"accept_max_duration_sec": 30, "edge_case_max_duration_sec": 30}
+-- Missing keys fall back to the defaults.
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS qc_rules JSONB;
+
@@ -0,0 +1,76 @@
+-- Allow jobs to be closed when their episode is no longer an edge case
+ALTER TABLE jobs DROP CONSTRAINT IF EXISTS jobs_status_check;
+ALTER TABLE jobs ADD CONSTRAINT jobs_status_check
+    CHECK (status IN ('open', 'claimed', 'submitted', 'accepted', 'rejected', 'closed'));
+
+-- Bulk write-back for re-scored episodes (used by backend/rescore.py)
+-- `updates` is a JSON array of
+--   {id, quality_score, edge_case, accepted, prev_edge_case, is_fix}
+-- Runs in a single transaction: episode rows are updated, open jobs are
+-- closed for episodes that stopped being edge cases, and jobs are opened
+-- (or closed ones reopened) for episodes that became edge cases.
+CREATE OR REPLACE FUNCTION apply_episode_qc(updates JSONB)
+RETURNS JSONB AS $$
+DECLARE
+    n_updated INT;
+    n_closed INT;
+    n_reopened INT;
+    n_opened INT;
+BEGIN
+    CREATE TEMP TABLE _qc_updates ON COMMIT DROP AS
+    SELECT * FROM jsonb_to_recordset(updates) AS u(
+        id UUID,
+        quality_score INT,
+        edge_case BOOLEAN,
+        accepted BOOLEAN,
+        prev_edge_case BOOLEAN,
+        is_fix BOOLEAN
+    );
+
+    UPDATE episodes e
+    SET quality_score = u.quality_score,
+        edge_case = u.edge_case,
+        accepted = u.accepted
+    FROM _qc_updates u
+    WHERE e.id = u.id;
+    GET DIAGNOSTICS n_updated = ROW_COUNT;
+
+    -- Edge case -> normal: close jobs nobody has picked up yet
+    UPDATE jobs j
+    SET status = 'closed',
+        updated_at = NOW()
+    FROM _qc_updates u
+    WHERE j.episode_id = u.id
+      AND u.prev_edge_case AND NOT u.edge_case
+      AND j.status = 'open';
+    GET DIAGNOSTICS n_closed = ROW_COUNT;
+
+    -- Normal -> edge case: reopen a previously closed job...
+    UPDATE jobs j
+    SET status = 'open',
+        updated_at = NOW()
+    FROM _qc_updates u
+    WHERE j.episode_id = u.id
+      AND u.edge_case AND NOT u.prev_edge_case
+      AND j.status = 'closed';
+    GET DIAGNOSTICS n_reopened = ROW_COUNT;
+
+    -- ...or open a new one (fix episodes never get jobs)
+    INSERT INTO jobs (task_id, lab_id, project_id, episode_id, status)
+    SELECT e.task_id, e.lab_id, e.project_id, e.id, 'open'
+    FROM _qc_updates u
+    JOIN episodes e ON e.id = u.id
+    WHERE u.edge_case AND NOT u.prev_edge_case AND NOT u.is_fix
+      AND NOT EXISTS (SELECT 1 FROM jobs j WHERE j.episode_id = u.id);
+    GET DIAGNOSTICS n_opened = ROW_COUNT;
+
+    DROP TABLE _qc_updates;
+
+    RETURN jsonb_build_object(
+        'updated', n_updated,
+        'jobs_opened', n_opened + n_reopened,
+        'jobs_closed', n_closed
+    );
+END;
+$$ LANGUAGE plpgsql;
+
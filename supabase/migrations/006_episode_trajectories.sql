@@ -0,0 +1,4 @@
+-- Per-step trajectory storage (see backend/trajectory.py)
+-- Points at episodes/{id}/trajectory; NULL when the episode was uploaded without arrays
+ALTER TABLE episodes ADD COLUMN IF NOT EXISTS trajectory_path TEXT;
+
@@ -0,0 +1,4 @@
+-- Derived media generated at ingest (see backend/media.py)
+-- e.g. {"thumbnail": "episodes/{id}/thumbnail.jpg", "preview": "...", "failure_clip": "..."}
+ALTER TABLE episodes ADD COLUMN IF NOT EXISTS media_paths JSONB;
+
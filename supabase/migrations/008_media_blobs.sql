@@ -0,0 +1,38 @@
+-- Content-addressed media storage (see backend/blobs.py)
+-- Uploaded videos are stored once per SHA-256 under blobs/{aa}/{sha256}.mp4
+-- and shared by every episode that uploads the same bytes.
+CREATE TABLE IF NOT EXISTS media_blobs (
+    sha256 TEXT PRIMARY KEY,
+    storage_path TEXT NOT NULL,
+    content_type TEXT,
+    size_bytes BIGINT NOT NULL,
+    ref_count INT NOT NULL DEFAULT 0,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE episodes ADD COLUMN IF NOT EXISTS video_sha256 TEXT REFERENCES media_blobs(sha256);
+CREATE INDEX IF NOT EXISTS idx_episodes_video_sha256 ON episodes(video_sha256);
+
+-- Keep media_blobs.ref_count equal to the number of episodes pointing at
+-- each blob, whichever way episodes are inserted, deleted or re-pointed.
+-- Blobs whose count drops to 0 are removed by scripts/gc_media_blobs.py.
+CREATE OR REPLACE FUNCTION update_media_blob_refs()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.video_sha256 IS NOT DISTINCT FROM NEW.video_sha256 THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.video_sha256 IS NOT NULL THEN
+        UPDATE media_blobs SET ref_count = ref_count - 1 WHERE sha256 = OLD.video_sha256;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.video_sha256 IS NOT NULL THEN
+        UPDATE media_blobs SET ref_count = ref_count + 1 WHERE sha256 = NEW.video_sha256;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS episodes_media_blob_refs ON episodes;
+CREATE TRIGGER episodes_media_blob_refs
+    AFTER INSERT OR DELETE OR UPDATE OF video_sha256 ON episodes
+    FOR EACH ROW EXECUTE FUNCTION update_media_blob_refs();
@@ -0,0 +1,36 @@
+-- Live job updates (see backend/events.py)
+-- Every job insert and every change to status, claim or fix is announced on
+-- the job_events channel; API processes with DATABASE_URL set LISTEN on it
+-- and forward matching events to their Server-Sent Events subscribers.
+CREATE OR REPLACE FUNCTION notify_job_event()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.status IS NOT DISTINCT FROM NEW.status
+       AND OLD.claimed_by_worker_id IS NOT DISTINCT FROM NEW.claimed_by_worker_id
+       AND OLD.fix_episode_id IS NOT DISTINCT FROM NEW.fix_episode_id THEN
+        RETURN NULL;
+    END IF;
+
+    PERFORM pg_notify('job_events', json_build_object(
+        'type', CASE WHEN TG_OP = 'INSERT' THEN 'insert' ELSE 'update' END,
+        'previous_status', CASE WHEN TG_OP = 'UPDATE' THEN OLD.status END,
+        'job', json_build_object(
+            'id', NEW.id,
+            'task_id', NEW.task_id,
+            'lab_id', NEW.lab_id,
+            'episode_id', NEW.episode_id,
+            'status', NEW.status,
+            'claimed_by_worker_id', NEW.claimed_by_worker_id,
+            'fix_episode_id', NEW.fix_episode_id,
+            'updated_at', NEW.updated_at
+        )
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS jobs_notify_event ON jobs;
+CREATE TRIGGER jobs_notify_event
+    AFTER INSERT OR UPDATE ON jobs
+    FOR EACH ROW EXECUTE FUNCTION notify_job_event();
@@ -0,0 +1,39 @@
+-- Composite and partial indexes matched to the API's query shapes
+-- (check with backend/scripts/explain_queries.py).
+-- Each replaces a single-column index it starts with, which is dropped.
+
+-- GET /api/jobs?lab_id=...&status=... ORDER BY created_at DESC, lab summary
+CREATE INDEX IF NOT EXISTS idx_jobs_lab_status_created ON jobs(lab_id, status, created_at DESC);
+DROP INDEX IF EXISTS idx_jobs_lab_id;
+
+-- Work queue default: GET /api/jobs?status=open ORDER BY created_at DESC
+CREATE INDEX IF NOT EXISTS idx_jobs_open_created ON jobs(created_at DESC) WHERE status = 'open';
+
+-- GET /api/jobs?task_id=..., dataset stats and export (status = 'accepted')
+CREATE INDEX IF NOT EXISTS idx_jobs_task_status_created ON jobs(task_id, status, created_at DESC);
+DROP INDEX IF EXISTS idx_jobs_task_id;
+
+-- Reverse lookup for the fix_episode_id foreign key (episode deletes, the
+-- demo reset); most jobs have no fix yet. claimed_by_worker_id is indexed by 003.
+CREATE INDEX IF NOT EXISTS idx_jobs_fix_episode_id ON jobs(fix_episode_id) WHERE fix_episode_id IS NOT NULL;
+
+-- GET /api/labs/{id}/episodes ORDER BY created_at DESC, lab summary
+CREATE INDEX IF NOT EXISTS idx_episodes_lab_created ON episodes(lab_id, created_at DESC);
+DROP INDEX IF EXISTS idx_episodes_lab_id;
+
+-- GET /api/labs/{id}/episodes?task_id=...
+CREATE INDEX IF NOT EXISTS idx_episodes_lab_task_created ON episodes(lab_id, task_id, created_at DESC);
+
+-- Export: accepted episodes of a task
+CREATE INDEX IF NOT EXISTS idx_episodes_task_accepted ON episodes(task_id) WHERE accepted;
+
+-- GET /api/projects?lab_id=... ORDER BY created_at DESC
+CREATE INDEX IF NOT EXISTS idx_projects_lab_created ON projects(lab_id, created_at DESC);
+DROP INDEX IF EXISTS idx_projects_lab_id;
+
+-- scripts/gc_media_blobs.py: unreferenced blobs older than the grace period
+CREATE INDEX IF NOT EXISTS idx_media_blobs_unreferenced ON media_blobs(created_at) WHERE ref_count <= 0;
+
+ANALYZE jobs;
+ANALYZE episodes;
+ANALYZE projects;
@@ -0,0 +1,12 @@
+-- Fast reset for backend/scripts/reset_and_seed_demo.py: empties every app
+-- table in one statement instead of deleting rows one by one over the API.
+-- DO NOT call this in production!
+CREATE OR REPLACE FUNCTION reset_demo_data()
+RETURNS VOID AS $$
+BEGIN
+    TRUNCATE jobs, episodes, tasks, projects, labs, workers, waitlist, lab_requests, media_blobs;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the service role (seed scripts) may call it
+REVOKE EXECUTE ON FUNCTION reset_demo_data() FROM PUBLIC, anon, authenticated;
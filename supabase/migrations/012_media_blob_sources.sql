@@ -0,0 +1,7 @@
+-- Uploads that are not fast-start are remuxed before they are stored
+-- (backend/main.py store_video), so the blob's sha256 is that of the remux.
+-- source_sha256 keeps the hash of the bytes that were uploaded: a repeat
+-- upload of the same file is found by it without running ffmpeg again.
+ALTER TABLE media_blobs ADD COLUMN IF NOT EXISTS source_sha256 TEXT;
+CREATE INDEX IF NOT EXISTS idx_media_blobs_source_sha256 ON media_blobs(source_sha256)
+    WHERE source_sha256 IS NOT NULL;
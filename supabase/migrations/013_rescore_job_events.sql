@@ -0,0 +1,104 @@
+-- apply_episode_qc (005) also returns the jobs it opened, reopened or closed,
+-- shaped like the job_events notifications (009), so backend/rescore.py can
+-- publish them to in-process subscribers when LISTEN is not configured.
+CREATE OR REPLACE FUNCTION job_event_payload(kind TEXT, previous_status TEXT, j jobs)
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'type', kind,
+        'previous_status', previous_status,
+        'job', jsonb_build_object(
+            'id', j.id,
+            'task_id', j.task_id,
+            'lab_id', j.lab_id,
+            'episode_id', j.episode_id,
+            'status', j.status,
+            'claimed_by_worker_id', j.claimed_by_worker_id,
+            'fix_episode_id', j.fix_episode_id,
+            'updated_at', j.updated_at
+        )
+    );
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION apply_episode_qc(updates JSONB)
+RETURNS JSONB AS $$
+DECLARE
+    n_updated INT;
+    n_closed INT;
+    n_reopened INT;
+    n_opened INT;
+    closed_events JSONB;
+    reopened_events JSONB;
+    opened_events JSONB;
+BEGIN
+    CREATE TEMP TABLE _qc_updates ON COMMIT DROP AS
+    SELECT * FROM jsonb_to_recordset(updates) AS u(
+        id UUID,
+        quality_score INT,
+        edge_case BOOLEAN,
+        accepted BOOLEAN,
+        prev_edge_case BOOLEAN,
+        is_fix BOOLEAN
+    );
+
+    UPDATE episodes e
+    SET quality_score = u.quality_score,
+        edge_case = u.edge_case,
+        accepted = u.accepted
+    FROM _qc_updates u
+    WHERE e.id = u.id;
+    GET DIAGNOSTICS n_updated = ROW_COUNT;
+
+    -- Edge case -> normal: close jobs nobody has picked up yet
+    WITH changed AS (
+        UPDATE jobs j
+        SET status = 'closed',
+            updated_at = NOW()
+        FROM _qc_updates u
+        WHERE j.episode_id = u.id
+          AND u.prev_edge_case AND NOT u.edge_case
+          AND j.status = 'open'
+        RETURNING j.*
+    )
+    SELECT COUNT(*), COALESCE(jsonb_agg(job_event_payload('update', 'open', changed::jobs)), '[]'::jsonb)
+    INTO n_closed, closed_events
+    FROM changed;
+
+    -- Normal -> edge case: reopen a previously closed job...
+    WITH changed AS (
+        UPDATE jobs j
+        SET status = 'open',
+            updated_at = NOW()
+        FROM _qc_updates u
+        WHERE j.episode_id = u.id
+          AND u.edge_case AND NOT u.prev_edge_case
+          AND j.status = 'closed'
+        RETURNING j.*
+    )
+    SELECT COUNT(*), COALESCE(jsonb_agg(job_event_payload('update', 'closed', changed::jobs)), '[]'::jsonb)
+    INTO n_reopened, reopened_events
+    FROM changed;
+
+    -- ...or open a new one (fix episodes never get jobs)
+    WITH changed AS (
+        INSERT INTO jobs (task_id, lab_id, project_id, episode_id, status)
+        SELECT e.task_id, e.lab_id, e.project_id, e.id, 'open'
+        FROM _qc_updates u
+        JOIN episodes e ON e.id = u.id
+        WHERE u.edge_case AND NOT u.prev_edge_case AND NOT u.is_fix
+          AND NOT EXISTS (SELECT 1 FROM jobs j WHERE j.episode_id = u.id)
+        RETURNING *
+    )
+    SELECT COUNT(*), COALESCE(jsonb_agg(job_event_payload('insert', NULL, changed::jobs)), '[]'::jsonb)
+    INTO n_opened, opened_events
+    FROM changed;
+
+    DROP TABLE _qc_updates;
+
+    RETURN jsonb_build_object(
+        'updated', n_updated,
+        'jobs_opened', n_opened + n_reopened,
+        'jobs_closed', n_closed,
+        'jobs', closed_events || reopened_events || opened_events
+    );
+END;
+$$ LANGUAGE plpgsql;
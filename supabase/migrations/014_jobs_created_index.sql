@@ -0,0 +1,8 @@
+-- GET /api/jobs with no filter (the work queue before a lab or task is picked)
+-- ORDER BY created_at DESC.
+-- 010 covers the filtered shapes; this one lets the unfiltered list be read
+-- in order instead of sorting the whole table.
+-- (check with backend/scripts/explain_queries.py)
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at DESC);
+
+ANALYZE jobs;